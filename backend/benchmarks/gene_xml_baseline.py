@@ -0,0 +1,492 @@
+"""
+Frozen copy of the NCBI Gene XML extractors as they were before gene_xml.py
+existed (ncbi_mcp_server.extract_ALL_fields_gene and its extract_* helpers),
+kept unchanged as the reference point for the gene_xml_parser benchmark.
+Only the network request is dropped: parse_gene_baseline takes the response
+body. Not used by the application.
+"""
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+
+def parse_gene_baseline(data: bytes) -> Dict[str, Any]:
+    """Baseline code path: response.text -> ET.fromstring -> extract_* over the whole tree"""
+    root = ET.fromstring(data.decode('utf-8'))
+
+    all_data = {}
+
+    all_data['entrezgene'] = extract_entrezgene_info(root)
+    all_data['gene_info'] = extract_gene_info(root)
+    all_data['gene_commentaries'] = extract_all_gene_commentaries(root)
+    all_data['biosource'] = extract_biosource_info(root)
+    all_data['genomics'] = extract_genomics_info(root)
+    all_data['publications'] = extract_publications_info(root)
+    all_data['properties'] = extract_properties_info(root)
+    all_data['technical'] = extract_technical_info(root)
+    all_data['additional'] = extract_additional_sections(root)
+
+    return all_data
+
+def get_element_attribute(element: ET.Element, tag: str, attribute: str) -> Optional[str]:
+    """Вспомогательная функция для получения атрибута элемента"""
+    if element is None:
+        return None
+    elem = element.find(tag)
+    if elem is not None:
+        return elem.get(attribute)
+    return None
+
+
+def extract_entrezgene_info(root: ET.Element) -> Dict[str, Any]:
+    """Извлекает основную структуру Entrezgene"""
+    entrezgene_info = {}
+
+    entrezgene = root.find('.//Entrezgene')
+    if entrezgene is not None:
+        entrezgene_info['type'] = entrezgene.get('type')
+
+        unique_keys = entrezgene.find('Entrezgene_unique-keys')
+        if unique_keys is not None:
+            entrezgene_info['unique_keys'] = [key.text for key in unique_keys.findall('Object-id') if key.text]
+
+        entrezgene_type = entrezgene.find('Entrezgene_type')
+        if entrezgene_type is not None:
+            entrezgene_info['gene_type'] = entrezgene_type.text
+
+    return entrezgene_info
+
+def extract_gene_info(root: ET.Element) -> Dict[str, Any]:
+    """Извлекает основную информацию о гене"""
+    gene_info = {}
+
+    gene_ref = root.find('.//Gene-ref')
+    if gene_ref is not None:
+        gene_info['symbol'] = gene_ref.findtext('Gene-ref_locus')
+        gene_info['description'] = gene_ref.findtext('Gene-ref_desc')
+        gene_info['maploc'] = gene_ref.findtext('Gene-ref_maploc')
+        gene_info['formal_name'] = gene_ref.findtext('Gene-ref_formal-name')
+        gene_info['db'] = gene_ref.findtext('Gene-ref_db')
+
+        synonyms = []
+        for syn in gene_ref.findall('Gene-ref_syn'):
+            if syn.text:
+                synonyms.append(syn.text)
+        gene_info['synonyms'] = synonyms
+
+    nomenclature = root.find('.//Gene-nomenclature')
+    if nomenclature is not None:
+        gene_info['nomenclature'] = {
+            'symbol': nomenclature.findtext('Gene-nomenclature_symbol'),
+            'name': nomenclature.findtext('Gene-nomenclature_name'),
+            'status': nomenclature.findtext('Gene-nomenclature_status'),
+            'source': nomenclature.findtext('Gene-nomenclature_source')
+        }
+
+    summary = root.find('.//Entrezgene_summary')
+    if summary is not None:
+        gene_info['summary'] = summary.text
+
+    locus = root.find('.//Entrezgene_locus')
+    if locus is not None:
+        gene_info['locus'] = locus.text
+
+    prot_ref = root.find('.//Entrezgene_prot/Prot-ref')
+    if prot_ref is not None:
+        gene_info['protein'] = {
+            'name': prot_ref.findtext('Prot-ref_name'),
+            'description': prot_ref.findtext('Prot-ref_desc')
+        }
+        alt_names = []
+        for name_elem in prot_ref.findall('Prot-ref_name_E'):
+            if name_elem.text:
+                alt_names.append(name_elem.text)
+        if alt_names:
+            gene_info['protein']['alternative_names'] = alt_names
+
+    return gene_info
+
+def extract_all_gene_commentaries(root: ET.Element) -> List[Dict[str, Any]]:
+    """Извлекает ВСЕ Gene-commentary с полной структурой"""
+    commentaries = []
+
+    for commentary in root.findall('.//Gene-commentary'):
+        comment_data = extract_gene_commentary_element(commentary)
+        if comment_data:
+            commentaries.append(comment_data)
+
+    return commentaries
+
+def extract_gene_commentary_element(commentary: ET.Element) -> Dict[str, Any]:
+    """Извлекает один элемент Gene-commentary со всеми полями"""
+    comment_data = {}
+
+    comment_data['type'] = get_element_attribute(commentary, 'Gene-commentary_type', 'value')
+    comment_data['heading'] = commentary.findtext('Gene-commentary_heading')
+    comment_data['text'] = commentary.findtext('Gene-commentary_text')
+    comment_data['label'] = commentary.findtext('Gene-commentary_label')
+    comment_data['accession'] = commentary.findtext('Gene-commentary_accession')
+    comment_data['version'] = commentary.findtext('Gene-commentary_version')
+
+    comment_data['create_date'] = commentary.findtext('Gene-commentary_create-date')
+    comment_data['update_date'] = commentary.findtext('Gene-commentary_update-date')
+
+    genomic_coords = commentary.find('Gene-commentary_genomic-coords')
+    if genomic_coords is not None:
+        comment_data['genomic_coords'] = extract_genomic_coords(genomic_coords)
+
+    source = commentary.find('Gene-commentary_source')
+    if source is not None:
+        comment_data['source'] = extract_source_info(source)
+
+    comments = []
+    for comment_elem in commentary.findall('Gene-commentary_comment/Gene-commentary'):
+        nested_comment = extract_gene_commentary_element(comment_elem)
+        if nested_comment:
+            comments.append(nested_comment)
+    if comments:
+        comment_data['comments'] = comments
+
+    products = []
+    for product in commentary.findall('Gene-commentary_products/Gene-commentary'):
+        product_data = extract_gene_commentary_element(product)
+        if product_data:
+            products.append(product_data)
+    if products:
+        comment_data['products'] = products
+
+    refs = []
+    for ref in commentary.findall('Gene-commentary_refs/Pub'):
+        ref_data = extract_publication_info(ref)
+        if ref_data:
+            refs.append(ref_data)
+    if refs:
+        comment_data['references'] = refs
+
+    seqs = []
+    for seq in commentary.findall('Gene-commentary_seqs/Seq-loc'):
+        seq_data = extract_sequence_location(seq)
+        if seq_data:
+            seqs.append(seq_data)
+    if seqs:
+        comment_data['sequences'] = seqs
+
+    xtra_props = commentary.find('Gene-commentary_xtra-properties')
+    if xtra_props is not None:
+        comment_data['extra_properties'] = extract_xtra_properties(xtra_props)
+
+    return comment_data
+
+def extract_genomic_coords(genomic_coords_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает геномные координаты"""
+    coords_data = {}
+
+    seq_loc = genomic_coords_element.find('Seq-loc')
+    if seq_loc is not None:
+        coords_data['seq_loc'] = extract_sequence_location(seq_loc)
+
+    return coords_data
+
+def extract_source_info(source_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию об источнике"""
+    source_data = {}
+
+    other_source = source_element.find('Other-source')
+    if other_source is not None:
+        source_data['other_source'] = {
+            'anchor': other_source.findtext('Other-source_anchor'),
+            'pre_text': other_source.findtext('Other-source_pre-text'),
+            'post_text': other_source.findtext('Other-source_post-text'),
+            'src': other_source.findtext('Other-source_src'),
+            'url': other_source.findtext('Other-source_url')
+        }
+
+    return source_data
+
+def extract_xtra_properties(xtra_props_element: ET.Element) -> List[Dict[str, str]]:
+    """Извлекает дополнительные свойства"""
+    properties = []
+
+    for term in xtra_props_element.findall('Xtra-Terms'):
+        tag = term.findtext('Xtra-Terms_tag')
+        value = term.findtext('Xtra-Terms_value')
+        if tag and value:
+            properties.append({'tag': tag, 'value': value})
+
+    return properties
+
+def extract_biosource_info(root: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о биологическом источнике"""
+    biosource = {}
+
+    bio_source = root.find('.//BioSource')
+    if bio_source is not None:
+        biosource['genome'] = bio_source.findtext('BioSource_genome')
+        biosource['origin'] = bio_source.findtext('BioSource_origin')
+
+        org = bio_source.find('BioSource_org')
+        if org is not None:
+            biosource['organism'] = extract_organism_info(org)
+
+        subtypes = []
+        for subtype in bio_source.findall('BioSource_subtype'):
+            subtype_data = {
+                'name': subtype.findtext('SubSource_name'),
+                'subtype': subtype.findtext('SubSource_subtype')
+            }
+            if subtype_data['name'] or subtype_data['subtype']:
+                subtypes.append(subtype_data)
+        if subtypes:
+            biosource['subtypes'] = subtypes
+
+    return biosource
+
+def extract_organism_info(org_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает полную информацию об организме"""
+    organism = {}
+
+    org_ref = org_element.find('Org-ref')
+    if org_ref is not None:
+        organism['common_name'] = org_ref.findtext('Org-ref_common')
+        organism['taxname'] = org_ref.findtext('Org-ref_taxname')
+        organism['db'] = org_ref.findtext('Org-ref_db')
+
+    org_name = org_element.find('OrgName')
+    if org_name is not None:
+        organism['lineage'] = org_name.findtext('OrgName_lineage')
+        organism['gcode'] = org_name.findtext('OrgName_gcode')
+        organism['mgcode'] = org_name.findtext('OrgName_mgcode')
+        organism['div'] = org_name.findtext('OrgName_div')
+        organism['attrib'] = org_name.get('attrib')
+
+        binomial = org_name.find('OrgName_name/BinomialOrgName')
+        if binomial is not None:
+            organism['binomial'] = {
+                'genus': binomial.findtext('BinomialOrgName_genus'),
+                'species': binomial.findtext('BinomialOrgName_species')
+            }
+
+    return organism
+
+def extract_genomics_info(root: ET.Element) -> Dict[str, Any]:
+    """Извлекает геномную информацию"""
+    genomics = {}
+
+    location = root.find('.//Entrezgene_location')
+    if location is not None:
+        genomics['location'] = extract_location_info(location)
+
+    maps_elem = root.find('.//Maps_display-str')
+    if maps_elem is not None:
+        genomics['maps_display'] = maps_elem.text
+
+    maps_method = root.find('.//Maps_method')
+    if maps_method is not None:
+        genomics['maps_method'] = {
+            'map_type': maps_method.findtext('Maps_method_map-type')
+        }
+
+    na_strand = root.find('.//Na-strand')
+    if na_strand is not None:
+        genomics['na_strand'] = na_strand.text
+
+    return genomics
+
+def extract_location_info(location_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о локализации"""
+    location = {}
+
+    seq_interval = location_element.find('.//Seq-interval')
+    if seq_interval is not None:
+        location['seq_interval'] = {
+            'from': seq_interval.findtext('Seq-interval_from'),
+            'to': seq_interval.findtext('Seq-interval_to'),
+            'strand': seq_interval.findtext('Seq-interval_strand'),
+            'id': extract_seq_id(seq_interval.find('Seq-interval_id'))
+        }
+
+    seq_loc = location_element.find('.//Seq-loc')
+    if seq_loc is not None:
+        location['seq_loc'] = extract_sequence_location(seq_loc)
+
+    return location
+
+def extract_sequence_location(seq_loc: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о последовательности"""
+    seq_data = {}
+
+    whole = seq_loc.find('Seq-loc_whole')
+    if whole is not None:
+        seq_data['whole'] = extract_seq_id(whole.find('Seq-id'))
+
+    interval = seq_loc.find('Seq-loc_int')
+    if interval is not None:
+        seq_data['interval'] = extract_seq_interval(interval)
+
+    return seq_data
+
+def extract_seq_interval(interval_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию об интервале последовательности"""
+    interval = {}
+
+    seq_interval = interval_element.find('Seq-interval')
+    if seq_interval is not None:
+        interval['from'] = seq_interval.findtext('Seq-interval_from')
+        interval['to'] = seq_interval.findtext('Seq-interval_to')
+        interval['strand'] = seq_interval.findtext('Seq-interval_strand')
+        interval['seq_id'] = extract_seq_id(seq_interval.find('Seq-interval_id/Seq-id'))
+
+    return interval
+
+def extract_seq_id(seq_id_element: Optional[ET.Element]) -> Dict[str, str]:
+    """Извлекает информацию о Seq-id"""
+    if seq_id_element is None:
+        return {}
+
+    seq_id_data = {}
+    gi = seq_id_element.findtext('Seq-id_gi')
+    if gi:
+        seq_id_data['gi'] = gi
+
+    return seq_id_data
+
+def extract_publications_info(root: ET.Element) -> List[Dict[str, Any]]:
+    """Извлекает информацию о публикациях"""
+    publications = []
+
+    for pub in root.findall('.//Pub'):
+        pub_data = extract_publication_info(pub)
+        if pub_data:
+            publications.append(pub_data)
+
+    return publications
+
+def extract_publication_info(pub_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о публикации"""
+    pub_data = {}
+
+    pub_data['pmid'] = pub_element.findtext('Pub_pmid')
+
+    pubmed_id = pub_element.find('PubMedId')
+    if pubmed_id is not None:
+        pub_data['pubmed_id'] = pubmed_id.text
+
+    return pub_data
+
+def extract_properties_info(root: ET.Element) -> Dict[str, Any]:
+    """Извлекает свойства и дополнительные данные"""
+    properties = {}
+
+    xtra_terms = []
+    for term in root.findall('.//Xtra-Terms'):
+        tag = term.findtext('Xtra-Terms_tag')
+        value = term.findtext('Xtra-Terms_value')
+        if tag and value:
+            xtra_terms.append({'tag': tag, 'value': value})
+    if xtra_terms:
+        properties['xtra_terms'] = xtra_terms
+
+    additional_props = []
+    for prop in root.findall('.//Entrezgene_xtra-properties/Xtra-Terms'):
+        tag = prop.findtext('Xtra-Terms_tag')
+        value = prop.findtext('Xtra-Terms_value')
+        if tag and value:
+            additional_props.append({'tag': tag, 'value': value})
+    if additional_props:
+        properties['additional_properties'] = additional_props
+
+    index_terms = []
+    for term in root.findall('.//Entrezgene_xtra-index-terms/E'):
+        if term.text:
+            index_terms.append(term.text)
+    if index_terms:
+        properties['index_terms'] = index_terms
+
+    return properties
+
+def extract_technical_info(root: ET.Element) -> Dict[str, Any]:
+    """Извлекает техническую информацию"""
+    technical = {}
+
+    track_info = root.find('.//Gene-track')
+    if track_info is not None:
+        technical['track'] = {
+            'geneid': track_info.findtext('Gene-track_geneid'),
+            'status': track_info.findtext('Gene-track_status'),
+            'create_date': track_info.findtext('Gene-track_create-date'),
+            'update_date': track_info.findtext('Gene-track_update-date')
+        }
+
+    gene_source = root.find('.//Gene-source')
+    if gene_source is not None:
+        technical['gene_source'] = {
+            'src': gene_source.findtext('Gene-source_src'),
+            'src_int': gene_source.findtext('Gene-source_src-int'),
+            'src_str2': gene_source.findtext('Gene-source_src-str2')
+        }
+
+    dates = []
+    for date_elem in root.findall('.//Date'):
+        date_data = extract_date_info(date_elem)
+        if date_data:
+            dates.append(date_data)
+    if dates:
+        technical['dates'] = dates
+
+    return technical
+
+def extract_date_info(date_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о дате"""
+    date_data = {}
+
+    date_std = date_element.find('Date-std')
+    if date_std is not None:
+        date_data['std'] = {
+            'year': date_std.findtext('Date-std_year'),
+            'month': date_std.findtext('Date-std_month'),
+            'day': date_std.findtext('Date-std_day'),
+            'hour': date_std.findtext('Date-std_hour'),
+            'minute': date_std.findtext('Date-std_minute'),
+            'second': date_std.findtext('Date-std_second')
+        }
+
+    return date_data
+
+def extract_additional_sections(root: ET.Element) -> Dict[str, Any]:
+    """Извлекает дополнительные разделы"""
+    additional = {}
+
+    other_sources = []
+    for source in root.findall('.//Other-source'):
+        source_data = {
+            'anchor': source.findtext('Other-source_anchor'),
+            'pre_text': source.findtext('Other-source_pre-text'),
+            'post_text': source.findtext('Other-source_post-text'),
+            'src': source.findtext('Other-source_src'),
+            'url': source.findtext('Other-source_url')
+        }
+        if any(source_data.values()):
+            other_sources.append(source_data)
+    if other_sources:
+        additional['other_sources'] = other_sources
+
+    dbtags = []
+    for dbtag in root.findall('.//Dbtag'):
+        db = dbtag.findtext('Dbtag_db')
+        tag = dbtag.findtext('Dbtag_tag')
+        if db and tag:
+            dbtags.append({'db': db, 'tag': tag})
+    if dbtags:
+        additional['external_dbs'] = dbtags
+
+    object_ids = []
+    for obj_id in root.findall('.//Object-id'):
+        obj_data = {
+            'id': obj_id.findtext('Object-id_id'),
+            'str': obj_id.findtext('Object-id_str')
+        }
+        if any(obj_data.values()):
+            object_ids.append(obj_data)
+    if object_ids:
+        additional['object_ids'] = object_ids
+
+    return additional
@@ -0,0 +1,85 @@
+"""
+Concurrency benchmark for the /search endpoint.
+
+Fires the same batch of requests at a running API with increasing client
+parallelism and reports throughput and latency percentiles per level, so the
+scaling of the read path can be compared before and after a change.
+
+Usage:
+    python -m backend.benchmarks.search_concurrency \
+        --url http://localhost:8000 --genes FOXO3,APOE,SIRT1,TERT,NFE2L2 \
+        --requests 200 --concurrency 1,2,4,8,16,32
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+import requests
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def run_level(url: str, genes: list, total: int, concurrency: int, timeout: float) -> dict:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def one(gene):
+        t0 = time.perf_counter()
+        r = session.get(f"{url}/search", params={"gene_name": gene}, timeout=timeout)
+        return time.perf_counter() - t0, r.status_code
+
+    batch = list(islice(cycle(genes), total))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(one, batch))
+    elapsed = time.perf_counter() - start
+
+    latencies = [lat for lat, _ in results]
+    errors = sum(1 for _, code in results if code != 200)
+    return {
+        "concurrency": concurrency,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /search throughput vs. request parallelism")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--genes", default="FOXO3,APOE,SIRT1,TERT,NFE2L2")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    genes = [g.strip() for g in args.genes.split(",") if g.strip()]
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    # Warm up: make sure every gene has been looked up at least once.
+    run_level(args.url, genes, len(genes), 1, args.timeout)
+
+    print(f"{'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    baseline = None
+    for level in levels:
+        r = run_level(args.url, genes, args.requests, level, args.timeout)
+        baseline = baseline or r["rps"]
+        print(
+            f"{r['concurrency']:>5} {r['rps']:>9.1f} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['errors']:>7}"
+            f"   x{r['rps'] / baseline:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from backend.services.knowledge_facade import KnowledgeBaseFacade
+from backend.services.http_client import http_stats
 from backend.models.gene_response import GeneResponse
 
-app = FastAPI(title="Longevity Gene Knowledge API (UniProt + NCBI)")
+facade = KnowledgeBaseFacade()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await facade.astart()
+    yield
+    await facade.aclose()
+
+
+app = FastAPI(title="Longevity Gene Knowledge API (UniProt + NCBI)", lifespan=lifespan)
 
 origins = [
     "https://www.gene-lens.site",
@@ -20,9 +33,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-facade = KnowledgeBaseFacade()
-
 @app.get('/search', response_model=GeneResponse)
-def search_gene(gene_name: str):
-    result = facade.search(gene_name)
+async def search_gene(gene_name: str):
+    result = await facade.asearch(gene_name)
     return result
+
+
+@app.get('/cache/stats')
+async def cache_stats():
+    return facade.cache_stats()
+
+
+@app.get('/http/stats')
+async def upstream_http_stats():
+    return http_stats()
@@ -18,3 +18,7 @@ class GeneResponse(BaseModel):
     article: Optional[str] = None
     externalLink: Optional[str] = None
     queue_size: Optional[int] = 0
+    # 0 while the gene is being generated, otherwise its 1-based place in the queue
+    queue_position: Optional[int] = None
+    # Close approved symbols when status is "unknown"
+    suggestions: Optional[List[str]] = None
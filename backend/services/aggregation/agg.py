@@ -1,23 +1,20 @@
-from smolagents import ToolCollection, ToolCallingAgent, OpenAIServerModel
+from smolagents import ToolCollection, ToolCallingAgent
+from backend.services.llm import NEBIUS_API_BASE, get_model
 from mcp import StdioServerParameters
-import os
 import json
 
 
 # config
+MODEL = "Qwen/Qwen3-235B-A22B-Thinking-2507"
+
+
 def set_model(
-        api_key=os.environ["NEBIUS_API_KEY"],
-        api_base="https://api.studio.nebius.com/v1/",
+        api_key=None,
+        api_base=NEBIUS_API_BASE,
         temperature=0,
-        model_name="Qwen/Qwen3-235B-A22B-Thinking-2507"
+        model_name=MODEL
 ):
-    model = OpenAIServerModel(
-        model_id=model_name,
-        api_key=api_key,
-        api_base=api_base,
-        temperature=temperature,
-    )
-    return model
+    return get_model(model_name, temperature=temperature, api_key=api_key, api_base=api_base)
 
 def set_user_prompt(uniprot_output, kegg_output, opengenes_output, gnomad_output, ncbi_output):
     return f"""
@@ -0,0 +1,85 @@
+import os
+from datetime import datetime, timezone
+
+from psycopg2.extras import Json
+
+from backend.services.db import PgPool, get_pool, get_async_pool
+
+# How long the persisted UniProt/NCBI card of a ready gene is served before
+# it is re-fetched from upstream (seconds).
+CARD_REFRESH_TTL = int(os.environ.get("CARD_REFRESH_TTL", 7 * 24 * 3600))
+
+# NOTIFY channel carrying the symbol of every gene whose row changed, so API
+# processes can drop cached responses written by a separate worker process.
+CHANGED_CHANNEL = "gene_articles_changed"
+
+
+class ArticleStore:
+    """Generated articles and their UniProt/NCBI cards in `gene_articles`."""
+
+    def __init__(self, pool: PgPool | None = None):
+        self.pool = pool or get_pool()
+
+    def ensure_table(self):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS gene_articles (
+                gene_symbol TEXT PRIMARY KEY,
+                article TEXT
+            )
+            """)
+            cur.execute("""
+            ALTER TABLE gene_articles
+                ADD COLUMN IF NOT EXISTS card JSONB,
+                ADD COLUMN IF NOT EXISTS card_updated_at TIMESTAMPTZ
+            """)
+
+    def save(self, gene_symbol: str, article: str, card: dict | None = None):
+        # A missing card keeps whatever card the row already has.
+        card_updated_at = datetime.now(timezone.utc) if card is not None else None
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            INSERT INTO gene_articles (gene_symbol, article, card, card_updated_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (gene_symbol) DO UPDATE
+            SET article = EXCLUDED.article,
+                card = COALESCE(EXCLUDED.card, gene_articles.card),
+                card_updated_at = COALESCE(EXCLUDED.card_updated_at, gene_articles.card_updated_at)
+            """, (gene_symbol, article, Json(card) if card is not None else None, card_updated_at))
+            cur.execute("SELECT pg_notify(%s, %s)", (CHANGED_CHANNEL, gene_symbol))
+
+    def save_card(self, gene_symbol: str, card: dict):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            UPDATE gene_articles SET card = %s, card_updated_at = now()
+            WHERE gene_symbol = %s
+            """, (Json(card), gene_symbol))
+
+    def load(self, gene_symbol: str) -> tuple[str, dict | None, bool] | None:
+        """Returns (article, card, card_is_fresh) or None when the gene has no article."""
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            SELECT article, card,
+                   card_updated_at IS NOT NULL
+                   AND card_updated_at > now() - make_interval(secs => %s)
+            FROM gene_articles WHERE gene_symbol = %s
+            """, (CARD_REFRESH_TTL, gene_symbol))
+            row = cur.fetchone()
+            return (row[0], row[1], row[2]) if row and row[0] else None
+
+    async def aload(self, gene_symbol: str) -> tuple[str, dict | None, bool] | None:
+        pool = await get_async_pool()
+        row = await pool.fetchrow("""
+            SELECT article, card,
+                   card_updated_at IS NOT NULL
+                   AND card_updated_at > now() - make_interval(secs => $1)
+            FROM gene_articles WHERE gene_symbol = $2
+            """, float(CARD_REFRESH_TTL), gene_symbol)
+        return (row[0], row[1], row[2]) if row and row[0] else None
+
+    async def asave_card(self, gene_symbol: str, card: dict):
+        pool = await get_async_pool()
+        await pool.execute("""
+            UPDATE gene_articles SET card = $1, card_updated_at = now()
+            WHERE gene_symbol = $2
+            """, card, gene_symbol)
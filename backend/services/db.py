@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import asyncpg
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class PgPool:
+    """
+    Bounded, thread-safe psycopg2 connection pool.
+
+    - at most `maxconn` connections exist at any time, callers wait up to
+      `acquire_timeout` seconds for a free one and get PoolTimeout otherwise;
+    - idle connections are health-checked with `SELECT 1` before reuse once
+      they have been idle for longer than `check_after` seconds, broken ones
+      are replaced transparently;
+    - a connection is always handed back clean: the transaction is committed
+      when the block succeeds and rolled back when it raises.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, acquire_timeout=10.0, check_after=30.0, **conn_kwargs):
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool bounds: min={minconn} max={maxconn}")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self.check_after = check_after
+        self._conn_kwargs = conn_kwargs
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._idle: list = []  # [(conn, last_used)]
+        self._closed = False
+
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        return psycopg2.connect(**self._conn_kwargs)
+
+    def _healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+            if self._healthy(conn, last_used):
+                return conn
+            self._discard(conn)
+        return self._connect()
+
+    def _checkin(self, conn):
+        if conn.closed or self._closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        if self._closed:
+            raise PoolTimeout("Pool is closed")
+        timeout = self.acquire_timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeout(f"No database connection available within {timeout}s (max={self.maxconn})")
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        try:
+            yield conn
+            if not conn.closed:
+                conn.commit()
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            raise
+        finally:
+            self._checkin(conn)
+            self._slots.release()
+
+    @contextmanager
+    def cursor(self, timeout: float | None = None):
+        with self.connection(timeout) as conn:
+            with conn.cursor() as cur:
+                yield cur
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {"max": self.maxconn, "idle": idle}
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> PgPool:
+    """Process-wide pool configured from the PG_* environment variables."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PgPool(
+                    minconn=int(os.environ.get("PG_POOL_MIN", 1)),
+                    maxconn=int(os.environ.get("PG_POOL_MAX", 10)),
+                    acquire_timeout=float(os.environ.get("PG_POOL_TIMEOUT", 10)),
+                    **_psycopg_settings(),
+                )
+    return _pool
+
+
+def _psycopg_settings() -> dict:
+    settings = _pg_settings()
+    settings["dbname"] = settings.pop("database")
+    return settings
+
+
+def _pg_settings() -> dict:
+    return {
+        "host": os.environ["PG_HOST"],
+        "port": int(os.environ.get("PG_PORT", 5432)),
+        "database": os.environ["PG_DB"],
+        "user": os.environ["PG_USER"],
+        "password": os.environ["PG_PASSWORD"],
+    }
+
+
+async def _init_async_connection(conn):
+    # Decode JSON/JSONB to Python objects like psycopg2 does.
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(typename, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+_async_pool = None
+_async_pool_lock: asyncio.Lock | None = None
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """
+    Process-wide asyncpg pool for the request path, sized by the same
+    PG_POOL_* variables as the sync pool. Must be used from one event loop.
+    """
+    global _async_pool, _async_pool_lock
+    if _async_pool is None:
+        if _async_pool_lock is None:
+            _async_pool_lock = asyncio.Lock()
+        async with _async_pool_lock:
+            if _async_pool is None:
+                _async_pool = await asyncpg.create_pool(
+                    min_size=int(os.environ.get("PG_POOL_MIN", 1)),
+                    max_size=int(os.environ.get("PG_POOL_MAX", 10)),
+                    timeout=float(os.environ.get("PG_POOL_TIMEOUT", 10)),
+                    max_inactive_connection_lifetime=300,
+                    init=_init_async_connection,
+                    **_pg_settings(),
+                )
+    return _async_pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        pool, _async_pool = _async_pool, None
+        await pool.close()
@@ -0,0 +1,63 @@
+import asyncio
+
+from backend.services.uniprot_source import UniProtSource
+from backend.services.ncbi_source import NcbiSource
+
+
+class GeneCardSource:
+    """
+    Fetches the structured UniProt/NCBI fields shown next to the article.
+    fetch()/afetch() return the card and whether both upstream calls succeeded.
+    """
+
+    def __init__(self):
+        self.uniprot = UniProtSource()
+        self.ncbi = NcbiSource()
+
+    def fetch(self, gene_symbol: str) -> tuple[dict, bool]:
+        complete = True
+        try:
+            u = self.uniprot.fetch(gene_symbol)
+        except Exception as e:
+            print(f"UniProt fetch failed: {e}")
+            u, complete = {}, False
+
+        try:
+            n = self.ncbi.fetch(gene_symbol)
+        except Exception as e:
+            print(f"NCBI fetch failed: {e}")
+            n, complete = {}, False
+
+        return self._build_card(u, n), complete
+
+    async def afetch(self, gene_symbol: str) -> tuple[dict, bool]:
+        u, n = await asyncio.gather(
+            self.uniprot.afetch(gene_symbol),
+            self.ncbi.afetch(gene_symbol),
+            return_exceptions=True,
+        )
+        complete = True
+        if isinstance(u, Exception):
+            print(f"UniProt fetch failed: {u}")
+            u, complete = {}, False
+        if isinstance(n, Exception):
+            print(f"NCBI fetch failed: {n}")
+            n, complete = {}, False
+        return self._build_card(u, n), complete
+
+    async def aclose(self):
+        await asyncio.gather(self.uniprot.aclose(), self.ncbi.aclose())
+
+    @staticmethod
+    def _build_card(u: dict, n: dict) -> dict:
+        return {
+            "primaryAccession": u.get("primaryAccession"),
+            "function": u.get("function"),
+            "synonyms": u.get("synonyms") or [],
+            "longevity_association": n.get("longevity_association"),
+            "modification_effects": u.get("modification_effects"),
+            "dna_sequence": n.get("dna_sequence"),
+            "interval_in_dna_sequence": n.get("interval_in_dna_sequence"),
+            "protein_sequence": u.get("protein_sequence"),
+            "externalLink": n.get("external_link") or u.get("external_link"),
+        }
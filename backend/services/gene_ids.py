@@ -0,0 +1,141 @@
+import os
+from dataclasses import asdict, dataclass, field
+
+from backend.services.http_client import HttpClient
+from backend.utils.hgnc_index import HgncIndex, HgncRecord, get_hgnc_index
+from backend.utils.ttl_cache import TTLCache
+
+HGNC_REST = "https://rest.genenames.org"
+# Resolved identifiers are kept in memory this long (seconds).
+GENE_IDS_CACHE_TTL = float(os.environ.get("GENE_IDS_CACHE_TTL", 24 * 3600))
+
+
+@dataclass
+class GeneIds:
+    """Cross-database identifiers of one human gene; fields are None when unknown."""
+    query: str
+    symbol: str | None = None
+    hgnc_id: str | None = None
+    entrez_id: str | None = None
+    uniprot: str | None = None
+    uniprot_ids: list[str] = field(default_factory=list)
+    kegg: str | None = None
+    ensembl: str | None = None
+
+    @property
+    def resolved(self) -> bool:
+        return self.symbol is not None
+
+    @property
+    def name(self) -> str:
+        """Symbol to query sources with: the approved one when known."""
+        return self.symbol or self.query
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def describe(self) -> str:
+        """Identifier block for agent prompts."""
+        rows = [
+            ("HGNC symbol", self.symbol),
+            ("HGNC ID", self.hgnc_id),
+            ("NCBI Gene (Entrez) ID", self.entrez_id),
+            ("UniProt accession", ", ".join(self.uniprot_ids) or None),
+            ("KEGG gene entry", self.kegg),
+            ("Ensembl gene ID", self.ensembl),
+        ]
+        return "\n".join(f"- {label}: {value}" for label, value in rows if value)
+
+
+class GeneIdResolver:
+    """
+    Maps a gene symbol (approved, alias or previous) to HGNC, Entrez, UniProt,
+    KEGG and Ensembl identifiers, so the source agents no longer spend LLM
+    steps searching for them. The local HGNC index answers first; HGNC REST
+    is only asked about symbols missing from the snapshot.
+    """
+
+    def __init__(self, http: HttpClient | None = None, cache_ttl: float = GENE_IDS_CACHE_TTL,
+                 index: HgncIndex | None = None):
+        self.http = http or HttpClient()
+        self.index = index or get_hgnc_index()
+        self._cache = TTLCache(maxsize=4096, ttl=cache_ttl)
+
+    def resolve(self, gene_symbol: str) -> GeneIds:
+        query = gene_symbol.strip()
+        ids = self._cache.get(query.upper())
+        if ids is not None:
+            return ids
+
+        record = self.index.record(query)
+        if record is not None:
+            ids = self._from_record(query, record)
+            self._cache.set(query.upper(), ids)
+            return ids
+
+        doc = None
+        for field_name in ("symbol", "alias_symbol", "prev_symbol"):
+            doc = self._fetch(field_name, query)
+            if doc:
+                break
+
+        ids = GeneIds(query=query) if doc is None else self._from_hgnc(query, doc)
+        if ids.resolved:
+            self._cache.set(query.upper(), ids)
+        return ids
+
+    def is_known(self, gene_symbol: str) -> bool:
+        """
+        Whether HGNC has any gene under this name. Unlike resolve(), an alias or
+        previous symbol shared by several genes counts as known.
+        """
+        query = gene_symbol.strip()
+        if len(self.index):
+            return self.index.known(query)
+        if self.resolve(query).resolved:
+            return True
+        return any(self._docs(field_name, query) for field_name in ("alias_symbol", "prev_symbol"))
+
+    def _docs(self, field_name: str, value: str) -> list[dict]:
+        data = self.http.get(
+            f"{HGNC_REST}/fetch/{field_name}/{value}",
+            headers={"Accept": "application/json"},
+        )
+        if not isinstance(data, dict):
+            return []
+        return (data.get("response") or {}).get("docs") or []
+
+    def _fetch(self, field_name: str, value: str) -> dict | None:
+        docs = self._docs(field_name, value)
+        # Alias/previous symbols can be ambiguous; only trust a unique hit.
+        if len(docs) == 1 or (docs and field_name == "symbol"):
+            return docs[0]
+        return None
+
+    @staticmethod
+    def _from_record(query: str, record: HgncRecord) -> GeneIds:
+        return GeneIds(
+            query=query,
+            symbol=record.symbol,
+            hgnc_id=record.hgnc_id,
+            entrez_id=record.entrez_id,
+            uniprot=record.uniprot_ids[0] if record.uniprot_ids else None,
+            uniprot_ids=list(record.uniprot_ids),
+            kegg=f"hsa:{record.entrez_id}" if record.entrez_id else None,
+            ensembl=record.ensembl_gene_id,
+        )
+
+    @staticmethod
+    def _from_hgnc(query: str, doc: dict) -> GeneIds:
+        entrez = doc.get("entrez_id")
+        uniprot_ids = list(doc.get("uniprot_ids") or [])
+        return GeneIds(
+            query=query,
+            symbol=doc.get("symbol"),
+            hgnc_id=doc.get("hgnc_id"),
+            entrez_id=str(entrez) if entrez else None,
+            uniprot=uniprot_ids[0] if uniprot_ids else None,
+            uniprot_ids=uniprot_ids,
+            kegg=f"hsa:{entrez}" if entrez else None,
+            ensembl=doc.get("ensembl_gene_id"),
+        )
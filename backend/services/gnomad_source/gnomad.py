@@ -1,11 +1,13 @@
 #https://github.com/rzemcog/gnomad-mcp-server
 
-from smolagents import ToolCollection, OpenAIServerModel, ToolCallingAgent
+from smolagents import ToolCallingAgent
+from backend.services.llm import NEBIUS_API_BASE, get_model
 from mcp import StdioServerParameters
-import os
+from backend.services.mcp_tools import open_tools, step_callbacks
 from backend.utils.alias_resolver import resolve_gene_alias_to_official 
 
 MODEL = "Qwen/Qwen3-235B-A22B-Thinking-2507"
+PROMPT_VERSION = 2
 
 def set_server(server_name="gnomad-mcp-server"):
     server = StdioServerParameters(
@@ -16,17 +18,11 @@ def set_server(server_name="gnomad-mcp-server"):
 
 def set_model(
     model_name=MODEL,
-    api_key=os.environ["NEBIUS_API_KEY"],
-    api_base="https://api.studio.nebius.com/v1/",
+    api_key=None,
+    api_base=NEBIUS_API_BASE,
     temperature=0,
 ):
-    model = OpenAIServerModel(
-        model_id=model_name,
-        api_key=api_key,
-        api_base=api_base,
-        temperature=temperature,
-    )
-    return model
+    return get_model(model_name, temperature=temperature, api_key=api_key, api_base=api_base)
 
 SYSTEM_PROMPT = """
 You are an expert bioinformatician assistant. 
@@ -39,10 +35,11 @@ potential functional impact of the identified variants.
 Include source URLs.
 """
 
-def set_user_prompt(GENE_QUERY):
+def set_user_prompt(GENE_QUERY, ensembl_id=None):
+    gene_id_hint = f"Its Ensembl gene ID is {ensembl_id}; use it where a tool expects a gene ID.\n" if ensembl_id else ""
     return f"""
 Analyze gene '{GENE_QUERY}' in gnomAD v4.1.0. 
-Find variants with ClinVar significance 'Pathogenic', 'Likely pathogenic', or 'Pathogenic/Likely pathogenic'.
+{gene_id_hint}Find variants with ClinVar significance 'Pathogenic', 'Likely pathogenic', or 'Pathogenic/Likely pathogenic'.
 Summarize their clinical significance and potential functional impact based on gnomAD data. 
 Provide source URLs. 
 If none found, state: 'No qualifying variants found in gnomAD v4.1.0 for gene {GENE_QUERY}.'
@@ -51,15 +48,20 @@ If none found, state: 'No qualifying variants found in gnomAD v4.1.0 for gene {G
 def run_query(
         gene,
         server=set_server(),
-        model=set_model(),
+        model=None,
         trust_remote_code=True,
-        structured_output=False
+        structured_output=False,
+        ids=None
 ):
-    prepared_gene_name = resolve_gene_alias_to_official(gene)
+    model = model or set_model()
+    if ids is not None and ids.symbol:
+        prepared_gene_name = ids.symbol
+    else:
+        prepared_gene_name = resolve_gene_alias_to_official(gene)
     system_prompt = SYSTEM_PROMPT
-    user_prompt = set_user_prompt(prepared_gene_name)
-    with ToolCollection.from_mcp(
-        server_parameters=server,
+    user_prompt = set_user_prompt(prepared_gene_name, ids.ensembl if ids is not None else None)
+    with open_tools(
+        server,
         trust_remote_code=trust_remote_code,
         structured_output=structured_output
     ) as tools:
@@ -68,6 +70,7 @@ def run_query(
             tools=[*tools.tools],
             add_base_tools=False,
             max_steps=5,
+            step_callbacks=step_callbacks(),
         )
         agent.prompt_templates["system_prompt"] = system_prompt
         result = agent.run(user_prompt)
@@ -1,24 +1,285 @@
-import requests, time, logging
+"""
+Outbound HTTP for the upstream databases (UniProt, NCBI, HGNC, PubMed...).
 
-class HttpClient:
-    def __init__(self, retries=3, delay=1):
-        self.retries = retries
+All HttpClient / AsyncHttpClient instances share one keep-alive pool per
+process (sync and async), so repeated calls to the same host reuse open
+connections. Failed requests are retried with exponential backoff and full
+jitter, but only for transport errors and retryable statuses (408, 425, 429,
+5xx); a Retry-After header from the server takes precedence over the backoff.
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", 20))
+HTTP_HTTP2 = os.environ.get("HTTP_HTTP2", "1") == "1"
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 3))
+# Backoff before retry n is uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2**n)) seconds.
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", 0.5))
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", 30))
+# Longest Retry-After we are willing to sleep for before giving up on the request.
+HTTP_RETRY_AFTER_MAX = float(os.environ.get("HTTP_RETRY_AFTER_MAX", 60))
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+_lock = threading.Lock()
+_sync_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+
+
+def _http2_enabled() -> bool:
+    if not HTTP_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+
+
+def get_sync_client() -> httpx.Client:
+    global _sync_client
+    if _sync_client is None:
+        with _lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(http2=_http2_enabled(), limits=_limits(), follow_redirects=True)
+    return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = httpx.AsyncClient(http2=_http2_enabled(), limits=_limits(), follow_redirects=True)
+    return _async_client
+
+
+def close_sync_client():
+    global _sync_client
+    with _lock:
+        client, _sync_client = _sync_client, None
+    if client is not None:
+        client.close()
+
+
+async def close_async_client():
+    global _async_client
+    with _lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
+
+
+class HostStats:
+    """Per-host request counters, shared by the sync and async clients."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict] = {}
+
+    def record(self, host: str, status: int | None, elapsed: float, retried: bool):
+        with self._lock:
+            s = self._hosts.setdefault(host, {
+                "requests": 0, "retries": 0, "errors": 0, "seconds": 0.0, "statuses": {},
+            })
+            s["requests"] += 1
+            s["seconds"] += elapsed
+            if retried:
+                s["retries"] += 1
+            if status is None:
+                s["errors"] += 1
+            else:
+                s["statuses"][status] = s["statuses"].get(status, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                host: {
+                    "requests": s["requests"],
+                    "retries": s["retries"],
+                    "errors": s["errors"],
+                    "statuses": dict(s["statuses"]),
+                    "avg_latency_ms": round(1000 * s["seconds"] / s["requests"], 1),
+                }
+                for host, s in self._hosts.items()
+            }
+
+
+host_stats = HostStats()
+
+
+def http_stats() -> dict:
+    return host_stats.stats()
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _RetryPolicy:
+    def __init__(self, retries: int, delay: float):
+        self.retries = max(1, retries)
         self.delay = delay
-        self.session = requests.Session()
 
-    def get(self, url, params=None, headers=None, timeout=10):
-        last_exc = None
-        for attempt in range(self.retries):
+    def backoff(self, attempt: int, response: httpx.Response | None) -> float | None:
+        """Seconds to wait before the next attempt, or None when the request should not be retried."""
+        if attempt + 1 >= self.retries:
+            return None
+        if response is not None:
+            if response.status_code not in RETRYABLE_STATUSES:
+                return None
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return retry_after if retry_after <= HTTP_RETRY_AFTER_MAX else None
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, self.delay * 2 ** attempt))
+
+
+def _decode(r: httpx.Response):
+    try:
+        return r.json()
+    except ValueError:
+        return r.text
+
+
+class HttpClient:
+    """
+    Blocking client over the shared pool. get() returns parsed JSON or text,
+    or the httpx.Response itself with raw=True; stream() yields a response
+    whose body has not been read yet, for large downloads.
+    """
+
+    def __init__(self, retries=HTTP_RETRIES, delay=HTTP_BACKOFF_BASE):
+        self.policy = _RetryPolicy(retries, delay)
+
+    @property
+    def client(self) -> httpx.Client:
+        return get_sync_client()
+
+    def request(self, method, url, params=None, headers=None, timeout=10, raw=False, **kwargs):
+        r = self._send(method, url, params=params, headers=headers, timeout=timeout, **kwargs)
+        return r if raw else _decode(r)
+
+    def get(self, url, params=None, headers=None, timeout=10, raw=False):
+        return self.request("GET", url, params=params, headers=headers, timeout=timeout, raw=raw)
+
+    def post(self, url, data=None, params=None, headers=None, timeout=10, raw=False):
+        return self.request("POST", url, params=params, headers=headers, timeout=timeout, raw=raw, data=data)
+
+    @contextmanager
+    def stream(self, method, url, params=None, headers=None, timeout=30, **kwargs):
+        r = self._send(method, url, params=params, headers=headers, timeout=timeout, stream=True, **kwargs)
+        try:
+            yield r
+        finally:
+            r.close()
+
+    def _send(self, method, url, stream=False, **kwargs) -> httpx.Response:
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            logging.debug(f'{method} {url} params={kwargs.get("params")}')
+            started = time.perf_counter()
+            response = None
             try:
-                logging.debug(f'GET {url} params={params}')
-                r = self.session.get(url, params=params, headers=headers, timeout=timeout)
-                r.raise_for_status()
-                try:
-                    return r.json()
-                except ValueError:
-                    return r.text
-            except Exception as e:
-                last_exc = e
-                logging.warning(f'Request error ({attempt+1}/{self.retries}) to {url}: {e}')
-                time.sleep(self.delay)
-        raise last_exc
+                request = self.client.build_request(method, url, **kwargs)
+                response = self.client.send(request, stream=stream)
+                host_stats.record(host, response.status_code, time.perf_counter() - started, attempt > 0)
+                if response.is_success:
+                    return response
+                if stream:
+                    response.read()
+                response.raise_for_status()
+                return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if response is None:
+                    host_stats.record(host, None, time.perf_counter() - started, attempt > 0)
+                wait = self.policy.backoff(attempt, response)
+                if wait is None:
+                    raise
+                logging.warning(f'Request error ({attempt+1}/{self.policy.retries}) to {url}: {e}; retrying in {wait:.1f}s')
+                time.sleep(wait)
+                attempt += 1
+
+
+class AsyncHttpClient:
+    """asyncio counterpart of HttpClient with the same retry semantics."""
+
+    def __init__(self, retries=HTTP_RETRIES, delay=HTTP_BACKOFF_BASE):
+        self.policy = _RetryPolicy(retries, delay)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_async_client()
+
+    async def request(self, method, url, params=None, headers=None, timeout=10, raw=False, **kwargs):
+        r = await self._send(method, url, params=params, headers=headers, timeout=timeout, **kwargs)
+        return r if raw else _decode(r)
+
+    async def get(self, url, params=None, headers=None, timeout=10, raw=False):
+        return await self.request("GET", url, params=params, headers=headers, timeout=timeout, raw=raw)
+
+    async def post(self, url, data=None, params=None, headers=None, timeout=10, raw=False):
+        return await self.request("POST", url, params=params, headers=headers, timeout=timeout, raw=raw, data=data)
+
+    @asynccontextmanager
+    async def stream(self, method, url, params=None, headers=None, timeout=30, **kwargs):
+        r = await self._send(method, url, params=params, headers=headers, timeout=timeout, stream=True, **kwargs)
+        try:
+            yield r
+        finally:
+            await r.aclose()
+
+    async def _send(self, method, url, stream=False, **kwargs) -> httpx.Response:
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            logging.debug(f'{method} {url} params={kwargs.get("params")}')
+            started = time.perf_counter()
+            response = None
+            try:
+                request = self.client.build_request(method, url, **kwargs)
+                response = await self.client.send(request, stream=stream)
+                host_stats.record(host, response.status_code, time.perf_counter() - started, attempt > 0)
+                if response.is_success:
+                    return response
+                if stream:
+                    await response.aread()
+                response.raise_for_status()
+                return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if response is None:
+                    host_stats.record(host, None, time.perf_counter() - started, attempt > 0)
+                wait = self.policy.backoff(attempt, response)
+                if wait is None:
+                    raise
+                logging.warning(f'Request error ({attempt+1}/{self.policy.retries}) to {url}: {e}; retrying in {wait:.1f}s')
+                await asyncio.sleep(wait)
+                attempt += 1
+
+    async def aclose(self):
+        """Closes the shared async pool; call once on shutdown."""
+        await close_async_client()
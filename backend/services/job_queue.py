@@ -0,0 +1,233 @@
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from backend.services.db import PgPool, get_pool, get_async_pool
+
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+
+
+@dataclass
+class Enqueued:
+    """Pending job for a gene; position is 0 while running, else 1-based among queued jobs."""
+    job_id: int
+    state: str
+    position: int
+    created: bool
+
+
+@dataclass
+class Job:
+    id: int
+    gene_symbol: str
+    attempts: int
+    worker_id: str
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class JobQueue:
+    """
+    Durable gene generation queue stored in the `gene_jobs` table.
+
+    Jobs move queued -> running -> done | failed. A worker claims the oldest
+    claimable job with FOR UPDATE SKIP LOCKED, so any number of worker
+    processes on any number of nodes can drain the table concurrently.
+    A running job holds a lease that its worker extends with heartbeats;
+    when a worker dies the lease expires and the job is claimed again until
+    it has used up `max_attempts`.
+    """
+
+    def __init__(self, pool: PgPool | None = None, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.pool = pool or get_pool()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def ensure_table(self):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS gene_jobs (
+                id BIGSERIAL PRIMARY KEY,
+                gene_symbol TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued'
+                    CHECK (state IN ('queued', 'running', 'done', 'failed')),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_expires_at TIMESTAMPTZ,
+                last_error TEXT,
+                enqueued_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                started_at TIMESTAMPTZ,
+                heartbeat_at TIMESTAMPTZ,
+                finished_at TIMESTAMPTZ
+            )
+            """)
+            cur.execute("""
+            CREATE INDEX IF NOT EXISTS gene_jobs_pending_idx
+            ON gene_jobs (enqueued_at) WHERE state IN ('queued', 'running')
+            """)
+            # At most one pending job per gene. Duplicates left over from before
+            # the index existed are retired first so it can be built.
+            cur.execute("""
+            UPDATE gene_jobs j SET state = 'failed', finished_at = now(),
+                last_error = 'duplicate of an earlier pending job'
+            WHERE j.state IN ('queued', 'running') AND EXISTS (
+                SELECT 1 FROM gene_jobs o
+                WHERE o.gene_symbol = j.gene_symbol AND o.state IN ('queued', 'running')
+                  AND (o.enqueued_at, o.id) < (j.enqueued_at, j.id)
+            )
+            """)
+            cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS gene_jobs_pending_gene_idx
+            ON gene_jobs (gene_symbol) WHERE state IN ('queued', 'running')
+            """)
+
+    # Pending job of a gene with its place in the queue.
+    _PENDING_SQL = """
+    SELECT j.id, j.state,
+           CASE WHEN j.state = 'running' THEN 0 ELSE (
+               SELECT count(*) FROM gene_jobs q
+               WHERE q.state = 'queued' AND (q.enqueued_at, q.id) <= (j.enqueued_at, j.id)
+           ) END
+    FROM gene_jobs j
+    WHERE j.gene_symbol = {gene} AND j.state IN ('queued', 'running')
+    """
+    _INSERT_SQL = """
+    INSERT INTO gene_jobs (gene_symbol) VALUES ({gene})
+    ON CONFLICT (gene_symbol) WHERE state IN ('queued', 'running') DO NOTHING
+    RETURNING id
+    """
+
+    def enqueue(self, gene_symbol: str) -> Enqueued:
+        """
+        Idempotent per gene: returns the gene's pending job, creating it only
+        when there is none, so polling a generating gene never grows the queue.
+        """
+        pending_sql = self._PENDING_SQL.format(gene="%s")
+        insert_sql = self._INSERT_SQL.format(gene="%s")
+        created = False
+        # Each statement runs in its own transaction so the lookup after a
+        # conflicting insert sees the other writer's committed job.
+        for _ in range(3):
+            with self.pool.cursor() as cur:
+                cur.execute(pending_sql, (gene_symbol,))
+                row = cur.fetchone()
+            if row:
+                return Enqueued(job_id=row[0], state=row[1], position=row[2], created=created)
+            with self.pool.cursor() as cur:
+                cur.execute(insert_sql, (gene_symbol,))
+                created = cur.fetchone() is not None
+        raise RuntimeError(f"Could not enqueue {gene_symbol}")
+
+    async def aenqueue(self, gene_symbol: str) -> Enqueued:
+        pool = await get_async_pool()
+        pending_sql = self._PENDING_SQL.format(gene="$1")
+        insert_sql = self._INSERT_SQL.format(gene="$1")
+        created = False
+        for _ in range(3):
+            row = await pool.fetchrow(pending_sql, gene_symbol)
+            if row:
+                return Enqueued(job_id=row[0], state=row[1], position=row[2], created=created)
+            created = await pool.fetchval(insert_sql, gene_symbol) is not None
+        raise RuntimeError(f"Could not enqueue {gene_symbol}")
+
+    def size(self) -> int:
+        with self.pool.cursor() as cur:
+            cur.execute("SELECT count(*) FROM gene_jobs WHERE state = 'queued'")
+            return cur.fetchone()[0]
+
+    async def asize(self) -> int:
+        pool = await get_async_pool()
+        return await pool.fetchval("SELECT count(*) FROM gene_jobs WHERE state = 'queued'")
+
+    def claim(self, worker_id: str | None = None) -> Job | None:
+        """Claims the oldest queued job, or a running one whose lease has expired."""
+        worker_id = worker_id or default_worker_id()
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            UPDATE gene_jobs SET
+                state = 'failed', finished_at = now(), worker_id = NULL,
+                lease_expires_at = NULL, last_error = 'lease expired after final attempt'
+            WHERE state = 'running' AND lease_expires_at < now() AND attempts >= %s
+            """, (self.max_attempts,))
+            cur.execute("""
+            UPDATE gene_jobs SET
+                state = 'running',
+                attempts = attempts + 1,
+                worker_id = %s,
+                started_at = now(),
+                heartbeat_at = now(),
+                lease_expires_at = now() + make_interval(secs => %s)
+            WHERE id = (
+                SELECT id FROM gene_jobs
+                WHERE state = 'queued'
+                   OR (state = 'running' AND lease_expires_at < now())
+                ORDER BY enqueued_at
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id, gene_symbol, attempts
+            """, (worker_id, self.lease_seconds))
+            row = cur.fetchone()
+        if not row:
+            return None
+        return Job(id=row[0], gene_symbol=row[1], attempts=row[2], worker_id=worker_id)
+
+    def heartbeat(self, job: Job) -> bool:
+        """Extends the lease; False means the job was lost to another worker."""
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            UPDATE gene_jobs SET
+                heartbeat_at = now(),
+                lease_expires_at = now() + make_interval(secs => %s)
+            WHERE id = %s AND worker_id = %s AND state = 'running'
+            """, (self.lease_seconds, job.id, job.worker_id))
+            return cur.rowcount == 1
+
+    def complete(self, job: Job):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            UPDATE gene_jobs SET
+                state = 'done', finished_at = now(), lease_expires_at = NULL, last_error = NULL
+            WHERE id = %s AND worker_id = %s
+            """, (job.id, job.worker_id))
+
+    def fail(self, job: Job, error: str):
+        """Puts the job back in the queue, or marks it failed after the last attempt."""
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            UPDATE gene_jobs SET
+                state = CASE WHEN attempts >= %s THEN 'failed' ELSE 'queued' END,
+                finished_at = CASE WHEN attempts >= %s THEN now() ELSE NULL END,
+                worker_id = NULL,
+                lease_expires_at = NULL,
+                last_error = %s
+            WHERE id = %s AND worker_id = %s
+            """, (self.max_attempts, self.max_attempts, error, job.id, job.worker_id))
+
+    @contextmanager
+    def leased(self, job: Job):
+        """Keeps the job's lease alive with background heartbeats while the block runs."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    if not self.heartbeat(job):
+                        print(f"[QUEUE] Lost lease on job {job.id} ({job.gene_symbol})")
+                        return
+                except Exception as e:
+                    print(f"[QUEUE] Heartbeat failed for job {job.id}: {e}")
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job.id}", daemon=True)
+        thread.start()
+        try:
+            yield job
+        finally:
+            stop.set()
+            thread.join()
@@ -1,10 +1,14 @@
 # How to launch MCP server
 # https://github.com/Augmented-Nature/KEGG-MCP-Server
 
-from smolagents import ToolCollection, ToolCallingAgent, OpenAIServerModel
+from smolagents import ToolCallingAgent
+from backend.services.llm import NEBIUS_API_BASE, get_model
 from mcp import StdioServerParameters
-import os
 import json
+from backend.services.mcp_tools import open_tools, step_callbacks
+
+MODEL = "Qwen/Qwen3-235B-A22B-Instruct-2507"
+PROMPT_VERSION = 2
 
 
 # config
@@ -17,18 +21,12 @@ def set_server(server_name="kegg-mcp-server"):
 
 
 def set_model(
-    api_key=os.environ["NEBIUS_API_KEY"],
-    api_base="https://api.studio.nebius.com/v1/",
+    api_key=None,
+    api_base=NEBIUS_API_BASE,
     temperature=0,
-    model_name="Qwen/Qwen3-235B-A22B-Instruct-2507"
+    model_name=MODEL
 ):
-    model = OpenAIServerModel(
-        model_id=model_name,
-        api_key=api_key,
-        api_base=api_base,
-        temperature=temperature,
-    )
-    return model
+    return get_model(model_name, temperature=temperature, api_key=api_key, api_base=api_base)
 
 
 SYSTEM_PROMPT = '''
@@ -54,7 +52,16 @@ Return the result in a structured format: JSON or Markdown table with clear sect
 '''
 
 
-def user_prompt_kegg(gene_symbol):
+def set_known_entry(ids=None):
+    if ids is None or not ids.kegg:
+        return ""
+    return (
+        f"   - The KEGG gene entry is already known: {ids.kegg} (from the HGNC Entrez ID). "
+        "Skip `search_genes` and call `get_gene_info` on it directly.\n"
+    )
+
+
+def user_prompt_kegg(gene_symbol, ids=None):
     return f"""
 You are a bioinformatics extraction agent connected exclusively to the KEGG MCP server.
 Your task is to retrieve all relevant KEGG data for a given human gene or protein.
@@ -83,7 +90,7 @@ Species: Homo sapiens
 ### TASKS
 
 1. **Locate KEGG gene entry**
-   - Use `search_genes` with the symbol and organism.
+{set_known_entry(ids)}   - Use `search_genes` with the symbol and organism.
    - Extract: KEGG ID (e.g. "hsa:348"), gene name, KO (K-number), genomic position, strand, start, end.
 
 2. **Retrieve detailed gene info**
@@ -218,18 +225,16 @@ Return only the final JSON object as described in the OUTPUT SCHEMA section (no
 
 
 def run_query(
-    gene
+    gene,
+    ids=None
 ):
-    with ToolCollection.from_mcp(
-        server_parameters=set_server(),
-        trust_remote_code=True,
-        structured_output=False
-    ) as tools:
+    with open_tools(set_server()) as tools:
         agent = ToolCallingAgent(
             model=set_model(),
             tools=[*tools.tools],
             add_base_tools=False,
             max_steps=10,
+            step_callbacks=step_callbacks(),
         )
         agent.prompt_templates["system_prompt"] = SYSTEM_PROMPT
-        return agent.run(user_prompt_kegg(gene))
+        return agent.run(user_prompt_kegg(gene, ids))
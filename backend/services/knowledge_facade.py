@@ -1,195 +1,232 @@
-import hashlib
+import asyncio
 import os
-import time
-import threading
-from queue import Queue, Empty
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import psycopg2
-
-from backend.services.aggregation import agg
-from backend.services.mcp_uniprot_source import uniprot
-from backend.services.kegg_source import kegg
-from backend.services.open_genes_source import opengenes
-from backend.services.uniprot_source import UniProtSource
-from backend.services.ncbi_source import NcbiSource
-from backend.services.gnomad_source import gnomad
-from backend.services.ncbi_mcp_server import ncbi_mcp_server
+
+from backend.services.article_store import ArticleStore, CHANGED_CHANNEL
+from backend.services.gene_card import GeneCardSource
+from backend.services.db import get_pool, get_async_pool, close_async_pool
+from backend.services.job_queue import JobQueue, Enqueued
+from backend.services.gene_ids import GeneIdResolver
+from backend.services.unknown_genes import UnknownGeneStore
 from backend.models.gene_response import GeneResponse
+from backend.utils.single_flight import SingleFlight, AsyncSingleFlight
+from backend.utils.ttl_cache import TTLCache
+from backend.utils.hgnc_index import get_hgnc_index
+
+# In-process cache of ready /search payloads for hot genes.
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 1024))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", 300))
+
+# Run the generation worker inside the API process. Set EMBEDDED_WORKER=0 on
+# API replicas when pipelines run in separate `python -m backend.worker` processes.
+EMBEDDED_WORKER = os.environ.get("EMBEDDED_WORKER", "1") == "1"
+
+# In-process front of the unknown_genes negative cache.
+UNKNOWN_CACHE_SIZE = int(os.environ.get("UNKNOWN_CACHE_SIZE", 4096))
+
 
 class KnowledgeBaseFacade:
-    def __init__(self):
-        self.conn = psycopg2.connect(
-            host=os.environ["PG_HOST"],
-            port=os.environ.get("PG_PORT", 5432),
-            dbname=os.environ["PG_DB"],
-            user=os.environ["PG_USER"],
-            password=os.environ["PG_PASSWORD"]
-        )
-        self.uniprot = UniProtSource()
-        self.ncbi = NcbiSource()
-        self._cache_lock = threading.Lock()
-
-        self._ensure_table()
-
-        self._queue = Queue()
-        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self._worker_thread.start()
-        print("[QUEUE] Worker thread started")
-    def _ensure_table(self):
-        with self.conn.cursor() as cur:
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS gene_articles (
-                gene_symbol TEXT PRIMARY KEY,
-                article TEXT
-            )
-            """)
-            self.conn.commit()
-
-    def _save_to_db(self, gene_symbol: str, article: str):
-        with self.conn.cursor() as cur:
-            cur.execute("""
-            INSERT INTO gene_articles (gene_symbol, article)
-            VALUES (%s, %s)
-            ON CONFLICT (gene_symbol) DO UPDATE
-            SET article = EXCLUDED.article
-            """, (gene_symbol, article))
-            self.conn.commit()
-
-    def _load_from_db(self, gene_symbol: str) -> str | None:
-        with self.conn.cursor() as cur:
-            cur.execute("SELECT article FROM gene_articles WHERE gene_symbol = %s", (gene_symbol,))
-            row = cur.fetchone()
-            return row[0] if row else None
-
-    def _worker_loop(self):
-        while True:
-            try:
-                gene_symbol = self._queue.get(timeout=1)
-            except Empty:
-                continue
-
-            try:
-                print(f"[QUEUE] Processing gene: {gene_symbol}")
-                self._agentic_pipeline(gene_symbol)
-            except Exception as e:
-                print(f"[ERROR] Failed processing {gene_symbol}: {e}")
-            finally:
-                self._queue.task_done()
-
-    def _agentic_pipeline(self, gene_symbol: str) -> str:
-        start = time.perf_counter()
-        key = int(hashlib.sha256(gene_symbol.encode()).hexdigest(), 16) % (2**31)
-
-        with psycopg2.connect(
-                host=os.environ["PG_HOST"],
-                port=os.environ.get("PG_PORT", 5432),
-                dbname=os.environ["PG_DB"],
-                user=os.environ["PG_USER"],
-                password=os.environ["PG_PASSWORD"]
-        ) as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT pg_try_advisory_lock(%s)", (key,))
-                locked = cur.fetchone()[0]
-
-                if not locked:
-                    print(f"[LOCK] Another process is already generating article for {gene_symbol}")
-                    return f"Article generation for {gene_symbol} is already in progress."
-
-                try:
-                    funcs = [
-                        uniprot.run_query,
-                        kegg.run_query,
-                        opengenes.run_query,
-                        gnomad.run_query,
-                        ncbi_mcp_server.run_query
-                    ]
-                    results = [None] * len(funcs)
-
-                    with ThreadPoolExecutor(max_workers=len(funcs)) as ex:
-                        futures = {ex.submit(f, gene_symbol): i for i, f in enumerate(funcs)}
-                        for fut in as_completed(futures):
-                            i = futures[fut]
-                            try:
-                                results[i] = fut.result()
-                            except TimeoutError:
-                                results[i] = "Agent timed out"
-                            except Exception as e:
-                                results[i] = f"Agent failed: {e}"
-
-                    uniprot_output, kegg_output, opengenes_output, gnomad_output, ncbi_output = results
-
-                    try:
-                        article = agg.run_query(
-                            uniprot_output,
-                            kegg_output,
-                            opengenes_output,
-                            gnomad_output,
-                            ncbi_output
-                        )
-                    except Exception as e:
-                        article = f"Article creation failed: {e}"
-
-                    with conn.cursor() as cur2:
-                        cur2.execute("""
-                            INSERT INTO gene_articles (gene_symbol, article)
-                            VALUES (%s, %s)
-                            ON CONFLICT (gene_symbol) DO UPDATE
-                            SET article = EXCLUDED.article
-                        """, (gene_symbol, article))
-                        conn.commit()
-
-                finally:
-                    cur.execute("SELECT pg_advisory_unlock(%s)", (key,))
-
-        elapsed = time.perf_counter() - start
-        print(f"[DONE] Generated article for {gene_symbol} in {elapsed:.2f}s")
-        return article
+    def __init__(self, embedded_worker: bool = EMBEDDED_WORKER):
+        self.pool = get_pool()
+        self.store = ArticleStore(self.pool)
+        self.cards = GeneCardSource()
+        # Per-gene coalescing of lookups: concurrent requests for one symbol share
+        # a single DB read + upstream fetch, different symbols run in parallel.
+        self._lookups = SingleFlight()
+        self._alookups = AsyncSingleFlight()
+        self._responses = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._listener = None
+        # Loaded once at startup; maps aliases and previous symbols to approved ones.
+        self._hgnc = get_hgnc_index()
+        # Symbols are validated before they are queued; unknown ones are
+        # remembered so typos never reach the workers.
+        self._unknown = UnknownGeneStore(self.pool)
+        self._unknown_cache = TTLCache(maxsize=UNKNOWN_CACHE_SIZE, ttl=self._unknown.ttl)
+        self._resolver = GeneIdResolver(index=self._hgnc)
+
+        self._queue = JobQueue(self.pool)
+
+        self.store.ensure_table()
+        self._unknown.ensure_table()
+        self._queue.ensure_table()
+
+        self.worker = None
+        if embedded_worker:
+            # Imported lazily so API-only processes never load the agent stack.
+            from backend.services.pipeline import GenePipeline
+            from backend.services.pipeline_worker import PipelineWorker
+
+            self.worker = PipelineWorker(self._queue, GenePipeline(self.store, self.cards))
+            self.worker.start()
+
+    def normalize_symbol(self, gene_symbol: str) -> str:
+        """
+        Approved HGNC symbol for an alias or previous symbol (NRF2 -> NFE2L2),
+        so they share one cache entry, stored article and pipeline run.
+        """
+        gene_symbol = gene_symbol.strip().upper()
+        return (self._hgnc.normalize(gene_symbol) or gene_symbol).upper()
 
     def search(self, gene_symbol: str) -> GeneResponse:
-        gene_symbol = gene_symbol.strip().upper()
+        gene_symbol = self.normalize_symbol(gene_symbol)
+
+        payload = self._responses.get(gene_symbol)
+        if payload is not None:
+            return GeneResponse.model_construct(**payload)
+
+        return self._lookups.do(gene_symbol, self._lookup, gene_symbol)
+
+    async def asearch(self, gene_symbol: str) -> GeneResponse:
+        gene_symbol = self.normalize_symbol(gene_symbol)
+
+        payload = self._responses.get(gene_symbol)
+        if payload is not None:
+            return GeneResponse.model_construct(**payload)
+
+        return await self._alookups.do(gene_symbol, self._alookup, gene_symbol)
+
+    def _lookup(self, gene_symbol: str) -> GeneResponse:
+        row = self.store.load(gene_symbol)
+        if row:
+            article, card, fresh = row
+            if card is None or not fresh:
+                # Legacy row or expired card: refresh it once from upstream.
+                card, complete = self.cards.fetch(gene_symbol)
+                if complete:
+                    self.store.save_card(gene_symbol, card)
+                    self._responses.invalidate(gene_symbol)
+                print(f"[DB HIT] {gene_symbol} (card refreshed)")
+            else:
+                print(f"[DB HIT] {gene_symbol}")
+            return self._ready_response(gene_symbol, article, card)
+
+        suggestions = self._unknown_suggestions(gene_symbol)
+        if suggestions is not None:
+            return self._unknown_response(gene_symbol, suggestions)
+        return self._enqueue(gene_symbol)
+
+    async def _alookup(self, gene_symbol: str) -> GeneResponse:
+        row = await self.store.aload(gene_symbol)
+        if row:
+            article, card, fresh = row
+            if card is None or not fresh:
+                card, complete = await self.cards.afetch(gene_symbol)
+                if complete:
+                    await self.store.asave_card(gene_symbol, card)
+                    self._responses.invalidate(gene_symbol)
+                print(f"[DB HIT] {gene_symbol} (card refreshed)")
+            else:
+                print(f"[DB HIT] {gene_symbol}")
+            return self._ready_response(gene_symbol, article, card)
+
+        suggestions = await self._aunknown_suggestions(gene_symbol)
+        if suggestions is not None:
+            return self._unknown_response(gene_symbol, suggestions)
+        return await self._aenqueue(gene_symbol)
+
+    def _resolves(self, gene_symbol: str) -> bool:
+        # Ambiguous aliases count as known: the sources search for them as before.
+        # Without a local snapshot this asks HGNC REST; an unreachable HGNC lets the gene through.
+        try:
+            return self._resolver.is_known(gene_symbol)
+        except Exception as e:
+            print(f"[ERROR] Could not validate {gene_symbol}: {e}")
+            return True
+
+    # The unknown checks return None for a known gene, otherwise the close-match
+    # suggestions. Suggestions are computed once per name, when it enters the
+    # negative cache, and served from there on later requests.
+    def _unknown_suggestions(self, gene_symbol: str) -> list[str] | None:
+        suggestions = self._unknown_cache.get(gene_symbol)
+        if suggestions is not None:
+            return suggestions
+        if not self._unknown.is_unknown(gene_symbol):
+            if self._resolves(gene_symbol):
+                return None
+            self._unknown.mark(gene_symbol)
+        suggestions = self._hgnc.suggest(gene_symbol)
+        self._unknown_cache.set(gene_symbol, suggestions)
+        return suggestions
+
+    async def _aunknown_suggestions(self, gene_symbol: str) -> list[str] | None:
+        suggestions = self._unknown_cache.get(gene_symbol)
+        if suggestions is not None:
+            return suggestions
+        if not await self._unknown.ais_unknown(gene_symbol):
+            if len(self._hgnc):
+                known = self._hgnc.known(gene_symbol)
+            else:
+                known = await asyncio.to_thread(self._resolves, gene_symbol)
+            if known:
+                return None
+            await self._unknown.amark(gene_symbol)
+        # difflib over the symbol index is CPU-bound; keep it off the event loop.
+        suggestions = await asyncio.to_thread(self._hgnc.suggest, gene_symbol)
+        self._unknown_cache.set(gene_symbol, suggestions)
+        return suggestions
+
+    def _ready_response(self, gene_symbol: str, article: str, card: dict) -> GeneResponse:
+        response = GeneResponse(
+            gene=gene_symbol,
+            article=article,
+            status="ready",
+            **card,
+        )
+        self._responses.set(gene_symbol, response.model_dump())
+        return response
+
+    def _unknown_response(self, gene_symbol: str, suggestions: list[str]) -> GeneResponse:
+        print(f"[UNKNOWN] {gene_symbol}")
+        return GeneResponse(
+            gene=gene_symbol,
+            status="unknown",
+            article=f"{gene_symbol} is not a recognized human gene symbol.",
+            suggestions=suggestions,
+        )
 
-        with self._cache_lock:
-            article = self._load_from_db(gene_symbol)
-            if article:
-                try:
-                    u = self.uniprot.fetch(gene_symbol)
-                except Exception as e:
-                    print(f"UniProt fetch failed: {e}")
-                    u = {}
-
-                try:
-                    n = self.ncbi.fetch(gene_symbol)
-                except Exception as e:
-                    print(f"NCBI fetch failed: {e}")
-                    n = {}
+    def _enqueue(self, gene_symbol: str) -> GeneResponse:
+        job = self._queue.enqueue(gene_symbol)
+        return self._processing_response(gene_symbol, job, self.get_queue_size())
 
-                print(f"[DB HIT] {gene_symbol}")
-                return GeneResponse(
-                    gene=gene_symbol,
-                    primaryAccession=u.get("primaryAccession"),
-                    article=article,
-                    status="ready",
-                    function=u.get("function"),
-                    synonyms=u.get("synonyms") or [],
-                    longevity_association=n.get("longevity_association"),
-                    modification_effects=u.get("modification_effects"),
-                    dna_sequence=n.get("dna_sequence"),
-                    interval_in_dna_sequence=n.get("interval_in_dna_sequence"),
-                    protein_sequence=u.get("protein_sequence"),
-                    externalLink=n.get("external_link") or u.get("external_link"),
-                )
+    async def _aenqueue(self, gene_symbol: str) -> GeneResponse:
+        job = await self._queue.aenqueue(gene_symbol)
+        return self._processing_response(gene_symbol, job, await self._queue.asize())
 
+    @staticmethod
+    def _processing_response(gene_symbol: str, job: Enqueued, queue_size: int) -> GeneResponse:
+        if job.created:
             print(f"[QUEUE ADD] Added {gene_symbol} to processing queue")
-            self._queue.put(gene_symbol)
+        return GeneResponse(
+            gene=gene_symbol,
+            article=(
+                "Your request has been received and is queued for processing. Please check back later."
+            ),
+            status="processing",
+            queue_size = queue_size,
+            queue_position = job.position
+        )
 
-            return GeneResponse(
-                gene=gene_symbol,
-                article=(
-                    "Your request has been received and is queued for processing. Please check back later."
-                ),
-                status="processing",
-                queue_size = self.get_queue_size()
-            )
+    async def astart(self):
+        """Subscribes to article changes so responses cached here never outlive a rewrite."""
+        pool = await get_async_pool()
+        self._listener = await pool.acquire()
+        await self._listener.add_listener(CHANGED_CHANNEL, self._on_article_changed)
+
+    def _on_article_changed(self, conn, pid, channel, gene_symbol):
+        self._responses.invalidate(gene_symbol)
+
+    async def aclose(self):
+        if self.worker is not None:
+            self.worker.stop()
+        if self._listener is not None:
+            await self._listener.remove_listener(CHANGED_CHANNEL, self._on_article_changed)
+            pool = await get_async_pool()
+            await pool.release(self._listener)
+            self._listener = None
+        await self.cards.aclose()
+        await close_async_pool()
+
+    def cache_stats(self) -> dict:
+        return self._responses.stats()
 
     def get_queue_size(self) -> int:
-        return self._queue.qsize()
+        return self._queue.size()
@@ -0,0 +1,204 @@
+import os
+import threading
+import zlib
+
+from psycopg2.extras import execute_values
+
+from backend.services.db import PgPool, get_pool
+
+# How long a stored PubMed record is served before it is re-fetched (seconds).
+LITERATURE_TTL = int(os.environ.get("LITERATURE_TTL", 180 * 24 * 3600))
+# zlib level for stored full texts; 6 is the usual size/speed trade-off.
+LITERATURE_COMPRESSION = int(os.environ.get("LITERATURE_COMPRESSION", 6))
+
+_COLUMNS = ("pmid", "doi", "pmcid", "title", "abstract", "journal", "year")
+
+
+def _compress(text: str | None) -> bytes | None:
+    return zlib.compress(text.encode("utf-8"), LITERATURE_COMPRESSION) if text else None
+
+
+def _decompress(blob) -> str | None:
+    return zlib.decompress(bytes(blob)).decode("utf-8") if blob is not None else None
+
+
+class LiteratureStore:
+    """
+    PubMed articles shared by every source and gene, in `literature`. Keyed by
+    PMID, with DOI and PMCID as lookup keys, so a paper cited for dozens of
+    genes is fetched from NCBI once. Full texts (PMC) are stored zlib-compressed.
+    Like the tool cache, lookups fail open: a database error is logged and
+    reported as a miss so callers fall back to the network.
+    """
+
+    def __init__(self, pool: PgPool | None = None, ttl: int = LITERATURE_TTL):
+        self._pool = pool
+        self.ttl = ttl
+        self._table_ready = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def pool(self) -> PgPool:
+        if self._pool is None:
+            self._pool = get_pool()
+        return self._pool
+
+    def ensure_table(self):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS literature (
+                pmid TEXT PRIMARY KEY,
+                doi TEXT,
+                pmcid TEXT,
+                title TEXT,
+                abstract TEXT,
+                journal TEXT,
+                year TEXT,
+                full_text BYTEA,
+                full_text_url TEXT,
+                fetched_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS literature_doi_idx ON literature (lower(doi))")
+            cur.execute("CREATE INDEX IF NOT EXISTS literature_pmcid_idx ON literature (pmcid)")
+        self._table_ready = True
+
+    def _cursor(self):
+        if not self._table_ready:
+            self.ensure_table()
+        return self.pool.cursor()
+
+    def _count(self, hits: int = 0, misses: int = 0, errors: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.errors += errors
+
+    @staticmethod
+    def _row(row, with_text: bool) -> dict:
+        article = dict(zip(_COLUMNS, row[:len(_COLUMNS)]))
+        article["has_full_text"] = row[len(_COLUMNS)]
+        article["full_text_url"] = row[len(_COLUMNS) + 1]
+        if with_text:
+            article["full_text"] = _decompress(row[len(_COLUMNS) + 2])
+        return article
+
+    def _select(self, with_text: bool) -> str:
+        return (f"SELECT {', '.join(_COLUMNS)}, full_text IS NOT NULL, full_text_url"
+                f"{', full_text' if with_text else ''} FROM literature")
+
+    def get_many(self, pmids: list[str], with_text: bool = False) -> dict[str, dict]:
+        """Fresh stored articles for the given PMIDs, {pmid: article}."""
+        pmids = list(dict.fromkeys(p for p in pmids if p))
+        if not pmids:
+            return {}
+        try:
+            with self._cursor() as cur:
+                cur.execute(self._select(with_text) + """
+                WHERE pmid = ANY(%s) AND fetched_at > now() - make_interval(secs => %s)
+                """, (pmids, self.ttl))
+                found = {row[0]: self._row(row, with_text) for row in cur.fetchall()}
+        except Exception as e:
+            print(f"[LITERATURE] Lookup failed: {e}")
+            self._count(errors=1, misses=len(pmids))
+            return {}
+        self._count(hits=len(found), misses=len(pmids) - len(found))
+        return found
+
+    def get_by_doi(self, doi: str, with_text: bool = False) -> dict | None:
+        """DOI -> PMID mapping: the stored article carrying this DOI, if any."""
+        try:
+            with self._cursor() as cur:
+                cur.execute(self._select(with_text) + """
+                WHERE lower(doi) = lower(%s) AND fetched_at > now() - make_interval(secs => %s)
+                LIMIT 1
+                """, (doi.strip(), self.ttl))
+                row = cur.fetchone()
+        except Exception as e:
+            print(f"[LITERATURE] DOI lookup failed for {doi}: {e}")
+            self._count(errors=1, misses=1)
+            return None
+        self._count(hits=int(row is not None), misses=int(row is None))
+        return self._row(row, with_text) if row else None
+
+    def save_many(self, articles: list[dict]):
+        """Bulk upsert; a stored full text is kept when the new record has none."""
+        rows = {}
+        for a in articles:
+            if a.get("pmid"):
+                rows[a["pmid"]] = (*(a.get(c) for c in _COLUMNS), _compress(a.get("full_text")),
+                                   a.get("full_text_url"))
+        if not rows:
+            return
+        try:
+            with self._cursor() as cur:
+                execute_values(cur, """
+                INSERT INTO literature (pmid, doi, pmcid, title, abstract, journal, year, full_text, full_text_url)
+                VALUES %s
+                ON CONFLICT (pmid) DO UPDATE
+                SET doi = COALESCE(EXCLUDED.doi, literature.doi),
+                    pmcid = COALESCE(EXCLUDED.pmcid, literature.pmcid),
+                    title = EXCLUDED.title,
+                    abstract = EXCLUDED.abstract,
+                    journal = EXCLUDED.journal,
+                    year = EXCLUDED.year,
+                    full_text = COALESCE(EXCLUDED.full_text, literature.full_text),
+                    full_text_url = COALESCE(EXCLUDED.full_text_url, literature.full_text_url),
+                    fetched_at = now()
+                """, list(rows.values()))
+        except Exception as e:
+            print(f"[LITERATURE] Store failed for {len(rows)} articles: {e}")
+            self._count(errors=1)
+
+    def save_full_text(self, pmid: str, text: str, url: str | None = None):
+        try:
+            with self._cursor() as cur:
+                cur.execute("""
+                UPDATE literature SET full_text = %s, full_text_url = COALESCE(%s, full_text_url)
+                WHERE pmid = %s
+                """, (_compress(text), url, pmid))
+        except Exception as e:
+            print(f"[LITERATURE] Full text store failed for {pmid}: {e}")
+            self._count(errors=1)
+
+    def fill(self, pmids: list[str], fetch) -> list[dict]:
+        """
+        Bulk fill: stored articles are served as is, the rest are fetched with
+        fetch(missing_pmids) -> [article], saved in one upsert and merged in.
+        Returns articles in the order of pmids, skipping ones NCBI did not return.
+        """
+        pmids = list(dict.fromkeys(p for p in pmids if p))
+        found = self.get_many(pmids)
+        missing = [p for p in pmids if p not in found]
+        if missing:
+            fetched = fetch(missing)
+            self.save_many(fetched)
+            found.update((a["pmid"], a) for a in fetched if a.get("pmid"))
+        return [found[p] for p in pmids if p in found]
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_literature_store() -> LiteratureStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LiteratureStore()
+    return _store
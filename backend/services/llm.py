@@ -0,0 +1,192 @@
+import dataclasses
+import enum
+import hashlib
+import json
+import os
+import threading
+
+import httpx
+from smolagents import OpenAIServerModel
+from smolagents.models import ChatMessage
+
+from backend.utils.disk_cache import DiskCache
+
+NEBIUS_API_BASE = os.environ.get("NEBIUS_API_BASE", "https://api.studio.nebius.com/v1/")
+
+# One keep-alive connection pool shared by every model in the process.
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", 32))
+LLM_MAX_KEEPALIVE = int(os.environ.get("LLM_MAX_KEEPALIVE", LLM_MAX_CONNECTIONS))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 600))
+# HTTP/2 multiplexes concurrent completions over one connection; needs the h2 package.
+LLM_HTTP2 = os.environ.get("LLM_HTTP2", "0") == "1"
+
+# Completions are cached on disk by model, generation settings and prompt.
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(".cache", "llm_completions.sqlite"))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 2 << 30))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", 30 * 24 * 3600))
+# LLM_CACHE_BYPASS=1 always calls the model; fresh completions are still stored.
+LLM_CACHE_BYPASS = os.environ.get("LLM_CACHE_BYPASS", "0") == "1"
+
+_cache = None
+_cache_lock = threading.Lock()
+
+_http_client = None
+_models: dict[tuple, "CachedOpenAIServerModel"] = {}
+_models_lock = threading.Lock()
+
+
+def get_llm_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(LLM_CACHE_PATH, max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL)
+    return _cache
+
+
+def _jsonable(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)
+                if f.name not in ("raw", "token_usage")}
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def _tool_spec(tool) -> dict:
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "inputs": tool.inputs,
+        "output_type": tool.output_type,
+    }
+
+
+def _message_to_dict(message: ChatMessage) -> dict:
+    tool_calls = None
+    if message.tool_calls:
+        tool_calls = [
+            {
+                "id": call.id,
+                "type": call.type,
+                "function": {
+                    "name": call.function.name,
+                    "arguments": call.function.arguments,
+                    "description": call.function.description,
+                },
+            }
+            for call in message.tool_calls
+        ]
+    return {"role": _jsonable(message.role), "content": message.content, "tool_calls": tool_calls}
+
+
+class CachedOpenAIServerModel(OpenAIServerModel):
+    """
+    OpenAIServerModel whose completions are content-addressed: the key is the
+    model id, every generation setting (temperature, max_tokens, ...) and a
+    hash of the messages, stop sequences, response format and offered tools.
+    Regenerating a gene whose inputs did not change replays the stored answers.
+    """
+
+    def __init__(self, *args, bypass_cache: bool = LLM_CACHE_BYPASS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bypass_cache = bypass_cache
+
+    def _cache_key(self, messages, stop_sequences, response_format, tools_to_call_from, kwargs) -> str:
+        payload = {
+            "model_id": self.model_id,
+            "settings": {**self.kwargs, **kwargs},
+            "messages": messages,
+            "stop_sequences": stop_sequences,
+            "response_format": response_format,
+            "tools": [_tool_spec(t) for t in tools_to_call_from or []],
+        }
+        blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_jsonable)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def generate(self, messages, stop_sequences=None, response_format=None, tools_to_call_from=None, **kwargs):
+        try:
+            key = self._cache_key(messages, stop_sequences, response_format, tools_to_call_from, kwargs)
+        except Exception as e:
+            print(f"[LLM CACHE] Could not build key, calling the model: {e}")
+            key = None
+
+        cache = get_llm_cache()
+        if key is not None and not self.bypass_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return ChatMessage.from_dict(json.loads(cached))
+
+        message = super().generate(
+            messages,
+            stop_sequences=stop_sequences,
+            response_format=response_format,
+            tools_to_call_from=tools_to_call_from,
+            **kwargs,
+        )
+        if key is not None:
+            try:
+                cache.set(key, json.dumps(_message_to_dict(message), ensure_ascii=False).encode("utf-8"))
+            except Exception as e:
+                print(f"[LLM CACHE] Store failed: {e}")
+        return message
+
+
+def get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        with _models_lock:
+            if _http_client is None:
+                http2 = LLM_HTTP2
+                if http2:
+                    try:
+                        import h2  # noqa: F401
+                    except ImportError:
+                        print("[LLM] LLM_HTTP2=1 but the h2 package is missing, using HTTP/1.1")
+                        http2 = False
+                _http_client = httpx.Client(
+                    http2=http2,
+                    timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+                    limits=httpx.Limits(
+                        max_connections=LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                    ),
+                )
+    return _http_client
+
+
+def get_model(model_id: str, temperature: float = 0, api_key: str | None = None,
+              api_base: str = NEBIUS_API_BASE, **kwargs) -> CachedOpenAIServerModel:
+    """
+    Process-wide model registry: one model per (model, settings), all sharing
+    the pooled HTTP client, so agents and direct calls reuse open connections
+    instead of building a client and doing a TLS handshake per call.
+    """
+    api_key = api_key or os.environ["NEBIUS_API_KEY"]
+    key = (model_id, temperature, api_key, api_base, json.dumps(kwargs, sort_keys=True, default=str))
+    model = _models.get(key)
+    if model is None:
+        http_client = get_http_client()
+        with _models_lock:
+            model = _models.get(key)
+            if model is None:
+                model = _models[key] = CachedOpenAIServerModel(
+                    model_id=model_id,
+                    api_key=api_key,
+                    api_base=api_base,
+                    temperature=temperature,
+                    client_kwargs={"http_client": http_client},
+                    **kwargs,
+                )
+    return model
+
+
+def close_models():
+    global _http_client
+    with _models_lock:
+        _models.clear()
+        client, _http_client = _http_client, None
+    if client is not None:
+        client.close()
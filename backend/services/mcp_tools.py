@@ -0,0 +1,329 @@
+import atexit
+import os
+import threading
+import uuid
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+
+import psutil
+from mcp import StdioServerParameters
+from smolagents import ToolCollection
+
+from backend.services.tool_cache import get_tool_cache
+
+# Environment variable set on every MCP stdio subprocess; its value tags the
+# process so it can be found again to check its health or to kill it.
+CANCEL_TAG_ENV = "IMMORTAL_CANCEL_TAG"
+
+# Maximum number of live sessions kept per MCP server command.
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", 4))
+
+
+class SourceCancelled(Exception):
+    """Raised inside a source run once its CancelToken has been cancelled."""
+
+
+class CancelToken:
+    """
+    Cooperative cancellation for one source run. Agents stop at their next step
+    (see step_callbacks()), and the MCP stdio subprocesses attached to the token
+    by open_tools() are killed so a call blocked on them returns immediately.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.id = uuid.uuid4().hex
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._tags: set[str] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise SourceCancelled(f"{self.name or 'source'} cancelled")
+
+    def step_callback(self, *args, **kwargs):
+        self.check()
+
+    def attach(self, tag: str):
+        with self._lock:
+            self._tags.add(tag)
+            cancelled = self._event.is_set()
+        if cancelled:
+            kill_tagged(tag)
+
+    def detach(self, tag: str):
+        with self._lock:
+            self._tags.discard(tag)
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            tags = list(self._tags)
+        killed = sum(kill_tagged(tag) for tag in tags)
+        if killed:
+            print(f"[CANCEL] Killed {killed} MCP process(es) of {self.name or self.id}")
+
+
+def tag_server(server: StdioServerParameters, tag: str) -> StdioServerParameters:
+    env = dict(server.env or {})
+    env[CANCEL_TAG_ENV] = tag
+    return server.model_copy(update={"env": env})
+
+
+def server_name(server: StdioServerParameters) -> str:
+    return " ".join([server.command, *server.args])
+
+
+def tagged_processes(tag: str) -> list[psutil.Process]:
+    """This process's descendants started with the given tag."""
+    procs = []
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            if proc.environ().get(CANCEL_TAG_ENV) == tag:
+                procs.append(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return procs
+
+
+def kill_tagged(tag: str) -> int:
+    """Kills the tagged descendants together with their children."""
+    victims = tagged_processes(tag)
+    for proc in list(victims):
+        try:
+            victims.extend(proc.children(recursive=True))
+        except psutil.NoSuchProcess:
+            pass
+    for proc in victims:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+    return len(victims)
+
+
+_current = threading.local()
+
+
+def current_token() -> CancelToken | None:
+    return getattr(_current, "token", None)
+
+
+@contextmanager
+def cancel_scope(token: CancelToken):
+    """Makes token the current one for code running in this thread."""
+    previous = current_token()
+    _current.token = token
+    try:
+        yield token
+    finally:
+        _current.token = previous
+
+
+def check_cancelled():
+    token = current_token()
+    if token is not None:
+        token.check()
+
+
+def in_current_scope(fn):
+    """Wraps fn to run under the caller's CancelToken, e.g. in a helper thread pool."""
+    token = current_token()
+    if token is None:
+        return fn
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        with cancel_scope(token):
+            return fn(*args, **kwargs)
+    return run
+
+
+def step_callbacks() -> list:
+    """step_callbacks for a ToolCallingAgent, stopping it once the current run is cancelled."""
+    token = current_token()
+    return [token.step_callback] if token is not None else []
+
+
+class McpSession:
+    """One started MCP server process with its initialized client and tool list."""
+
+    def __init__(self, server: StdioServerParameters, trust_remote_code: bool, structured_output: bool):
+        self.tag = uuid.uuid4().hex
+        self._stack = ExitStack()
+        collection = self._stack.enter_context(ToolCollection.from_mcp(
+            server_parameters=tag_server(server, self.tag),
+            trust_remote_code=trust_remote_code,
+            structured_output=structured_output
+        ))
+        # Deterministic tools (tool_cache.DEFAULT_TOOL_TTLS) are cached across sessions, agents and genes.
+        cache = get_tool_cache()
+        name = server_name(server)
+        self.tools = [cache.wrap(name, tool) for tool in collection.tools]
+        self.uses = 0
+
+    def alive(self) -> bool:
+        procs = tagged_processes(self.tag)
+        try:
+            return bool(procs) and all(p.status() != psutil.STATUS_ZOMBIE for p in procs)
+        except psutil.NoSuchProcess:
+            return False
+
+    def close(self, kill: bool = False):
+        if kill:
+            kill_tagged(self.tag)
+        try:
+            self._stack.close()
+        except Exception as e:
+            print(f"[MCP] Error closing session: {e}")
+
+
+class McpSessionPool:
+    """
+    Long-lived sessions to one MCP server. Sessions are started lazily up to
+    `size`, health-checked when borrowed, and replaced when their process has
+    died or their borrower was cancelled mid-call.
+    """
+
+    def __init__(self, server: StdioServerParameters, size: int = MCP_POOL_SIZE,
+                 trust_remote_code: bool = True, structured_output: bool = False):
+        self.server = server
+        self.size = size
+        self.trust_remote_code = trust_remote_code
+        self.structured_output = structured_output
+        self._idle: list[McpSession] = []
+        self._count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.spawned = 0
+
+    @contextmanager
+    def borrow(self):
+        token = current_token()
+        session = self._acquire(token)
+        if token is not None:
+            token.attach(session.tag)
+        try:
+            yield session
+        finally:
+            if token is not None:
+                token.detach(session.tag)
+            self._release(session, discard=token is not None and token.cancelled)
+
+    def _acquire(self, token: CancelToken | None) -> McpSession:
+        while True:
+            if token is not None:
+                token.check()
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("MCP session pool is closed")
+                if self._idle:
+                    session = self._idle.pop()
+                elif self._count < self.size:
+                    self._count += 1
+                    session = None
+                else:
+                    self._cond.wait(timeout=1.0)
+                    continue
+
+            if session is not None:
+                if session.alive():
+                    session.uses += 1
+                    return session
+                print(f"[MCP] Dropping dead session of {server_name(self.server)}")
+                session.close(kill=True)
+                with self._cond:
+                    self._count -= 1
+                    self._cond.notify()
+                continue
+
+            try:
+                session = McpSession(self.server, self.trust_remote_code, self.structured_output)
+            except BaseException:
+                with self._cond:
+                    self._count -= 1
+                    self._cond.notify()
+                raise
+            self.spawned += 1
+            session.uses += 1
+            return session
+
+    def _release(self, session: McpSession, discard: bool):
+        if discard or not session.alive():
+            session.close(kill=True)
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            if self._closed:
+                session.close()
+                self._count -= 1
+                return
+            self._idle.append(session)
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._count,
+                "idle": len(self._idle),
+                "spawned": self.spawned,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for session in idle:
+            session.close()
+
+
+_pools: dict[tuple, McpSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_session_pool(server: StdioServerParameters, trust_remote_code: bool = True,
+                     structured_output: bool = False) -> McpSessionPool:
+    key = (server.command, tuple(server.args), trust_remote_code, structured_output)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = McpSessionPool(server, trust_remote_code=trust_remote_code,
+                                                structured_output=structured_output)
+        return pool
+
+
+def pool_stats() -> dict:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {server_name(p.server): p.stats() for p in pools}
+
+
+@atexit.register
+def close_session_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+@contextmanager
+def open_tools(server: StdioServerParameters, trust_remote_code: bool = True, structured_output: bool = False):
+    """
+    Borrows a pooled session to the MCP server and yields it; `.tools` is the
+    server's tool list. The session's process is killed if the current run is
+    cancelled while it is borrowed.
+    """
+    with get_session_pool(server, trust_remote_code, structured_output).borrow() as session:
+        yield session
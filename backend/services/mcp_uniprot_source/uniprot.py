@@ -9,9 +9,13 @@
 # npm run build
 
 
-from smolagents import ToolCollection, ToolCallingAgent, OpenAIServerModel
+from smolagents import ToolCallingAgent
+from backend.services.llm import NEBIUS_API_BASE, get_model
 from mcp import StdioServerParameters
-import os
+from backend.services.mcp_tools import open_tools, step_callbacks
+
+MODEL = "Qwen/Qwen3-235B-A22B-Instruct-2507"
+PROMPT_VERSION = 2
 
 
 # configuration
@@ -24,18 +28,12 @@ def set_server(server_name="uniprot-mcp-server"):
 
 
 def set_model(
-    api_key=os.environ["NEBIUS_API_KEY"],
-    api_base="https://api.studio.nebius.com/v1/",
+    api_key=None,
+    api_base=NEBIUS_API_BASE,
     temperature=0,
-    model_name="Qwen/Qwen3-235B-A22B-Instruct-2507"
+    model_name=MODEL
 ):
-    model = OpenAIServerModel(
-        model_id=model_name,
-        api_key=api_key,
-        api_base=api_base,
-        temperature=temperature,
-    )
-    return model
+    return get_model(model_name, temperature=temperature, api_key=api_key, api_base=api_base)
 
 
 SYSTEM_PROMPT = """
@@ -59,10 +57,19 @@ Rules:
 - Prefer full lists if multiple values exist.
 """
 
-def set_user_prompt(gene_or_protein_name):
+def set_known_accessions(ids=None):
+    if ids is None or not ids.uniprot_ids:
+        return ""
+    return (
+        f"UniProt accession(s) resolved from HGNC: {', '.join(ids.uniprot_ids)}. "
+        "Fetch these entries directly with the entry/feature tools instead of searching for the protein first.\n"
+    )
+
+
+def set_user_prompt(gene_or_protein_name, ids=None):
     return f"""
 Protein: {gene_or_protein_name}
-
+{set_known_accessions(ids)}
 Retrieve all available UniProt data per the scope above, using only MCP tool outputs. 
 Do not invent or infer missing information.
 Search recommendations: Use more than 1 search results. String indices must be integers, not 'str'.
@@ -124,14 +131,16 @@ Do **not** output JSON or code blocks — only clean text with section headers.
 def run_query(
     gene,
     server=set_server(),
-    model=set_model(),
+    model=None,
     trust_remote_code=True,
-    structured_output=False
+    structured_output=False,
+    ids=None
 ):
+    model = model or set_model()
     system_prompt = SYSTEM_PROMPT
-    user_prompt = set_user_prompt(gene)
-    with ToolCollection.from_mcp(
-        server_parameters=server,
+    user_prompt = set_user_prompt(gene, ids)
+    with open_tools(
+        server,
         trust_remote_code=trust_remote_code,
         structured_output=structured_output
     ) as tools:
@@ -140,6 +149,7 @@ def run_query(
             tools=[*tools.tools],
             add_base_tools=False,
             max_steps=1,
+            step_callbacks=step_callbacks(),
         )
         agent.prompt_templates["system_prompt"] = system_prompt
         result = agent.run(user_prompt)
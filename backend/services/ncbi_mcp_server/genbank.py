@@ -0,0 +1,372 @@
+"""
+Потоковый парсер GenBank flat file (efetch rettype=gb, retmode=text).
+
+parse_genbank(lines) читает строки по одной и отдаёт GenBankRecord на каждом
+терминаторе '//', так что пакет из многих записей разбирается за один
+линейный проход. Фичи — типизированные объекты Feature с точными
+интервалами и квалификаторами, последовательность — один непрерывный буфер
+bytes. Все классы на __slots__, чтобы записи занимали мало памяти.
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Позиции в записи: ключ фичи в колонках 6-20, локация и квалификаторы с 22-й
+_FEATURE_INDENT = ' ' * 5
+_QUALIFIER_COLUMN = 21
+_HEADER_COLUMN = 12
+# Цифры и пробелы в строках ORIGIN
+_SEQUENCE_NOISE = b' 0123456789\t'
+# Квалификаторы, чьи многострочные значения склеиваются без пробела
+_UNSPACED_QUALIFIERS = frozenset({'translation'})
+
+_LOCATION_PART = re.compile(r'([<>])?(\d+)(?:(?:\.\.|\^)([<>])?(\d+))?')
+# one-of(102,110) в позиции — берётся первое значение
+_ONE_OF = re.compile(r'one-of\(([^,()]+)[^()]*\)')
+# Операторы, чьи аргументы — локации; complement дополнительно меняет цепь
+_LOCATION_OPERATORS = frozenset({'complement', 'join', 'order', 'bond'})
+
+
+class Interval:
+    """Интервал локации фичи: 1-based, концы включены"""
+    __slots__ = ('start', 'end', 'strand', 'partial_start', 'partial_end')
+
+    def __init__(self, start: int, end: int, strand: int = 1,
+                 partial_start: bool = False, partial_end: bool = False):
+        self.start = start
+        self.end = end
+        self.strand = strand
+        self.partial_start = partial_start
+        self.partial_end = partial_end
+
+    def __len__(self):
+        return self.end - self.start + 1
+
+    def __repr__(self):
+        return f"Interval({self.start}..{self.end}, strand={self.strand})"
+
+
+class Feature:
+    """Фича из таблицы FEATURES: тип, интервалы и квалификаторы"""
+    __slots__ = ('type', 'location', 'intervals', 'qualifiers')
+
+    def __init__(self, type: str, location: str, intervals: Tuple[Interval, ...],
+                 qualifiers: Dict[str, List[str]]):
+        self.type = type
+        self.location = location
+        self.intervals = intervals
+        self.qualifiers = qualifiers
+
+    @property
+    def start(self) -> Optional[int]:
+        return min(i.start for i in self.intervals) if self.intervals else None
+
+    @property
+    def end(self) -> Optional[int]:
+        return max(i.end for i in self.intervals) if self.intervals else None
+
+    @property
+    def strand(self) -> int:
+        return self.intervals[0].strand if self.intervals else 1
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Первое значение квалификатора"""
+        values = self.qualifiers.get(name)
+        return values[0] if values else default
+
+    def describe(self) -> str:
+        parts = [self.type, self.location]
+        for name, values in self.qualifiers.items():
+            for value in values:
+                parts.append(f'/{name}="{value}"' if value else f'/{name}')
+        return ' '.join(parts)
+
+    def __repr__(self):
+        return f"Feature({self.type}, {self.location})"
+
+
+class Reference:
+    __slots__ = ('number', 'span', 'authors', 'consortium', 'title', 'journal', 'pubmed', 'remark')
+
+    def __init__(self, number: Optional[int] = None, span: str = ''):
+        self.number = number
+        self.span = span
+        self.authors = None
+        self.consortium = None
+        self.title = None
+        self.journal = None
+        self.pubmed = None
+        self.remark = None
+
+
+class GenBankRecord:
+    __slots__ = ('name', 'length', 'molecule', 'accession', 'accessions', 'version', 'definition',
+                 'source', 'organism', 'taxonomy', 'comment', 'header', 'references', 'features',
+                 'sequence')
+
+    def __init__(self):
+        self.name = None
+        self.length = None
+        self.molecule = None
+        self.accession = None
+        self.accessions: List[str] = []
+        self.version = None
+        self.definition = None
+        self.source = None
+        self.organism = None
+        self.taxonomy = None
+        self.comment = None
+        # Остальные разделы заголовка как есть: DBLINK, DBSOURCE, KEYWORDS ...
+        self.header: Dict[str, str] = {}
+        self.references: List[Reference] = []
+        self.features: List[Feature] = []
+        self.sequence = b''
+
+    def names(self) -> set:
+        """Accession записи во всех вариантах: с версией и без"""
+        names = set(self.accessions)
+        if self.version:
+            names.add(self.version)
+        names.update(name.split('.')[0] for name in list(names))
+        return names
+
+    def features_of(self, *types: str) -> List[Feature]:
+        return [f for f in self.features if f.type in types]
+
+    def __repr__(self):
+        return f"GenBankRecord({self.version or self.accession}, {len(self.features)} features, {len(self.sequence)} bp/aa)"
+
+
+class LocationError(ValueError):
+    """Локация фичи не разбирается"""
+
+
+def _split_arguments(text: str) -> List[str]:
+    """Делит аргументы оператора по запятым верхнего уровня"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_location(text: str, strand: int, location: str) -> List[Interval]:
+    name, paren, rest = text.partition('(')
+    if paren:
+        if name not in _LOCATION_OPERATORS or not rest.endswith(')'):
+            raise LocationError(f"Не удалось разобрать локацию {location!r}: {text!r}")
+        if name == 'complement':
+            strand = -strand
+        intervals = []
+        for part in _split_arguments(rest[:-1]):
+            intervals.extend(_parse_location(part, strand, location))
+        return intervals
+    if ':' in text:
+        # Ссылка на другую запись (ACC:1..5) — к этой последовательности не относится
+        return []
+    match = _LOCATION_PART.fullmatch(text)
+    if not match:
+        raise LocationError(f"Не удалось разобрать локацию {location!r}: {text!r}")
+    partial_start, start, partial_end, end = match.groups()
+    return [Interval(int(start), int(end) if end else int(start), strand,
+                     partial_start is not None, partial_end is not None)]
+
+
+def parse_location(location: str) -> Tuple[Interval, ...]:
+    """
+    'complement(join(<1..20,30..>45))', 'order(120,241..248)', 'bond(23,88)' -> интервалы.
+    Ссылки на чужие записи (ACC:1..5) пропускаются, нераспознанное — LocationError
+    """
+    text = _ONE_OF.sub(r'\1', ''.join(location.split()))
+    if not text:
+        return ()
+    return tuple(_parse_location(text, 1, location))
+
+
+class _FeatureBuilder:
+    __slots__ = ('type', 'location', 'qualifiers', 'name', 'value')
+
+    def __init__(self, type: str, location: str):
+        self.type = type
+        self.location = [location]
+        self.qualifiers: Dict[str, List[str]] = {}
+        self.name = None
+        self.value = None
+
+    def qualifier(self, text: str):
+        self._flush()
+        name, eq, value = text[1:].partition('=')
+        self.name = name
+        self.value = [value] if eq else []
+
+    def continuation(self, text: str):
+        if self.name is None:
+            self.location.append(text)
+        else:
+            self.value.append(text)
+
+    def _flush(self):
+        if self.name is None:
+            return
+        sep = '' if self.name in _UNSPACED_QUALIFIERS else ' '
+        value = sep.join(self.value)
+        if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+            value = value[1:-1].replace('""', '"')
+        self.qualifiers.setdefault(self.name, []).append(value)
+        self.name = None
+
+    def build(self) -> Feature:
+        self._flush()
+        location = ''.join(self.location)
+        try:
+            intervals = parse_location(location)
+        except LocationError as e:
+            # Фича остаётся с исходной строкой локации, но без интервалов
+            print(f"⚠️ GenBank: {e}")
+            intervals = ()
+        return Feature(self.type, location, intervals, self.qualifiers)
+
+
+class _RecordBuilder:
+    def __init__(self):
+        self.record = GenBankRecord()
+        self.sequence = bytearray()
+        self.feature: Optional[_FeatureBuilder] = None
+        self.key = None
+        self.subkey = None
+        self.lines: List[str] = []
+
+    def header_line(self, key: str, value: str, subkey: bool):
+        self._flush_key()
+        if subkey:
+            self.subkey = key
+        else:
+            self.key, self.subkey = key, None
+            if key == 'REFERENCE':
+                number, _, span = value.partition(' ')
+                self.record.references.append(Reference(int(number) if number.isdigit() else None, span.strip()))
+                value = None
+        self.lines = [value] if value else []
+
+    def continuation(self, value: str):
+        self.lines.append(value)
+
+    def end_header(self):
+        self._flush_key()
+        self.key = self.subkey = None
+
+    def _flush_key(self):
+        key, subkey, lines = self.key, self.subkey, self.lines
+        self.lines = []
+        if key is None or (not lines and key == 'REFERENCE' and subkey is None):
+            return
+        record = self.record
+        text = ('\n' if key == 'COMMENT' else ' ').join(lines)
+
+        if key == 'REFERENCE' and subkey and record.references:
+            ref = record.references[-1]
+            attr = {'AUTHORS': 'authors', 'CONSRTM': 'consortium', 'TITLE': 'title',
+                    'JOURNAL': 'journal', 'PUBMED': 'pubmed', 'REMARK': 'remark'}.get(subkey)
+            if attr:
+                setattr(ref, attr, text)
+        elif key == 'SOURCE' and subkey == 'ORGANISM':
+            record.organism = lines[0] if lines else None
+            record.taxonomy = ' '.join(lines[1:]) or None
+        elif subkey is None:
+            if key == 'LOCUS':
+                parts = text.split()
+                record.name = parts[0] if parts else None
+                if len(parts) > 2 and parts[1].isdigit():
+                    record.length = int(parts[1])
+                    record.molecule = parts[2]
+            elif key == 'ACCESSION':
+                record.accessions = text.split()
+                record.accession = record.accessions[0] if record.accessions else None
+            elif key == 'VERSION':
+                record.version = text.split()[0] if text else None
+            elif key == 'DEFINITION':
+                record.definition = text
+            elif key == 'SOURCE':
+                record.source = text
+            elif key == 'COMMENT':
+                record.comment = text
+            else:
+                record.header[key] = text
+
+    def feature_line(self, line: str):
+        if line[5] != ' ':
+            self.end_feature()
+            self.feature = _FeatureBuilder(line[5:_QUALIFIER_COLUMN].strip(), line[_QUALIFIER_COLUMN:].strip())
+        elif self.feature is not None:
+            text = line[_QUALIFIER_COLUMN:].strip()
+            if text.startswith('/'):
+                self.feature.qualifier(text)
+            else:
+                self.feature.continuation(text)
+
+    def end_feature(self):
+        if self.feature is not None:
+            self.record.features.append(self.feature.build())
+            self.feature = None
+
+    def sequence_line(self, line: str):
+        self.sequence += line.encode('ascii', 'ignore').translate(None, _SEQUENCE_NOISE)
+
+    def build(self) -> GenBankRecord:
+        self._flush_key()
+        self.end_feature()
+        self.record.sequence = bytes(self.sequence)
+        return self.record
+
+
+def parse_genbank(lines: Iterable[str]) -> Iterator[GenBankRecord]:
+    """Разбирает поток строк с одной или несколькими записями GenBank"""
+    builder = None
+    section = None
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.startswith('//'):
+            if builder is not None:
+                yield builder.build()
+            builder, section = None, None
+            continue
+        if not line.strip():
+            continue
+        if builder is None:
+            builder, section = _RecordBuilder(), 'header'
+
+        if section == 'origin':
+            builder.sequence_line(line)
+        elif line[0] != ' ':
+            key = line[:_HEADER_COLUMN].strip().split(' ')[0]
+            if key == 'FEATURES':
+                builder.end_header()
+                section = 'features'
+            elif key == 'ORIGIN':
+                builder.end_feature()
+                builder.end_header()
+                section = 'origin'
+            else:
+                builder.end_feature()
+                builder.header_line(key, line[_HEADER_COLUMN:].strip(), subkey=False)
+                section = 'header'
+        elif section == 'features' and line.startswith(_FEATURE_INDENT):
+            builder.feature_line(line)
+        elif section == 'header' and line[:_HEADER_COLUMN].strip():
+            # Подразделы AUTHORS, TITLE, ORGANISM ... (у PUBMED отступ в три пробела)
+            builder.header_line(line[:_HEADER_COLUMN].strip(), line[_HEADER_COLUMN:].strip(), subkey=True)
+        else:
+            builder.continuation(line.strip())
+
+    if builder is not None:
+        yield builder.build()
+
+
+def parse_genbank_text(text: str) -> List[GenBankRecord]:
+    return list(parse_genbank(text.splitlines()))
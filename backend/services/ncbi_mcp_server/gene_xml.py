@@ -0,0 +1,570 @@
+"""
+Разбор XML записи NCBI Gene (efetch db=gene retmode=xml) в словарь all_data.
+
+parse_gene_xml(chunks) — потоковый однопроходный разбор: куски байтов
+подаются в expat, каждый элемент обрабатывается на своём закрывающем теге, а
+обработанные Gene-commentary и Pub сразу удаляются из дерева. Разделы,
+которые раньше собирались поиском по всему дереву (.//Pub, .//Dbtag ...),
+собираются за тот же проход, поэтому память ограничена самым большим
+отдельным разделом, а не размером всей записи.
+"""
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def get_element_attribute(element: ET.Element, tag: str, attribute: str) -> Optional[str]:
+    """Вспомогательная функция для получения атрибута элемента"""
+    if element is None:
+        return None
+    elem = element.find(tag)
+    if elem is not None:
+        return elem.get(attribute)
+    return None
+
+
+# ============================================================================
+# Разбор отдельных элементов
+# ============================================================================
+
+def entrezgene_element_info(entrezgene: ET.Element) -> Dict[str, Any]:
+    entrezgene_info = {}
+    entrezgene_info['type'] = entrezgene.get('type')
+
+    unique_keys = entrezgene.find('Entrezgene_unique-keys')
+    if unique_keys is not None:
+        entrezgene_info['unique_keys'] = [key.text for key in unique_keys.findall('Object-id') if key.text]
+
+    entrezgene_type = entrezgene.find('Entrezgene_type')
+    if entrezgene_type is not None:
+        entrezgene_info['gene_type'] = entrezgene_type.text
+
+    return entrezgene_info
+
+def gene_ref_info(gene_ref: ET.Element) -> Dict[str, Any]:
+    synonyms = []
+    for syn in gene_ref.findall('Gene-ref_syn'):
+        if syn.text:
+            synonyms.append(syn.text)
+    return {
+        'symbol': gene_ref.findtext('Gene-ref_locus'),
+        'description': gene_ref.findtext('Gene-ref_desc'),
+        'maploc': gene_ref.findtext('Gene-ref_maploc'),
+        'formal_name': gene_ref.findtext('Gene-ref_formal-name'),
+        'db': gene_ref.findtext('Gene-ref_db'),
+        'synonyms': synonyms,
+    }
+
+def nomenclature_info(nomenclature: ET.Element) -> Dict[str, Any]:
+    return {
+        'symbol': nomenclature.findtext('Gene-nomenclature_symbol'),
+        'name': nomenclature.findtext('Gene-nomenclature_name'),
+        'status': nomenclature.findtext('Gene-nomenclature_status'),
+        'source': nomenclature.findtext('Gene-nomenclature_source')
+    }
+
+def prot_ref_info(prot_ref: ET.Element) -> Dict[str, Any]:
+    protein = {
+        'name': prot_ref.findtext('Prot-ref_name'),
+        'description': prot_ref.findtext('Prot-ref_desc')
+    }
+    alt_names = []
+    for name_elem in prot_ref.findall('Prot-ref_name_E'):
+        if name_elem.text:
+            alt_names.append(name_elem.text)
+    if alt_names:
+        protein['alternative_names'] = alt_names
+    return protein
+
+def gene_commentary_fields(commentary: ET.Element) -> Dict[str, Any]:
+    """Собственные поля Gene-commentary (без вложенных комментариев, продуктов и ссылок)"""
+    comment_data = {}
+
+    comment_data['type'] = get_element_attribute(commentary, 'Gene-commentary_type', 'value')
+    comment_data['heading'] = commentary.findtext('Gene-commentary_heading')
+    comment_data['text'] = commentary.findtext('Gene-commentary_text')
+    comment_data['label'] = commentary.findtext('Gene-commentary_label')
+    comment_data['accession'] = commentary.findtext('Gene-commentary_accession')
+    comment_data['version'] = commentary.findtext('Gene-commentary_version')
+
+    comment_data['create_date'] = commentary.findtext('Gene-commentary_create-date')
+    comment_data['update_date'] = commentary.findtext('Gene-commentary_update-date')
+
+    genomic_coords = commentary.find('Gene-commentary_genomic-coords')
+    if genomic_coords is not None:
+        comment_data['genomic_coords'] = extract_genomic_coords(genomic_coords)
+
+    source = commentary.find('Gene-commentary_source')
+    if source is not None:
+        comment_data['source'] = extract_source_info(source)
+
+    return comment_data
+
+def gene_commentary_tail(commentary: ET.Element, comment_data: Dict[str, Any]):
+    """Последовательности и дополнительные свойства Gene-commentary"""
+    seqs = []
+    for seq in commentary.findall('Gene-commentary_seqs/Seq-loc'):
+        seq_data = extract_sequence_location(seq)
+        if seq_data:
+            seqs.append(seq_data)
+    if seqs:
+        comment_data['sequences'] = seqs
+
+    xtra_props = commentary.find('Gene-commentary_xtra-properties')
+    if xtra_props is not None:
+        comment_data['extra_properties'] = extract_xtra_properties(xtra_props)
+
+def other_source_info(other_source: ET.Element) -> Dict[str, Any]:
+    return {
+        'anchor': other_source.findtext('Other-source_anchor'),
+        'pre_text': other_source.findtext('Other-source_pre-text'),
+        'post_text': other_source.findtext('Other-source_post-text'),
+        'src': other_source.findtext('Other-source_src'),
+        'url': other_source.findtext('Other-source_url')
+    }
+
+def xtra_term_info(term: ET.Element) -> Optional[Dict[str, str]]:
+    tag = term.findtext('Xtra-Terms_tag')
+    value = term.findtext('Xtra-Terms_value')
+    if tag and value:
+        return {'tag': tag, 'value': value}
+    return None
+
+def dbtag_info(dbtag: ET.Element) -> Optional[Dict[str, str]]:
+    db = dbtag.findtext('Dbtag_db')
+    tag = dbtag.findtext('Dbtag_tag')
+    if db and tag:
+        return {'db': db, 'tag': tag}
+    return None
+
+def object_id_info(obj_id: ET.Element) -> Optional[Dict[str, Any]]:
+    obj_data = {
+        'id': obj_id.findtext('Object-id_id'),
+        'str': obj_id.findtext('Object-id_str')
+    }
+    return obj_data if any(obj_data.values()) else None
+
+def gene_track_info(track_info: ET.Element) -> Dict[str, Any]:
+    return {
+        'geneid': track_info.findtext('Gene-track_geneid'),
+        'status': track_info.findtext('Gene-track_status'),
+        'create_date': track_info.findtext('Gene-track_create-date'),
+        'update_date': track_info.findtext('Gene-track_update-date')
+    }
+
+def gene_source_info(gene_source: ET.Element) -> Dict[str, Any]:
+    return {
+        'src': gene_source.findtext('Gene-source_src'),
+        'src_int': gene_source.findtext('Gene-source_src-int'),
+        'src_str2': gene_source.findtext('Gene-source_src-str2')
+    }
+
+def biosource_element_info(bio_source: ET.Element) -> Dict[str, Any]:
+    biosource = {}
+    biosource['genome'] = bio_source.findtext('BioSource_genome')
+    biosource['origin'] = bio_source.findtext('BioSource_origin')
+
+    org = bio_source.find('BioSource_org')
+    if org is not None:
+        biosource['organism'] = extract_organism_info(org)
+
+    subtypes = []
+    for subtype in bio_source.findall('BioSource_subtype'):
+        subtype_data = {
+            'name': subtype.findtext('SubSource_name'),
+            'subtype': subtype.findtext('SubSource_subtype')
+        }
+        if subtype_data['name'] or subtype_data['subtype']:
+            subtypes.append(subtype_data)
+    if subtypes:
+        biosource['subtypes'] = subtypes
+
+    return biosource
+
+def extract_genomic_coords(genomic_coords_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает геномные координаты"""
+    coords_data = {}
+
+    seq_loc = genomic_coords_element.find('Seq-loc')
+    if seq_loc is not None:
+        coords_data['seq_loc'] = extract_sequence_location(seq_loc)
+
+    return coords_data
+
+def extract_source_info(source_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию об источнике"""
+    source_data = {}
+
+    other_source = source_element.find('Other-source')
+    if other_source is not None:
+        source_data['other_source'] = other_source_info(other_source)
+
+    return source_data
+
+def extract_xtra_properties(xtra_props_element: ET.Element) -> List[Dict[str, str]]:
+    """Извлекает дополнительные свойства"""
+    properties = []
+
+    for term in xtra_props_element.findall('Xtra-Terms'):
+        term_data = xtra_term_info(term)
+        if term_data:
+            properties.append(term_data)
+
+    return properties
+
+def extract_organism_info(org_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает полную информацию об организме"""
+    organism = {}
+
+    org_ref = org_element.find('Org-ref')
+    if org_ref is not None:
+        organism['common_name'] = org_ref.findtext('Org-ref_common')
+        organism['taxname'] = org_ref.findtext('Org-ref_taxname')
+        organism['db'] = org_ref.findtext('Org-ref_db')
+
+    org_name = org_element.find('OrgName')
+    if org_name is not None:
+        organism['lineage'] = org_name.findtext('OrgName_lineage')
+        organism['gcode'] = org_name.findtext('OrgName_gcode')
+        organism['mgcode'] = org_name.findtext('OrgName_mgcode')
+        organism['div'] = org_name.findtext('OrgName_div')
+        organism['attrib'] = org_name.get('attrib')
+
+        binomial = org_name.find('OrgName_name/BinomialOrgName')
+        if binomial is not None:
+            organism['binomial'] = {
+                'genus': binomial.findtext('BinomialOrgName_genus'),
+                'species': binomial.findtext('BinomialOrgName_species')
+            }
+
+    return organism
+
+def extract_location_info(location_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о локализации"""
+    location = {}
+
+    seq_interval = location_element.find('.//Seq-interval')
+    if seq_interval is not None:
+        location['seq_interval'] = {
+            'from': seq_interval.findtext('Seq-interval_from'),
+            'to': seq_interval.findtext('Seq-interval_to'),
+            'strand': seq_interval.findtext('Seq-interval_strand'),
+            'id': extract_seq_id(seq_interval.find('Seq-interval_id'))
+        }
+
+    seq_loc = location_element.find('.//Seq-loc')
+    if seq_loc is not None:
+        location['seq_loc'] = extract_sequence_location(seq_loc)
+
+    return location
+
+def extract_sequence_location(seq_loc: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о последовательности"""
+    seq_data = {}
+
+    whole = seq_loc.find('Seq-loc_whole')
+    if whole is not None:
+        seq_data['whole'] = extract_seq_id(whole.find('Seq-id'))
+
+    interval = seq_loc.find('Seq-loc_int')
+    if interval is not None:
+        seq_data['interval'] = extract_seq_interval(interval)
+
+    return seq_data
+
+def extract_seq_interval(interval_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию об интервале последовательности"""
+    interval = {}
+
+    seq_interval = interval_element.find('Seq-interval')
+    if seq_interval is not None:
+        interval['from'] = seq_interval.findtext('Seq-interval_from')
+        interval['to'] = seq_interval.findtext('Seq-interval_to')
+        interval['strand'] = seq_interval.findtext('Seq-interval_strand')
+        interval['seq_id'] = extract_seq_id(seq_interval.find('Seq-interval_id/Seq-id'))
+
+    return interval
+
+def extract_seq_id(seq_id_element: Optional[ET.Element]) -> Dict[str, str]:
+    """Извлекает информацию о Seq-id"""
+    if seq_id_element is None:
+        return {}
+
+    seq_id_data = {}
+    gi = seq_id_element.findtext('Seq-id_gi')
+    if gi:
+        seq_id_data['gi'] = gi
+
+    return seq_id_data
+
+def extract_publication_info(pub_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о публикации"""
+    pub_data = {}
+
+    pub_data['pmid'] = pub_element.findtext('Pub_pmid')
+
+    pubmed_id = pub_element.find('PubMedId')
+    if pubmed_id is not None:
+        pub_data['pubmed_id'] = pubmed_id.text
+
+    return pub_data
+
+def extract_date_info(date_element: ET.Element) -> Dict[str, Any]:
+    """Извлекает информацию о дате"""
+    date_data = {}
+
+    date_std = date_element.find('Date-std')
+    if date_std is not None:
+        date_data['std'] = {
+            'year': date_std.findtext('Date-std_year'),
+            'month': date_std.findtext('Date-std_month'),
+            'day': date_std.findtext('Date-std_day'),
+            'hour': date_std.findtext('Date-std_hour'),
+            'minute': date_std.findtext('Date-std_minute'),
+            'second': date_std.findtext('Date-std_second')
+        }
+
+    return date_data
+
+
+# ============================================================================
+# Потоковый разбор
+# ============================================================================
+
+def _other_source_or_none(elem: ET.Element) -> Optional[Dict[str, Any]]:
+    data = other_source_info(elem)
+    return data if any(data.values()) else None
+
+def _date_or_none(elem: ET.Element) -> Optional[Dict[str, Any]]:
+    return extract_date_info(elem) or None
+
+# Элементы, собираемые со всего документа (аналоги root.findall('.//Tag'))
+_COLLECTED = {
+    'Pub': extract_publication_info,
+    'Dbtag': dbtag_info,
+    'Object-id': object_id_info,
+    'Date': _date_or_none,
+    'Xtra-Terms': xtra_term_info,
+    'Other-source': _other_source_or_none,
+}
+
+# Разделы, для которых берётся только первое вхождение (аналоги root.find('.//Tag'))
+_FIRST = {
+    'Entrezgene': entrezgene_element_info,
+    'Gene-ref': gene_ref_info,
+    'Gene-nomenclature': nomenclature_info,
+    'Entrezgene_summary': lambda e: e.text,
+    'Entrezgene_locus': lambda e: e.text,
+    'Prot-ref': prot_ref_info,
+    'BioSource': biosource_element_info,
+    'Entrezgene_location': extract_location_info,
+    'Maps_display-str': lambda e: e.text,
+    'Maps_method': lambda e: {'map_type': e.findtext('Maps_method_map-type')},
+    'Na-strand': lambda e: e.text,
+    'Gene-track': gene_track_info,
+    'Gene-source': gene_source_info,
+}
+
+
+# Только эти элементы бывают вложены сами в себя (Pub внутри Pub-equiv,
+# Gene-commentary внутри Gene-commentary): место в списке для них резервируется
+# на открывающем теге, чтобы сохранить порядок документа. Остальные
+# добавляются на закрывающем теге.
+_NESTED = frozenset({'Pub', 'Gene-commentary'})
+_HANDLED = frozenset(_COLLECTED) | frozenset(_FIRST) | _NESTED | {'E'}
+
+
+class _Commentary:
+    __slots__ = ('elem', 'comments', 'products', 'refs')
+
+    def __init__(self, elem: ET.Element):
+        self.elem = elem
+        self.comments = []
+        self.products = []
+        self.refs = []
+
+
+class GeneXmlParser:
+    """
+    Инкрементальный парсер: feed() принимает куски XML по мере скачивания,
+    close() возвращает all_data. Все разделы собираются за один проход.
+    """
+
+    def __init__(self):
+        # expat напрямую: элементы строит C-шный TreeBuilder, а Python-обработчики
+        # на открытии/закрытии тега лишь ведут стек и проверяют тег по множеству.
+        self._builder = ET.TreeBuilder()
+        self._parser = expat.ParserCreate()
+        self._parser.buffer_text = True
+        self._parser.CharacterDataHandler = self._builder.data
+        self._stack: List[ET.Element] = []
+        self._frames: List[_Commentary] = []
+        self._ordered: Dict[str, list] = {tag: [] for tag in _NESTED}
+        self._slot_of: Dict[ET.Element, int] = {}
+        self._items: Dict[str, list] = {tag: [] for tag in _COLLECTED if tag not in _NESTED}
+        self._first: Dict[str, Any] = {}
+        self._additional_props: List[Dict[str, str]] = []
+        self._index_terms: List[str] = []
+        self._parser.StartElementHandler, self._parser.EndElementHandler = self._handlers()
+
+    def feed(self, data: bytes):
+        self._parser.Parse(data, False)
+
+    def close(self) -> Dict[str, Any]:
+        self._parser.Parse(b'', True)
+        return self._result()
+
+    def _handlers(self):
+        # Замыкания вместо методов: вызываются на каждый элемент документа
+        builder_start, builder_end = self._builder.start, self._builder.end
+        stack, start, end = self._stack, self._start, self._end
+
+        def on_start(tag: str, attrs: Dict[str, str]):
+            elem = builder_start(tag, attrs)
+            # Корень документа пропускается, как и в .//Tag
+            if tag in _NESTED and stack:
+                start(elem)
+            stack.append(elem)
+
+        def on_end(tag: str):
+            elem = builder_end(tag)
+            stack.pop()
+            if tag in _HANDLED and stack:
+                end(elem)
+
+        return on_start, on_end
+
+    def _start(self, elem: ET.Element):
+        slots = self._ordered[elem.tag]
+        self._slot_of[elem] = len(slots)
+        slots.append(None)
+        if elem.tag == 'Gene-commentary':
+            self._frames.append(_Commentary(elem))
+
+    def _end(self, elem: ET.Element):
+        tag = elem.tag
+        stack = self._stack
+        parent = stack[-1]
+        grandparent = stack[-2] if len(stack) > 1 else None
+        prune = False
+
+        if tag in _NESTED:
+            if tag == 'Gene-commentary':
+                data = self._commentary(self._frames.pop())
+            else:
+                data = extract_publication_info(elem)
+            self._ordered[tag][self._slot_of.pop(elem)] = data
+
+            owner = self._frames[-1] if self._frames else None
+            if owner is not None and grandparent is owner.elem:
+                if parent.tag == 'Gene-commentary_refs' and tag == 'Pub':
+                    owner.refs.append(data)
+                elif parent.tag == 'Gene-commentary_comment' and tag == 'Gene-commentary':
+                    owner.comments.append(data)
+                elif parent.tag == 'Gene-commentary_products' and tag == 'Gene-commentary':
+                    owner.products.append(data)
+            prune = True
+        elif tag in _COLLECTED:
+            data = _COLLECTED[tag](elem)
+            if data:
+                self._items[tag].append(data)
+                if tag == 'Xtra-Terms' and parent.tag == 'Entrezgene_xtra-properties':
+                    self._additional_props.append(data)
+        elif tag == 'E':
+            if parent.tag == 'Entrezgene_xtra-index-terms' and elem.text:
+                self._index_terms.append(elem.text)
+        elif tag not in self._first:
+            if tag != 'Prot-ref' or parent.tag == 'Entrezgene_prot':
+                self._first[tag] = _FIRST[tag](elem)
+                prune = tag == 'Entrezgene'
+
+        # Обработанный элемент больше никому не нужен — убираем его из дерева
+        if prune:
+            if parent[-1] is elem:
+                del parent[-1]
+            else:
+                parent.remove(elem)
+
+    @staticmethod
+    def _commentary(frame: _Commentary) -> Dict[str, Any]:
+        # Вложенные комментарии, продукты и ссылки уже разобраны и удалены из дерева
+        comment_data = gene_commentary_fields(frame.elem)
+        if frame.comments:
+            comment_data['comments'] = frame.comments
+        if frame.products:
+            comment_data['products'] = frame.products
+        if frame.refs:
+            comment_data['references'] = frame.refs
+        gene_commentary_tail(frame.elem, comment_data)
+        return comment_data
+
+    def _collected(self, tag: str) -> list:
+        if tag in _NESTED:
+            return [item for item in self._ordered[tag] if item]
+        return self._items[tag]
+
+    def _result(self) -> Dict[str, Any]:
+        first = self._first
+        all_data = {}
+
+        all_data['entrezgene'] = first.get('Entrezgene', {})
+
+        gene_info = {}
+        if 'Gene-ref' in first:
+            gene_info.update(first['Gene-ref'])
+        if 'Gene-nomenclature' in first:
+            gene_info['nomenclature'] = first['Gene-nomenclature']
+        if 'Entrezgene_summary' in first:
+            gene_info['summary'] = first['Entrezgene_summary']
+        if 'Entrezgene_locus' in first:
+            gene_info['locus'] = first['Entrezgene_locus']
+        if 'Prot-ref' in first:
+            gene_info['protein'] = first['Prot-ref']
+        all_data['gene_info'] = gene_info
+
+        all_data['gene_commentaries'] = self._collected('Gene-commentary')
+        all_data['biosource'] = first.get('BioSource', {})
+
+        genomics = {}
+        for tag, key in (('Entrezgene_location', 'location'), ('Maps_display-str', 'maps_display'),
+                         ('Maps_method', 'maps_method'), ('Na-strand', 'na_strand')):
+            if tag in first:
+                genomics[key] = first[tag]
+        all_data['genomics'] = genomics
+
+        all_data['publications'] = self._collected('Pub')
+
+        properties = {}
+        for key, items in (('xtra_terms', self._collected('Xtra-Terms')),
+                           ('additional_properties', self._additional_props),
+                           ('index_terms', self._index_terms)):
+            if items:
+                properties[key] = items
+        all_data['properties'] = properties
+
+        technical = {}
+        if 'Gene-track' in first:
+            technical['track'] = first['Gene-track']
+        if 'Gene-source' in first:
+            technical['gene_source'] = first['Gene-source']
+        dates = self._collected('Date')
+        if dates:
+            technical['dates'] = dates
+        all_data['technical'] = technical
+
+        additional = {}
+        for key, tag in (('other_sources', 'Other-source'), ('external_dbs', 'Dbtag'), ('object_ids', 'Object-id')):
+            items = self._collected(tag)
+            if items:
+                additional[key] = items
+        all_data['additional'] = additional
+
+        return all_data
+
+
+def parse_gene_xml(chunks: Iterable[bytes]) -> Dict[str, Any]:
+    """Однопроходный разбор XML записи гена, поданного кусками"""
+    parser = GeneXmlParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
@@ -1,15 +1,31 @@
 import os
-from smolagents import ToolCallingAgent, ToolCollection
-from smolagents.models import OpenAIServerModel
+from smolagents import ToolCallingAgent
 from mcp import StdioServerParameters
-import requests
 import xml.etree.ElementTree as ET
 import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-import time
-import re
-from typing import Set
+from concurrent.futures import ThreadPoolExecutor
+from backend.services.http_client import HttpClient
+from backend.services.ncbi_mcp_server.gene_xml import parse_gene_xml
+from backend.services.ncbi_mcp_server.genbank import Feature, GenBankRecord, Reference, parse_genbank
+from backend.services.ncbi_mcp_server.pubmed import format_abstracts, search_pubmed
+from backend.services.llm import get_model
+from backend.services.mcp_tools import SourceCancelled, check_cancelled, in_current_scope, open_tools, step_callbacks
+
+MODEL = "Qwen/Qwen3-235B-A22B-Instruct-2507"
+PROMPT_VERSION = 3
+
+# Сколько полей гена/белка суммаризируется параллельно
+SUMMARY_CONCURRENCY = int(os.environ.get("NCBI_SUMMARY_CONCURRENCY", 6))
+# Сколько белков (изоформ) суммаризируется параллельно
+PROTEIN_CONCURRENCY = int(os.environ.get("NCBI_PROTEIN_CONCURRENCY", 4))
+# Сколько аннотаций PubMed уходит в один промпт анализа
+PUBMED_ANALYSIS_BATCH = int(os.environ.get("NCBI_PUBMED_ANALYSIS_BATCH", 25))
+
+# Общий клиент E-utilities: keep-alive пул и повторы с backoff/Retry-After
+EUTILS_TIMEOUT = 60
+_http = HttpClient()
 
 def set_system_prompt(protein: str) -> str:
     return """
@@ -168,23 +184,26 @@ RULES:
 
 def set_user_prompt_pubmed_analysis(data: dict) -> str:
     return f"""
-GENE ANALYSIS FOR AGING KNOWLEDGE BASE - PubMed SEARCH
+GENE ANALYSIS FOR AGING KNOWLEDGE BASE - PubMed ABSTRACTS
 
 GENE INFORMATION:
 {data["gene_info"]}
 
+PUBMED ABSTRACTS:
+{data["abstracts"]}
+
 TASK:
-Using the structural gene information above, search PubMed for relevant articles and analyze abstracts to extract data about:
+Using the structural gene information above, analyze the PubMed abstracts provided and extract data about:
 
 1. SPECIFIC SEQUENCE MODIFICATIONS (mutations, substitutions, deletions in domains)
 2. FUNCTIONAL CHANGES from these modifications  
 3. AGING/LONGEVITY ASSOCIATIONS
 
-SEARCH INSTRUCTIONS:
-- Use domains and functional sites from gene information for targeted queries
-- Search for specific terms: "engineered", "mutant", "mutation", "variant", "phosphorylation", "methylation"
-- Combine with aging terms: "aging", "longevity", "lifespan", "senescence", "reprogramming"
-- Analyze abstracts for experimental data
+ANALYSIS INSTRUCTIONS:
+- Use domains and functional sites from gene information to judge relevance
+- Look for: "engineered", "mutant", "mutation", "variant", "phosphorylation", "methylation"
+- Connect findings with aging terms: "aging", "longevity", "lifespan", "senescence", "reprogramming"
+- Analyze ONLY the abstracts listed above, do not cite other articles
 
 STRICT ANTI-HALLUCINATION RULES:
 - ONLY report information explicitly stated in PubMed abstracts
@@ -227,122 +246,6 @@ ADDITIONAL RULES:
 - Use exact wording from abstracts when possible
 """
 
-def set_aggressive_search_prompt(data: dict) -> str:
-    return f"""
-ADAPTIVE AGGRESSIVE PUBMED SEARCH FOR PROTEIN ENGINEERING
-
-GENE INFORMATION:
-{data["gene_info"]}
-
-ALREADY FOUND ARTICLES (EXCLUDE THESE):
-{data["found_articles"]}
-
-CRITICAL SEARCH STRATEGY INSTRUCTIONS:
-
-ADAPTIVE AGGRESSION PROTOCOL:
-The MORE articles we have already found, and the FEWER new results you get initially, the MORE AGGRESSIVE and CREATIVE you must become in your search strategy.
-
-AGGRESSION SCALE:
-- If finding FEW new articles (<3): Use MAXIMUM CREATIVITY and BROADEST queries
-- If finding SOME articles (3-5): Use MODERATE CREATIVITY with targeted expansion  
-- If finding MANY articles (>5): Use STANDARD targeted approach
-
-CREATIVITY ESCALATION PATH:
-1. FIRST: Standard structural-based queries (domains, modifications, aging)
-2. THEN: Expand to RELATED biological processes and pathways
-3. THEN: Explore EVOLUTIONARY and COMPARATIVE approaches
-4. THEN: Use CONCEPTUAL and MECHANISTIC analogies
-5. FINALLY: Try UNCONVENTIONAL but biologically plausible angles
-
-MAXIMUM CREATIVITY MODE TRIGGERS:
-- After 2+ search iterations with diminishing returns
-- When standard queries yield <2 relevant articles
-- When we need to uncover novel/emerging research directions
-
-CREATIVE SEARCH ANGLES (use when needed):
-- "Protein dynamics AND cellular aging AND {data["gene_name"]}"
-- "Evolutionary conservation AND longevity pathways AND {data["gene_name"]}"  
-- "Structural plasticity AND age-related diseases AND {data["gene_name"]}"
-- "Metabolic regulation AND stem cell aging AND {data["gene_name"]}"
-- "Epigenetic memory AND rejuvenation mechanisms AND {data["gene_name"]}"
-- "Network analysis AND aging biomarkers AND {data["gene_name"]}"
-- "Cross-species comparison AND {data["gene_name"]} longevity"
-- "Protein-protein interactions AND aging networks AND {data["gene_name"]}"
-
-TASK:
-Find NEW articles not in the excluded list. Be progressively MORE CREATIVE if initial searches yield few results.
-
-DATA EXTRACTION FOCUS:
-1. SPECIFIC SEQUENCE MODIFICATIONS (mutations, substitutions, deletions in domains)
-2. FUNCTIONAL CHANGES from these modifications  
-3. AGING/LONGEVITY ASSOCIATIONS
-
-RELEVANCE FILTERING:
-Even in aggressive mode, MAINTAIN STRICT RELEVANCE:
-- Must connect to protein sequence, structure, or function
-- Must have plausible link to aging/longevity mechanisms
-- Prefer articles with experimental data over theoretical
-
-STRICT ANTI-HALLUCINATION RULES:
-- ONLY report information explicitly stated in PubMed abstracts
-- NEVER invent or assume modification details
-- EVERY claim must be directly sourced to specific PMID
-
-OUTPUT FORMAT:
-
-=== NEW PUBMED SEARCH RESULTS ===
-
-[For each NEW article found]
-PMID: [number] - [Article Title]
-- Found modifications: [specific substitutions/mutations] [SOURCE: PMID]
-- Functional changes: [what changed] [SOURCE: PMID] 
-- Aging association: [how related to aging] [SOURCE: PMID]
-- Evidence level: [High/Medium/Low]
-- Search aggression: [Standard / Creative / Highly Creative]
-
-=== NEW DATA SUMMARY TABLE ===
-| Domain/Interval | Modification Type | Effect | Aging | Source PMID |
-
-=== AGGRESSION STRATEGY REPORT ===
-- Initial results: [number found with standard approach]
-- Creative escalation: [Yes/No and which creative approaches used]
-- Final article count: [total new relevant articles]
-- Recommendation: [Continue aggressive search / Sufficient coverage / Switch genes]
-
-FINAL DIRECTIVE:
-DO NOT stop searching until you have exhausted creative approaches or found sufficient new data. The goal is MAXIMUM COVERAGE of relevant literature.
-"""
-
-def set_extraction_prompt(search_results_text: str) -> str:
-    return f"""
-    EXTRACT ONLY PMID AND TITLE LINES FROM SEARCH RESULTS
-
-    SEARCH RESULTS TEXT:
-    {search_results_text}
-
-    TASK:
-    Extract ONLY the lines that contain "PMID: [number] - [Article Title]". Ignore everything else.
-
-    RULES:
-    1. Extract ONLY lines that match pattern "PMID: [digits] - [text]"
-    2. Skip all analysis, summaries, tables, and other text
-    3. Preserve exact wording including punctuation
-    4. Remove duplicate lines if same PMID appears multiple times
-    5. Return each matching line on a separate line
-
-    OUTPUT FORMAT:
-    Return ONLY the extracted lines, one per line. No other text.
-
-    EXAMPLES:
-    Input: "PMID: 28059768 - SOX2 promotes lineage plasticity and antiandrogen resistance in TP53- and RB1-deficient prostate cancer."
-    Output: "PMID: 28059768 - SOX2 promotes lineage plasticity and antiandrogen resistance in TP53- and RB1-deficient prostate cancer."
-
-    Input: "Some analysis text... PMID: 33268865 - Reprogramming to recover youthful epigenetic information and restore vision. More analysis..."
-    Output: "PMID: 33268865 - Reprogramming to recover youthful epigenetic information and restore vision."
-
-    EXTRACT NOW:
-    """
-
 def set_cleanup_results_prompt(accumulated_results: str) -> str:
     return f"""
     CLEAN AND STRUCTURE ACCUMULATED SEARCH RESULTS
@@ -410,22 +313,21 @@ def set_cleanup_results_prompt(accumulated_results: str) -> str:
 def run_super_agent(info: str, steps: int, user_promt_func: Any, protein: str) -> str:
     """Запуск супер-агента для хакатона с увеличенным количеством шагов"""
     try:
-        with ToolCollection.from_mcp(
-                server_parameters=set_server_stdio(),
-                trust_remote_code=True,
-                structured_output=False
-        ) as tools:
+        with open_tools(set_server_stdio()) as tools:
 
             agent = ToolCallingAgent(
                 model=set_model(),
                 tools=[*tools.tools],
                 add_base_tools=False,
                 max_steps=steps,
+                step_callbacks=step_callbacks(),
             )
             agent.prompt_templates["system_prompt"] = set_system_prompt(protein)
             user_message = user_promt_func(info)
             result = agent.run(user_message)
         return result
+    except SourceCancelled:
+        raise
     except Exception as e:
         return f"Ошибка: {e}"
 
@@ -461,13 +363,9 @@ def get_element_text_fixed(element: Optional[ET.Element], path: str, namespaces:
 
 def call_llm_directly(prompt: str) -> str:
     """Прямой вызов LLM модели для суммаризации"""
+    check_cancelled()
     try:
-        model = OpenAIServerModel(
-            model_id="Qwen/Qwen3-235B-A22B-Instruct-2507",
-            api_key=os.environ["NEBIUS_API_KEY"],
-            api_base="https://api.studio.nebius.com/v1/",
-            temperature=0.1
-        )
+        model = get_model(MODEL, temperature=0.1)
 
         messages = [{"role": "user", "content": prompt}]
         response = model(messages)
@@ -475,51 +373,52 @@ def call_llm_directly(prompt: str) -> str:
     except Exception as e:
         return f"Ошибка LLM: {e}"
 
-def parse_protein_all_fields(protein_accession: str) -> Dict[str, Any]:
+def fetch_proteins_all_fields(protein_accessions: List[str]) -> Dict[str, Any]:
     """
-    ИЗВЛЕКАЕТ ДАННЫЕ ИЗ ВСЕХ ПОЛЕЙ БЕЛКА В СЛОВАРЬ
+    ОДИН запрос efetch на все белки (id через запятую). Ответ разбирается
+    потоково в GenBankRecord и сопоставляется с запрошенными accession.
+    Для отсутствующих — {'error': ...}
     """
+    if not protein_accessions:
+        return {}
     try:
         url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
         params = {
             'db': 'protein',
-            'id': protein_accession,
+            'id': ','.join(protein_accessions),
             'rettype': 'gb',
             'retmode': 'text'
         }
 
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-
-        protein_data = {}
-        lines = response.text.split('\n')
-        current_field = None
-        field_content = []
+        with _http.stream("GET", url, params=params, timeout=EUTILS_TIMEOUT) as response:
+            records = list(parse_genbank(response.iter_lines()))
 
-        for line in lines:
-            line = line.rstrip()
-
-            if line and line[0].isupper() and not line.startswith(' '):
-                if current_field and field_content:
-                    protein_data[current_field] = '\n'.join(field_content).strip()
-
-                current_field = line.split()[0] if line.split() else None
-                field_content = [line[12:].strip()] if len(line) > 12 else [line]
+    except Exception as e:
+        return {accession: {'error': f'Ошибка: {str(e)}'} for accession in protein_accessions}
 
-            elif current_field and line.startswith(' '):
-                field_content.append(line.strip())
+    by_accession = {}
+    for record in records:
+        for name in record.names():
+            by_accession.setdefault(name, record)
 
-        if current_field and field_content:
-            protein_data[current_field] = '\n'.join(field_content).strip()
+    result = {}
+    for accession in protein_accessions:
+        record = by_accession.get(accession) or by_accession.get(accession.split('.')[0])
+        result[accession] = record if record is not None else {'error': f'Запись {accession} не найдена в ответе efetch'}
+    return result
 
-        return protein_data
+def parse_protein_all_fields(protein_accession: str):
+    """
+    ИЗВЛЕКАЕТ ЗАПИСЬ БЕЛКА (GenBankRecord) ИЛИ {'error': ...}
+    """
+    return fetch_proteins_all_fields([protein_accession])[protein_accession]
 
-    except Exception as e:
-        return {'error': f'Ошибка: {str(e)}'}
+_PTM_MARKERS = ('phospho', 'acetyl', 'methyl')
 
-def extract_protein_features(features_text: str) -> Dict[str, Any]:
+def extract_protein_features(features: List[Feature]) -> Dict[str, Any]:
     """
-    Парсит раздел FEATURES белка - самый важный для хакатона!
+    Раскладывает типизированные фичи белка по группам - самый важный раздел для хакатона!
+    Локализация берётся из точных интервалов фичи
     """
     features_data = {
         'domains': [],
@@ -528,90 +427,90 @@ def extract_protein_features(features_text: str) -> Dict[str, Any]:
         'modifications': []
     }
 
-    lines = features_text.split('\n')
-    current_feature = None
-    current_content = []
+    for feature in features:
+        description = feature.describe()
+        lowered = description.lower()
+
+        if feature.type == 'Region':
+            group, kind = 'domains', 'domain'
+        elif feature.type == 'Site':
+            group, kind = 'sites', 'site'
+        elif 'binding' in lowered:
+            group, kind = 'sites', 'binding_site'
+        elif any(mod in lowered for mod in _PTM_MARKERS):
+            group, kind = 'modifications', 'ptm'
+        else:
+            continue
+
+        entry = {
+            'type': kind,
+            'description': description,
+            'location': feature.location,
+            'start': feature.start,
+            'end': feature.end,
+        }
+        name = feature.get('region_name') or feature.get('site_type') or feature.get('name')
+        if name:
+            entry['name'] = name
+        if len(feature.intervals) > 1:
+            entry['intervals'] = [[i.start, i.end] for i in feature.intervals]
+        features_data[group].append(entry)
 
-    for line in lines:
-        line = line.strip()
-        if line and not line.startswith('/'):
-            if current_feature and current_content:
-                save_protein_feature(current_feature, current_content, features_data)
+    return features_data
 
-            parts = line.split()
-            if parts:
-                current_feature = parts[0]
-                current_content = [line]
-        elif line.startswith('/'):
-            current_content.append(line)
+def extract_protein_references(references: List[Reference]) -> List[Dict[str, str]]:
+    """Ссылки записи в виде словарей"""
+    result = []
+    for ref in references:
+        entry = {}
+        if ref.authors or ref.consortium:
+            entry['authors'] = ref.authors or ref.consortium
+        if ref.title:
+            entry['title'] = ref.title
+        if ref.journal:
+            entry['journal'] = ref.journal
+        if ref.pubmed:
+            entry['pmid'] = ref.pubmed
+        if entry:
+            result.append(entry)
+    return result
 
-    if current_feature and current_content:
-        save_protein_feature(current_feature, current_content, features_data)
+class DeferredSummaries:
+    """Параллельная суммаризация независимых полей с сохранением порядка разделов"""
 
-    return features_data
+    def __init__(self, summaries: Dict[str, Any], max_workers: int = SUMMARY_CONCURRENCY):
+        self.summaries = summaries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ncbi-summary")
+        self._pending = {}
 
-def save_protein_feature(feature_type: str, content: List[str], features_data: Dict[str, Any]):
-    """Сохраняет информацию о фиче в структурированном виде"""
-    feature_text = ' '.join(content)
-
-    if feature_type == 'Region':
-        features_data['domains'].append({
-            'type': 'domain',
-            'description': feature_text,
-            'location': extract_location_from_feature(feature_text)
-        })
-    elif feature_type == 'Site':
-        features_data['sites'].append({
-            'type': 'site',
-            'description': feature_text,
-            'location': extract_location_from_feature(feature_text)
-        })
-    elif 'binding' in feature_text.lower():
-        features_data['sites'].append({
-            'type': 'binding_site',
-            'description': feature_text,
-            'location': extract_location_from_feature(feature_text)
-        })
-    elif any(mod in feature_text.lower() for mod in ['phospho', 'acetyl', 'methyl']):
-        features_data['modifications'].append({
-            'type': 'ptm',
-            'description': feature_text,
-            'location': extract_location_from_feature(feature_text)
-        })
-
-def extract_location_from_feature(feature_text: str) -> str:
-    """Извлекает локализацию из текста фичи"""
-    import re
-    match = re.search(r'(\d+\.\.\d+)', feature_text)
-    return match.group(1) if match else ""
-
-def extract_protein_references(references_text: str) -> List[Dict[str, str]]:
-    """Извлекает информацию о ссылках"""
-    references = []
-    lines = references_text.split('\n')
-    current_ref = {}
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith('REFERENCE'):
-            if current_ref:
-                references.append(current_ref)
-            current_ref = {}
-        elif line.startswith('AUTHORS'):
-            current_ref['authors'] = line.replace('AUTHORS', '').strip()
-        elif line.startswith('TITLE'):
-            current_ref['title'] = line.replace('TITLE', '').strip()
-        elif line.startswith('JOURNAL'):
-            current_ref['journal'] = line.replace('JOURNAL', '').strip()
-        elif line.startswith('PUBMED'):
-            current_ref['pmid'] = line.replace('PUBMED', '').strip()
-
-    if current_ref:
-        references.append(current_ref)
-
-    return references
-
-def summarize_ALL_fields_protein(protein_data: Dict[str, Any], llm_call=call_llm_directly, verbose: bool = False) -> Dict[str, Any]:
+    def submit(self, key: str, fn, *args, error_key: str = None, fallback: Dict[str, Any] = None):
+        # Заглушка держит место раздела, результат подставляется в collect()
+        self.summaries[key] = None
+        future = self._executor.submit(in_current_scope(fn), *args)
+        self._pending[key] = (future, error_key or key, fallback or {})
+
+    def collect(self) -> Dict[str, Any]:
+        try:
+            resolved = {}
+            for key, value in self.summaries.items():
+                if key not in self._pending:
+                    resolved[key] = value
+                    continue
+                future, error_key, fallback = self._pending[key]
+                try:
+                    resolved[key] = future.result()
+                except SourceCancelled:
+                    raise
+                except Exception as e:
+                    resolved[f'{error_key}_error'] = str(e)
+                    resolved.update(fallback)
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self.summaries.clear()
+        self.summaries.update(resolved)
+        return self.summaries
+
+def summarize_ALL_fields_protein(record: GenBankRecord, llm_call=call_llm_directly, verbose: bool = False) -> Dict[str, Any]:
     """
     Суммаризация ВСЕХ полей белка с ЖЕСТКИМ запретом галлюцинаций
     """
@@ -661,33 +560,34 @@ def summarize_ALL_fields_protein(protein_data: Dict[str, Any], llm_call=call_llm
         except Exception as e:
             return f"Ошибка суммаризации: {str(e)}"
 
+    deferred = DeferredSummaries(summaries)
+
     log("Этап 1: Обработка основной информации о белке...")
 
-    if 'LOCUS' in protein_data:
+    if record.name:
         summaries['basic_info'] = {
-            'accession': protein_data.get('ACCESSION', ''),
-            'definition': protein_data.get('DEFINITION', ''),
-            'length': protein_data.get('LOCUS', ''),
-            'organism': protein_data.get('SOURCE', '')
+            'accession': record.version or record.accession or '',
+            'definition': record.definition or '',
+            'length': record.length,
+            'organism': record.organism or record.source or ''
         }
 
     log("Этап 2: Обработка FEATURES...")
 
-    if 'FEATURES' in protein_data:
-        features_parsed = extract_protein_features(protein_data['FEATURES'])
+    if record.features:
+        features_parsed = extract_protein_features(record.features)
 
         if features_parsed['domains']:
             if should_summarize_list(features_parsed['domains']):
-                try:
-                    log("  🤖 Суммаризируем домены...")
-                    summaries['domains_summary'] = summarize_field(
-                        'protein_domains',
-                        "Summarize the protein domains FACTUALLY. List domains mentioned with their locations:",
-                        features_parsed['domains']
-                    )
-                except Exception as e:
-                    summaries['domains_error'] = str(e)
-                    summaries['domains_raw'] = features_parsed['domains'][:5]
+                log("  🤖 Суммаризируем домены...")
+                deferred.submit(
+                    'domains_summary', summarize_field,
+                    'protein_domains',
+                    "Summarize the protein domains FACTUALLY. List domains mentioned with their locations:",
+                    features_parsed['domains'],
+                    error_key='domains',
+                    fallback={'domains_raw': features_parsed['domains'][:5]}
+                )
             else:
                 summaries['domains'] = features_parsed['domains']
 
@@ -696,41 +596,42 @@ def summarize_ALL_fields_protein(protein_data: Dict[str, Any], llm_call=call_llm
 
     log("Этап 3: Обработка последовательности...")
 
-    if 'ORIGIN' in protein_data:
-        seq_data = protein_data['ORIGIN']
+    if record.sequence:
+        sequence = record.sequence
         summaries['sequence_info'] = {
             'has_sequence': True,
-            'sequence_length': len([c for c in seq_data if c.isalpha()]),
-            'first_50_aa': ''.join([c for c in seq_data if c.isalpha()])[:50] + '...' if len(seq_data) > 50 else seq_data
+            'sequence_length': len(sequence),
+            'first_50_aa': sequence[:50].decode('ascii').upper() + ('...' if len(sequence) > 50 else '')
         }
 
     log("Этап 4: Обработка ссылок и комментариев...")
 
-    if 'REFERENCE' in protein_data:
-        references = extract_protein_references(protein_data['REFERENCE'])
+    if record.references:
+        references = extract_protein_references(record.references)
         if references and len(references) > 5:
-            try:
-                log("  🤖 Суммаризируем ссылки...")
-                summaries['references_summary'] = summarize_field(
-                    'protein_references',
-                    "List the main publications FACTUALLY:",
-                    [f"{ref.get('pmid', '')}: {ref.get('title', '')[:100]}..." for ref in references[:10]]
-                )
-            except Exception as e:
-                summaries['references_error'] = str(e)
+            log("  🤖 Суммаризируем ссылки...")
+            deferred.submit(
+                'references_summary', summarize_field,
+                'protein_references',
+                "List the main publications FACTUALLY:",
+                [f"{ref.get('pmid', '')}: {ref.get('title', '')[:100]}..." for ref in references[:10]],
+                error_key='references'
+            )
         else:
             summaries['references'] = references
 
-    if 'COMMENT' in protein_data and len(protein_data['COMMENT']) > TEXT_CHAR_THRESHOLD:
-        try:
-            log("  🤖 Суммаризируем комментарий...")
-            summaries['comment_summary'] = summarize_field(
-                'protein_comment',
-                "Summarize the protein comment information FACTUALLY:",
-                protein_data['COMMENT']
-            )
-        except Exception as e:
-            summaries['comment_error'] = str(e)
+    if record.comment and len(record.comment) > TEXT_CHAR_THRESHOLD:
+        log("  🤖 Суммаризируем комментарий...")
+        deferred.submit(
+            'comment_summary', summarize_field,
+            'protein_comment',
+            "Summarize the protein comment information FACTUALLY:",
+            record.comment,
+            error_key='comment'
+        )
+
+    # Дожидаемся параллельных суммаризаций в исходном порядке разделов
+    deferred.collect()
 
     log("Этап 5: Финальная суммаризация...")
 
@@ -778,30 +679,50 @@ def summarize_ALL_fields_protein(protein_data: Dict[str, Any], llm_call=call_llm
 
     return result
 
-def process_protein(protein_accession: str):
+def process_protein(protein_accession: str, record: Optional[GenBankRecord] = None):
     """Полный процесс обработки белка для хакатона"""
     print(f"🔬 Обрабатываем белок: {protein_accession}")
 
-    protein_data = parse_protein_all_fields(protein_accession)
+    if record is None:
+        record = parse_protein_all_fields(protein_accession)
 
-    if 'error' in protein_data:
-        print(f"❌ Ошибка: {protein_data['error']}")
+    if isinstance(record, dict):
+        print(f"❌ Ошибка: {record['error']}")
         return None
 
-    print(f"✅ Получено полей: {list(protein_data.keys())}")
+    print(f"✅ Получена запись: {len(record.features)} фич, {len(record.sequence)} aa, {len(record.references)} ссылок")
 
-    summary = summarize_ALL_fields_protein(protein_data, verbose=True)
+    summary = summarize_ALL_fields_protein(record, verbose=True)
 
     return summary
 
-def get_element_attribute(element: ET.Element, tag: str, attribute: str) -> Optional[str]:
-    """Вспомогательная функция для получения атрибута элемента"""
-    if element is None:
-        return None
-    elem = element.find(tag)
-    if elem is not None:
-        return elem.get(attribute)
-    return None
+def process_proteins(protein_accessions: List[str]) -> List[tuple]:
+    """
+    Все белки одним efetch, затем суммаризация параллельно.
+    Возвращает [(accession, результат или исключение)] в исходном порядке
+    """
+    if not protein_accessions:
+        return []
+    records = fetch_proteins_all_fields(protein_accessions)
+
+    executor = ThreadPoolExecutor(max_workers=min(PROTEIN_CONCURRENCY, len(protein_accessions)),
+                                  thread_name_prefix="ncbi-protein")
+    try:
+        futures = [
+            executor.submit(in_current_scope(process_protein), accession, records[accession])
+            for accession in protein_accessions
+        ]
+        results = []
+        for accession, future in zip(protein_accessions, futures):
+            try:
+                results.append((accession, future.result()))
+            except SourceCancelled:
+                raise
+            except Exception as e:
+                results.append((accession, e))
+        return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 def set_server_stdio(container_name="ncbi-mcp-server"):
     return StdioServerParameters(
@@ -814,500 +735,26 @@ def set_server_stdio(container_name="ncbi-mcp-server"):
     )
 
 def set_model():
-    return OpenAIServerModel(
-        model_id="Qwen/Qwen3-235B-A22B-Instruct-2507",
-        api_key=os.environ["NEBIUS_API_KEY"],
-        api_base="https://api.studio.nebius.com/v1/",
-        temperature=0.1,
-        max_tokens=4000,
-    )
+    return get_model(MODEL, temperature=0.1, max_tokens=4000)
 
 
 
 def extract_ALL_fields_gene(gene_id: str) -> Dict[str, Any]:
     """
     ИЗВЛЕКАЕТ ВСЕ ПОЛЯ из XML гена - ПОЛНОЕ ПОКРЫТИЕ
-    Возвращает готовый словарь со всеми данными
+    Возвращает готовый словарь со всеми данными.
+    XML разбирается потоково, по мере скачивания, за один проход (см. gene_xml)
     """
     base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
     params = {'db': 'gene', 'id': gene_id, 'retmode': 'xml'}
 
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        root = ET.fromstring(response.text)
-
-        all_data = {}
-
-        all_data['entrezgene'] = extract_entrezgene_info(root)
-        all_data['gene_info'] = extract_gene_info(root)
-        all_data['gene_commentaries'] = extract_all_gene_commentaries(root)
-        all_data['biosource'] = extract_biosource_info(root)
-        all_data['genomics'] = extract_genomics_info(root)
-        all_data['publications'] = extract_publications_info(root)
-        all_data['properties'] = extract_properties_info(root)
-        all_data['technical'] = extract_technical_info(root)
-        all_data['additional'] = extract_additional_sections(root)
-
-        return all_data
+        with _http.stream("GET", base_url, params=params, timeout=EUTILS_TIMEOUT) as response:
+            return parse_gene_xml(response.iter_bytes())
 
     except Exception as e:
         return {'error': f'Ошибка парсинга: {str(e)}'}
 
-def extract_entrezgene_info(root: ET.Element) -> Dict[str, Any]:
-    """Извлекает основную структуру Entrezgene"""
-    entrezgene_info = {}
-
-    entrezgene = root.find('.//Entrezgene')
-    if entrezgene is not None:
-        entrezgene_info['type'] = entrezgene.get('type')
-
-        unique_keys = entrezgene.find('Entrezgene_unique-keys')
-        if unique_keys is not None:
-            entrezgene_info['unique_keys'] = [key.text for key in unique_keys.findall('Object-id') if key.text]
-
-        entrezgene_type = entrezgene.find('Entrezgene_type')
-        if entrezgene_type is not None:
-            entrezgene_info['gene_type'] = entrezgene_type.text
-
-    return entrezgene_info
-
-def extract_gene_info(root: ET.Element) -> Dict[str, Any]:
-    """Извлекает основную информацию о гене"""
-    gene_info = {}
-
-    gene_ref = root.find('.//Gene-ref')
-    if gene_ref is not None:
-        gene_info['symbol'] = gene_ref.findtext('Gene-ref_locus')
-        gene_info['description'] = gene_ref.findtext('Gene-ref_desc')
-        gene_info['maploc'] = gene_ref.findtext('Gene-ref_maploc')
-        gene_info['formal_name'] = gene_ref.findtext('Gene-ref_formal-name')
-        gene_info['db'] = gene_ref.findtext('Gene-ref_db')
-
-        synonyms = []
-        for syn in gene_ref.findall('Gene-ref_syn'):
-            if syn.text:
-                synonyms.append(syn.text)
-        gene_info['synonyms'] = synonyms
-
-    nomenclature = root.find('.//Gene-nomenclature')
-    if nomenclature is not None:
-        gene_info['nomenclature'] = {
-            'symbol': nomenclature.findtext('Gene-nomenclature_symbol'),
-            'name': nomenclature.findtext('Gene-nomenclature_name'),
-            'status': nomenclature.findtext('Gene-nomenclature_status'),
-            'source': nomenclature.findtext('Gene-nomenclature_source')
-        }
-
-    summary = root.find('.//Entrezgene_summary')
-    if summary is not None:
-        gene_info['summary'] = summary.text
-
-    locus = root.find('.//Entrezgene_locus')
-    if locus is not None:
-        gene_info['locus'] = locus.text
-
-    prot_ref = root.find('.//Entrezgene_prot/Prot-ref')
-    if prot_ref is not None:
-        gene_info['protein'] = {
-            'name': prot_ref.findtext('Prot-ref_name'),
-            'description': prot_ref.findtext('Prot-ref_desc')
-        }
-        alt_names = []
-        for name_elem in prot_ref.findall('Prot-ref_name_E'):
-            if name_elem.text:
-                alt_names.append(name_elem.text)
-        if alt_names:
-            gene_info['protein']['alternative_names'] = alt_names
-
-    return gene_info
-
-def extract_all_gene_commentaries(root: ET.Element) -> List[Dict[str, Any]]:
-    """Извлекает ВСЕ Gene-commentary с полной структурой"""
-    commentaries = []
-
-    for commentary in root.findall('.//Gene-commentary'):
-        comment_data = extract_gene_commentary_element(commentary)
-        if comment_data:
-            commentaries.append(comment_data)
-
-    return commentaries
-
-def extract_gene_commentary_element(commentary: ET.Element) -> Dict[str, Any]:
-    """Извлекает один элемент Gene-commentary со всеми полями"""
-    comment_data = {}
-
-    comment_data['type'] = get_element_attribute(commentary, 'Gene-commentary_type', 'value')
-    comment_data['heading'] = commentary.findtext('Gene-commentary_heading')
-    comment_data['text'] = commentary.findtext('Gene-commentary_text')
-    comment_data['label'] = commentary.findtext('Gene-commentary_label')
-    comment_data['accession'] = commentary.findtext('Gene-commentary_accession')
-    comment_data['version'] = commentary.findtext('Gene-commentary_version')
-
-    comment_data['create_date'] = commentary.findtext('Gene-commentary_create-date')
-    comment_data['update_date'] = commentary.findtext('Gene-commentary_update-date')
-
-    genomic_coords = commentary.find('Gene-commentary_genomic-coords')
-    if genomic_coords is not None:
-        comment_data['genomic_coords'] = extract_genomic_coords(genomic_coords)
-
-    source = commentary.find('Gene-commentary_source')
-    if source is not None:
-        comment_data['source'] = extract_source_info(source)
-
-    comments = []
-    for comment_elem in commentary.findall('Gene-commentary_comment/Gene-commentary'):
-        nested_comment = extract_gene_commentary_element(comment_elem)
-        if nested_comment:
-            comments.append(nested_comment)
-    if comments:
-        comment_data['comments'] = comments
-
-    products = []
-    for product in commentary.findall('Gene-commentary_products/Gene-commentary'):
-        product_data = extract_gene_commentary_element(product)
-        if product_data:
-            products.append(product_data)
-    if products:
-        comment_data['products'] = products
-
-    refs = []
-    for ref in commentary.findall('Gene-commentary_refs/Pub'):
-        ref_data = extract_publication_info(ref)
-        if ref_data:
-            refs.append(ref_data)
-    if refs:
-        comment_data['references'] = refs
-
-    seqs = []
-    for seq in commentary.findall('Gene-commentary_seqs/Seq-loc'):
-        seq_data = extract_sequence_location(seq)
-        if seq_data:
-            seqs.append(seq_data)
-    if seqs:
-        comment_data['sequences'] = seqs
-
-    xtra_props = commentary.find('Gene-commentary_xtra-properties')
-    if xtra_props is not None:
-        comment_data['extra_properties'] = extract_xtra_properties(xtra_props)
-
-    return comment_data
-
-def extract_genomic_coords(genomic_coords_element: ET.Element) -> Dict[str, Any]:
-    """Извлекает геномные координаты"""
-    coords_data = {}
-
-    seq_loc = genomic_coords_element.find('Seq-loc')
-    if seq_loc is not None:
-        coords_data['seq_loc'] = extract_sequence_location(seq_loc)
-
-    return coords_data
-
-def extract_source_info(source_element: ET.Element) -> Dict[str, Any]:
-    """Извлекает информацию об источнике"""
-    source_data = {}
-
-    other_source = source_element.find('Other-source')
-    if other_source is not None:
-        source_data['other_source'] = {
-            'anchor': other_source.findtext('Other-source_anchor'),
-            'pre_text': other_source.findtext('Other-source_pre-text'),
-            'post_text': other_source.findtext('Other-source_post-text'),
-            'src': other_source.findtext('Other-source_src'),
-            'url': other_source.findtext('Other-source_url')
-        }
-
-    return source_data
-
-def extract_xtra_properties(xtra_props_element: ET.Element) -> List[Dict[str, str]]:
-    """Извлекает дополнительные свойства"""
-    properties = []
-
-    for term in xtra_props_element.findall('Xtra-Terms'):
-        tag = term.findtext('Xtra-Terms_tag')
-        value = term.findtext('Xtra-Terms_value')
-        if tag and value:
-            properties.append({'tag': tag, 'value': value})
-
-    return properties
-
-def extract_biosource_info(root: ET.Element) -> Dict[str, Any]:
-    """Извлекает информацию о биологическом источнике"""
-    biosource = {}
-
-    bio_source = root.find('.//BioSource')
-    if bio_source is not None:
-        biosource['genome'] = bio_source.findtext('BioSource_genome')
-        biosource['origin'] = bio_source.findtext('BioSource_origin')
-
-        org = bio_source.find('BioSource_org')
-        if org is not None:
-            biosource['organism'] = extract_organism_info(org)
-
-        subtypes = []
-        for subtype in bio_source.findall('BioSource_subtype'):
-            subtype_data = {
-                'name': subtype.findtext('SubSource_name'),
-                'subtype': subtype.findtext('SubSource_subtype')
-            }
-            if subtype_data['name'] or subtype_data['subtype']:
-                subtypes.append(subtype_data)
-        if subtypes:
-            biosource['subtypes'] = subtypes
-
-    return biosource
-
-def extract_organism_info(org_element: ET.Element) -> Dict[str, Any]:
-    """Извлекает полную информацию об организме"""
-    organism = {}
-
-    org_ref = org_element.find('Org-ref')
-    if org_ref is not None:
-        organism['common_name'] = org_ref.findtext('Org-ref_common')
-        organism['taxname'] = org_ref.findtext('Org-ref_taxname')
-        organism['db'] = org_ref.findtext('Org-ref_db')
-
-    org_name = org_element.find('OrgName')
-    if org_name is not None:
-        organism['lineage'] = org_name.findtext('OrgName_lineage')
-        organism['gcode'] = org_name.findtext('OrgName_gcode')
-        organism['mgcode'] = org_name.findtext('OrgName_mgcode')
-        organism['div'] = org_name.findtext('OrgName_div')
-        organism['attrib'] = org_name.get('attrib')
-
-        binomial = org_name.find('OrgName_name/BinomialOrgName')
-        if binomial is not None:
-            organism['binomial'] = {
-                'genus': binomial.findtext('BinomialOrgName_genus'),
-                'species': binomial.findtext('BinomialOrgName_species')
-            }
-
-    return organism
-
-def extract_genomics_info(root: ET.Element) -> Dict[str, Any]:
-    """Извлекает геномную информацию"""
-    genomics = {}
-
-    location = root.find('.//Entrezgene_location')
-    if location is not None:
-        genomics['location'] = extract_location_info(location)
-
-    maps_elem = root.find('.//Maps_display-str')
-    if maps_elem is not None:
-        genomics['maps_display'] = maps_elem.text
-
-    maps_method = root.find('.//Maps_method')
-    if maps_method is not None:
-        genomics['maps_method'] = {
-            'map_type': maps_method.findtext('Maps_method_map-type')
-        }
-
-    na_strand = root.find('.//Na-strand')
-    if na_strand is not None:
-        genomics['na_strand'] = na_strand.text
-
-    return genomics
-
-def extract_location_info(location_element: ET.Element) -> Dict[str, Any]:
-    """Извлекает информацию о локализации"""
-    location = {}
-
-    seq_interval = location_element.find('.//Seq-interval')
-    if seq_interval is not None:
-        location['seq_interval'] = {
-            'from': seq_interval.findtext('Seq-interval_from'),
-            'to': seq_interval.findtext('Seq-interval_to'),
-            'strand': seq_interval.findtext('Seq-interval_strand'),
-            'id': extract_seq_id(seq_interval.find('Seq-interval_id'))
-        }
-
-    seq_loc = location_element.find('.//Seq-loc')
-    if seq_loc is not None:
-        location['seq_loc'] = extract_sequence_location(seq_loc)
-
-    return location
-
-def extract_sequence_location(seq_loc: ET.Element) -> Dict[str, Any]:
-    """Извлекает информацию о последовательности"""
-    seq_data = {}
-
-    whole = seq_loc.find('Seq-loc_whole')
-    if whole is not None:
-        seq_data['whole'] = extract_seq_id(whole.find('Seq-id'))
-
-    interval = seq_loc.find('Seq-loc_int')
-    if interval is not None:
-        seq_data['interval'] = extract_seq_interval(interval)
-
-    return seq_data
-
-def extract_seq_interval(interval_element: ET.Element) -> Dict[str, Any]:
-    """Извлекает информацию об интервале последовательности"""
-    interval = {}
-
-    seq_interval = interval_element.find('Seq-interval')
-    if seq_interval is not None:
-        interval['from'] = seq_interval.findtext('Seq-interval_from')
-        interval['to'] = seq_interval.findtext('Seq-interval_to')
-        interval['strand'] = seq_interval.findtext('Seq-interval_strand')
-        interval['seq_id'] = extract_seq_id(seq_interval.find('Seq-interval_id/Seq-id'))
-
-    return interval
-
-def extract_seq_id(seq_id_element: Optional[ET.Element]) -> Dict[str, str]:
-    """Извлекает информацию о Seq-id"""
-    if seq_id_element is None:
-        return {}
-
-    seq_id_data = {}
-    gi = seq_id_element.findtext('Seq-id_gi')
-    if gi:
-        seq_id_data['gi'] = gi
-
-    return seq_id_data
-
-def extract_publications_info(root: ET.Element) -> List[Dict[str, Any]]:
-    """Извлекает информацию о публикациях"""
-    publications = []
-
-    for pub in root.findall('.//Pub'):
-        pub_data = extract_publication_info(pub)
-        if pub_data:
-            publications.append(pub_data)
-
-    return publications
-
-def extract_publication_info(pub_element: ET.Element) -> Dict[str, Any]:
-    """Извлекает информацию о публикации"""
-    pub_data = {}
-
-    pub_data['pmid'] = pub_element.findtext('Pub_pmid')
-
-    pubmed_id = pub_element.find('PubMedId')
-    if pubmed_id is not None:
-        pub_data['pubmed_id'] = pubmed_id.text
-
-    return pub_data
-
-def extract_properties_info(root: ET.Element) -> Dict[str, Any]:
-    """Извлекает свойства и дополнительные данные"""
-    properties = {}
-
-    xtra_terms = []
-    for term in root.findall('.//Xtra-Terms'):
-        tag = term.findtext('Xtra-Terms_tag')
-        value = term.findtext('Xtra-Terms_value')
-        if tag and value:
-            xtra_terms.append({'tag': tag, 'value': value})
-    if xtra_terms:
-        properties['xtra_terms'] = xtra_terms
-
-    additional_props = []
-    for prop in root.findall('.//Entrezgene_xtra-properties/Xtra-Terms'):
-        tag = prop.findtext('Xtra-Terms_tag')
-        value = prop.findtext('Xtra-Terms_value')
-        if tag and value:
-            additional_props.append({'tag': tag, 'value': value})
-    if additional_props:
-        properties['additional_properties'] = additional_props
-
-    index_terms = []
-    for term in root.findall('.//Entrezgene_xtra-index-terms/E'):
-        if term.text:
-            index_terms.append(term.text)
-    if index_terms:
-        properties['index_terms'] = index_terms
-
-    return properties
-
-def extract_technical_info(root: ET.Element) -> Dict[str, Any]:
-    """Извлекает техническую информацию"""
-    technical = {}
-
-    track_info = root.find('.//Gene-track')
-    if track_info is not None:
-        technical['track'] = {
-            'geneid': track_info.findtext('Gene-track_geneid'),
-            'status': track_info.findtext('Gene-track_status'),
-            'create_date': track_info.findtext('Gene-track_create-date'),
-            'update_date': track_info.findtext('Gene-track_update-date')
-        }
-
-    gene_source = root.find('.//Gene-source')
-    if gene_source is not None:
-        technical['gene_source'] = {
-            'src': gene_source.findtext('Gene-source_src'),
-            'src_int': gene_source.findtext('Gene-source_src-int'),
-            'src_str2': gene_source.findtext('Gene-source_src-str2')
-        }
-
-    dates = []
-    for date_elem in root.findall('.//Date'):
-        date_data = extract_date_info(date_elem)
-        if date_data:
-            dates.append(date_data)
-    if dates:
-        technical['dates'] = dates
-
-    return technical
-
-def extract_date_info(date_element: ET.Element) -> Dict[str, Any]:
-    """Извлекает информацию о дате"""
-    date_data = {}
-
-    date_std = date_element.find('Date-std')
-    if date_std is not None:
-        date_data['std'] = {
-            'year': date_std.findtext('Date-std_year'),
-            'month': date_std.findtext('Date-std_month'),
-            'day': date_std.findtext('Date-std_day'),
-            'hour': date_std.findtext('Date-std_hour'),
-            'minute': date_std.findtext('Date-std_minute'),
-            'second': date_std.findtext('Date-std_second')
-        }
-
-    return date_data
-
-def extract_additional_sections(root: ET.Element) -> Dict[str, Any]:
-    """Извлекает дополнительные разделы"""
-    additional = {}
-
-    other_sources = []
-    for source in root.findall('.//Other-source'):
-        source_data = {
-            'anchor': source.findtext('Other-source_anchor'),
-            'pre_text': source.findtext('Other-source_pre-text'),
-            'post_text': source.findtext('Other-source_post-text'),
-            'src': source.findtext('Other-source_src'),
-            'url': source.findtext('Other-source_url')
-        }
-        if any(source_data.values()):
-            other_sources.append(source_data)
-    if other_sources:
-        additional['other_sources'] = other_sources
-
-    dbtags = []
-    for dbtag in root.findall('.//Dbtag'):
-        db = dbtag.findtext('Dbtag_db')
-        tag = dbtag.findtext('Dbtag_tag')
-        if db and tag:
-            dbtags.append({'db': db, 'tag': tag})
-    if dbtags:
-        additional['external_dbs'] = dbtags
-
-    object_ids = []
-    for obj_id in root.findall('.//Object-id'):
-        obj_data = {
-            'id': obj_id.findtext('Object-id_id'),
-            'str': obj_id.findtext('Object-id_str')
-        }
-        if any(obj_data.values()):
-            object_ids.append(obj_data)
-    if object_ids:
-        additional['object_ids'] = object_ids
-
-    return additional
-
 def create_extraction_summary(all_data: Dict[str, Any]) -> Dict[str, Any]:
     """Создает сводку по извлеченным данным"""
     pathways = []
@@ -1384,6 +831,8 @@ def summarize_ALL_fields_gene(all_data: Dict[str, Any], llm_call=call_llm_direct
 
         return llm_call(strict_prompt)
 
+    deferred = DeferredSummaries(summaries)
+
     log("Этап 1: Обработка основной информации о гене...")
 
     gene_info = all_data.get('gene_info', {})
@@ -1401,16 +850,14 @@ def summarize_ALL_fields_gene(all_data: Dict[str, Any], llm_call=call_llm_direct
                 text_fields_to_summarize[field] = gene_info[field]
 
         if text_fields_to_summarize:
-            try:
-                log("  🤖 Суммаризируем текстовые поля gene_info...")
-                summaries['gene_description'] = summarize_field(
-                    'gene_description',
-                    "Summarize the following gene description information FACTUALLY without adding anything:",
-                    text_fields_to_summarize
-                )
-            except Exception as e:
-                summaries['gene_description_error'] = str(e)
-                summaries['gene_description_raw'] = text_fields_to_summarize
+            log("  🤖 Суммаризируем текстовые поля gene_info...")
+            deferred.submit(
+                'gene_description', summarize_field,
+                'gene_description',
+                "Summarize the following gene description information FACTUALLY without adding anything:",
+                text_fields_to_summarize,
+                fallback={'gene_description_raw': text_fields_to_summarize}
+            )
 
     log("Этап 2: Обработка gene commentaries...")
 
@@ -1425,30 +872,28 @@ def summarize_ALL_fields_gene(all_data: Dict[str, Any], llm_call=call_llm_direct
 
         for comment_type, type_comments in commentary_by_type.items():
             if should_summarize_list(type_comments):
-                try:
-                    log(f"  🤖 Суммаризируем {comment_type} commentaries...")
-
-                    type_prompts = {
-                        'pathway': "Summarize the pathway information FACTUALLY. List pathways mentioned:",
-                        'phenotype': "Summarize the phenotype associations FACTUALLY. List phenotypes mentioned:",
-                        'function': "Summarize the functional annotations FACTUALLY. List key functions:",
-                        'Generif': "Summarize the gene reference facts FACTUALLY. List key findings:",
-                        'expression': "Summarize the expression patterns FACTUALLY. List tissues/cells mentioned:",
-                        'interactions': "Summarize the interaction data FACTUALLY. List interacting partners:",
-                        'domains': "Summarize the domain information FACTUALLY. List domains mentioned:"
-                    }
-
-                    prompt = type_prompts.get(comment_type,
-                                              f"Summarize the {comment_type} information FACTUALLY without adding anything:")
-
-                    summaries[f'commentaries_{comment_type}'] = summarize_field(
-                        f'commentaries_{comment_type}',
-                        prompt,
-                        type_comments
-                    )
-                except Exception as e:
-                    summaries[f'commentaries_{comment_type}_error'] = str(e)
-                    summaries[f'commentaries_{comment_type}_raw'] = type_comments[:5]
+                log(f"  🤖 Суммаризируем {comment_type} commentaries...")
+
+                type_prompts = {
+                    'pathway': "Summarize the pathway information FACTUALLY. List pathways mentioned:",
+                    'phenotype': "Summarize the phenotype associations FACTUALLY. List phenotypes mentioned:",
+                    'function': "Summarize the functional annotations FACTUALLY. List key functions:",
+                    'Generif': "Summarize the gene reference facts FACTUALLY. List key findings:",
+                    'expression': "Summarize the expression patterns FACTUALLY. List tissues/cells mentioned:",
+                    'interactions': "Summarize the interaction data FACTUALLY. List interacting partners:",
+                    'domains': "Summarize the domain information FACTUALLY. List domains mentioned:"
+                }
+
+                prompt = type_prompts.get(comment_type,
+                                          f"Summarize the {comment_type} information FACTUALLY without adding anything:")
+
+                deferred.submit(
+                    f'commentaries_{comment_type}', summarize_field,
+                    f'commentaries_{comment_type}',
+                    prompt,
+                    type_comments,
+                    fallback={f'commentaries_{comment_type}_raw': type_comments[:5]}
+                )
             else:
                 summaries[f'commentaries_{comment_type}'] = type_comments
 
@@ -1458,16 +903,14 @@ def summarize_ALL_fields_gene(all_data: Dict[str, Any], llm_call=call_llm_direct
     if biosource:
         organism_info = biosource.get('organism', {})
         if organism_info and should_summarize_dict(organism_info):
-            try:
-                log("  🤖 Суммаризируем organism info...")
-                summaries['organism'] = summarize_field(
-                    'organism',
-                    "Summarize the organism taxonomic information FACTUALLY:",
-                    organism_info
-                )
-            except Exception as e:
-                summaries['organism_error'] = str(e)
-                summaries['organism_raw'] = organism_info
+            log("  🤖 Суммаризируем organism info...")
+            deferred.submit(
+                'organism', summarize_field,
+                'organism',
+                "Summarize the organism taxonomic information FACTUALLY:",
+                organism_info,
+                fallback={'organism_raw': organism_info}
+            )
 
     log("Этап 4: Обработка геномных данных...")
 
@@ -1480,31 +923,28 @@ def summarize_ALL_fields_gene(all_data: Dict[str, Any], llm_call=call_llm_direct
 
         location = genomics.get('location', {})
         if location and should_summarize_dict(location):
-            try:
-                log("  🤖 Суммаризируем genomic location...")
-                summaries['genomic_location'] = summarize_field(
-                    'genomic_location',
-                    "Summarize the genomic location information FACTUALLY:",
-                    location
-                )
-            except Exception as e:
-                summaries['genomic_location_error'] = str(e)
+            log("  🤖 Суммаризируем genomic location...")
+            deferred.submit(
+                'genomic_location', summarize_field,
+                'genomic_location',
+                "Summarize the genomic location information FACTUALLY:",
+                location
+            )
 
     log("Этап 5: Обработка публикаций...")
 
     publications = all_data.get('publications', [])
     if publications:
         if len(publications) > 10:
-            try:
-                log("  🤖 Суммаризируем публикации...")
-                summaries['publications_summary'] = summarize_field(
-                    'publications',
-                    "List the PubMed IDs mentioned FACTUALLY:",
-                    [p.get('pmid') for p in publications if p.get('pmid')]
-                )
-            except Exception as e:
-                summaries['publications_error'] = str(e)
-                summaries['publications_sample'] = publications[:10]
+            log("  🤖 Суммаризируем публикации...")
+            deferred.submit(
+                'publications_summary', summarize_field,
+                'publications',
+                "List the PubMed IDs mentioned FACTUALLY:",
+                [p.get('pmid') for p in publications if p.get('pmid')],
+                error_key='publications',
+                fallback={'publications_sample': publications[:10]}
+            )
         else:
             summaries['publications'] = publications
 
@@ -1517,16 +957,15 @@ def summarize_ALL_fields_gene(all_data: Dict[str, Any], llm_call=call_llm_direct
             'gene_source': technical.get('gene_source', {})
         }
         if should_summarize_dict(important_tech):
-            try:
-                log("  🤖 Суммаризируем технические данные...")
-                summaries['technical_summary'] = summarize_field(
-                    'technical',
-                    "Summarize the technical metadata FACTUALLY:",
-                    important_tech
-                )
-            except Exception as e:
-                summaries['technical_error'] = str(e)
-                summaries['technical_raw'] = important_tech
+            log("  🤖 Суммаризируем технические данные...")
+            deferred.submit(
+                'technical_summary', summarize_field,
+                'technical',
+                "Summarize the technical metadata FACTUALLY:",
+                important_tech,
+                error_key='technical',
+                fallback={'technical_raw': important_tech}
+            )
 
     log("Этап 7: Обработка внешних баз данных...")
 
@@ -1534,19 +973,21 @@ def summarize_ALL_fields_gene(all_data: Dict[str, Any], llm_call=call_llm_direct
     if additional:
         external_dbs = additional.get('external_dbs', [])
         if external_dbs and len(external_dbs) > 5:
-            try:
-                log("  🤖 Суммаризируем внешние базы данных...")
-                summaries['external_dbs_summary'] = summarize_field(
-                    'external_dbs',
-                    "List the external database references FACTUALLY:",
-                    external_dbs
-                )
-            except Exception as e:
-                summaries['external_dbs_error'] = str(e)
-                summaries['external_dbs_sample'] = external_dbs[:10]
+            log("  🤖 Суммаризируем внешние базы данных...")
+            deferred.submit(
+                'external_dbs_summary', summarize_field,
+                'external_dbs',
+                "List the external database references FACTUALLY:",
+                external_dbs,
+                error_key='external_dbs',
+                fallback={'external_dbs_sample': external_dbs[:10]}
+            )
         else:
             summaries['external_dbs'] = external_dbs
 
+    # Дожидаемся параллельных суммаризаций в исходном порядке разделов
+    deferred.collect()
+
     log("Этап 8: Финальная суммаризация...")
 
     try:
@@ -1609,25 +1050,59 @@ def process_gene(gene_id: str):
     all_data = summarize_ALL_fields_gene(all_data)
     return all_data
 
-def extract_pmids_from_text(text: str) -> Set[str]:
-    """Извлекает все PMID из текста"""
-    pmids = set()
-    pattern = r'PMID:\s*(\d+)'
-    matches = re.findall(pattern, text)
-    pmids.update(matches)
-    return pmids
+def analyze_pubmed(gene_name: str, gene_info: str) -> Dict[str, Any]:
+    """
+    Статьи берутся одним поиском через history server (pubmed.search_pubmed),
+    LLM только анализирует аннотации — пачками по PUBMED_ANALYSIS_BATCH, параллельно.
+    Сбой поиска не роняет источник: этап деградирует до «нет статей» и 'error'
+    """
+    try:
+        found = search_pubmed(gene_name)
+    except SourceCancelled:
+        raise
+    except Exception as e:
+        print(f"⚠️ PubMed недоступен: {e}")
+        found = {'articles': [], 'queries': [], 'error': f"{type(e).__name__}: {e}"}
+    articles = found['articles']
+    batches = [articles[i:i + PUBMED_ANALYSIS_BATCH] for i in range(0, len(articles), PUBMED_ANALYSIS_BATCH)]
+
+    def analyze(batch):
+        prompt = set_user_prompt_pubmed_analysis({"gene_info": gene_info, "abstracts": format_abstracts(batch)})
+        response = call_llm_directly(prompt)
+        return response.content if hasattr(response, 'content') else str(response)
+
+    analyses = []
+    if batches:
+        executor = ThreadPoolExecutor(max_workers=min(SUMMARY_CONCURRENCY, len(batches)),
+                                      thread_name_prefix="ncbi-pubmed")
+        try:
+            futures = [executor.submit(in_current_scope(analyze), batch) for batch in batches]
+            for n, future in enumerate(futures, 1):
+                try:
+                    analyses.append(f"=== АННОТАЦИИ, ЧАСТЬ {n}/{len(batches)} ===\n{future.result()}")
+                except SourceCancelled:
+                    raise
+                except Exception as e:
+                    analyses.append(f"=== АННОТАЦИИ, ЧАСТЬ {n}/{len(batches)} ===\nОшибка: {e}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return {'articles': articles, 'queries': found['queries'], 'analyses': analyses, 'error': found.get('error')}
 
-def run_query(protein_name):
+def run_query(protein_name, ids=None):
     print("🚀 ЗАПУСК NCBI-Агента")
     try:
         # 1. Получаем gene_id
         data = {}
         data["gene_name"] = protein_name
-        data["found_articles"] = ""
 
-        print(f"🔍 Поиск gene_id для {protein_name}...")
-        gene_response = run_super_agent(info=data, steps=1, user_promt_func=set_user_prompt_simple_gene_id, protein=protein_name)
-        gene_id = get_gene_id_simple(gene_response)
+        if ids is not None and ids.entrez_id:
+            # gene_id уже известен из HGNC, агент для поиска не нужен
+            gene_id = ids.entrez_id
+        else:
+            print(f"🔍 Поиск gene_id для {protein_name}...")
+            gene_response = run_super_agent(info=data, steps=1, user_promt_func=set_user_prompt_simple_gene_id, protein=protein_name)
+            gene_id = get_gene_id_simple(gene_response)
 
         if not gene_id:
             print("❌ Не удалось найти gene_id")
@@ -1704,106 +1179,59 @@ def run_query(protein_name):
         final_answer = f"=== ОТЧЕТ ПО ГЕНУ {protein_name} (ID: {gene_id}) ===\n\n"
         final_answer += gene_summary_text + "\n\n"
 
-        for i, protein in enumerate(proteins, 1):
-            print(f"🔬 Обрабатываем белок {i}/{len(proteins)}: {protein}")
-            try:
-                protein_result = process_protein(protein)
-                if protein_result and 'protein_summaries' in protein_result:
-                    protein_summary = protein_result['protein_summaries'].get('final_protein_article', '')
-                    if hasattr(protein_summary, 'content'):
-                        protein_summary = protein_summary.content
-                    final_answer += f"=== БЕЛОК {protein} ===\n{protein_summary}\n\n"
-            except Exception as e:
-                print(f"⚠️ Ошибка при обработке белка {protein}: {e}")
+        check_cancelled()
+        for protein, protein_result in process_proteins(proteins):
+            if isinstance(protein_result, Exception):
+                print(f"⚠️ Ошибка при обработке белка {protein}: {protein_result}")
                 final_answer += f"=== БЕЛОК {protein} ===\n❌ Ошибка обработки\n\n"
+            elif protein_result and 'protein_summaries' in protein_result:
+                protein_summary = protein_result['protein_summaries'].get('final_protein_article', '')
+                if hasattr(protein_summary, 'content'):
+                    protein_summary = protein_summary.content
+                final_answer += f"=== БЕЛОК {protein} ===\n{protein_summary}\n\n"
 
         print("=" * 50)
         print("✅ Структурная информация собрана")
         print("=" * 50)
 
-        # 6. PubMed поиск с итерациями
+        # 6. PubMed: esearch/efetch через history server, LLM анализирует аннотации
         print("🔍 Запуск PubMed поиска...")
-        data["gene_info"] = gene_summary_text
-
-        all_pubmed_responses = ""
-        all_found_pmids = set()
-        max_iterations = 3
-
-        # Первый поиск
-        print("📚 Первоначальный поиск в PubMed...")
-        pubmed_response = run_super_agent(
-            info=data,
-            steps=10,
-            user_promt_func=set_user_prompt_pubmed_analysis,
-            protein=protein_name
-        )
-        all_pubmed_responses += f"=== ПЕРВОНАЧАЛЬНЫЙ ПОИСК ===\n{pubmed_response}\n\n"
-
-        for i in range(max_iterations):
-            print(f"🔄 PubMed итерация {i+1}/{max_iterations}")
-
-            # Извлекаем статьи из предыдущего ответа
-            new_articles_text = call_llm_directly(set_extraction_prompt(pubmed_response)).content
-
-            # Обновляем список найденных PMID
-            new_pmids = extract_pmids_from_text(new_articles_text)
-            new_unique_pmids = new_pmids - all_found_pmids
-            all_found_pmids.update(new_pmids)
-
-            print(f"📈 Найдено PMID: {len(new_pmids)} (новых: {len(new_unique_pmids)})")
-
-            # Обновляем found_articles для следующей итерации
-            data["found_articles"] = new_articles_text
-
-            # Выполняем агрессивный поиск
-            pubmed_response = run_super_agent(
-                info=data,
-                steps=10,
-                user_promt_func=set_aggressive_search_prompt,
-                protein=protein_name
-            )
-
-            # Сохраняем ответ
-            all_pubmed_responses += f"=== ИТЕРАЦИЯ {i+1} ===\n{pubmed_response}\n\n"
-
-            # Пауза между итерациями
-            if i < max_iterations - 1:  # Не пауза после последней итерации
-                print("⏳ Пауза между итерациями...")
-                time.sleep(3)
+        check_cancelled()
+        pubmed = analyze_pubmed(protein_name, gene_summary_text)
+        all_pubmed_responses = "\n\n".join(pubmed['analyses'])
+        all_found_pmids = {a['pmid'] for a in pubmed['articles'] if a['pmid']}
 
         # 7. Финальная обработка PubMed результатов
         print("🧹 Очистка и структурирование PubMed результатов...")
-        cleaned_pubmed = call_llm_directly(set_cleanup_results_prompt(all_pubmed_responses))
+        if pubmed['analyses']:
+            cleaned_pubmed = call_llm_directly(set_cleanup_results_prompt(all_pubmed_responses))
+            if hasattr(cleaned_pubmed, 'content'):
+                cleaned_pubmed = cleaned_pubmed.content
+        else:
+            cleaned_pubmed = "Статьи в PubMed не найдены"
+        if pubmed['error']:
+            cleaned_pubmed += f"\n\n⚠️ Поиск в PubMed завершился с ошибкой, список статей может быть неполным: {pubmed['error']}"
 
         # 8. Формирование финального отчета
         final_answer += f"\n=== ИНФОРМАЦИЯ ПО PUBMED ===\n"
         final_answer += f'\n{cleaned_pubmed}\n'
         final_answer += f"\n📊 СТАТИСТИКА ПОИСКА:\n"
-        final_answer += f"• Всего итераций: {max_iterations + 1}\n"
+        final_answer += f"• Запросов к PubMed: {len(pubmed['queries'])}\n"
         final_answer += f"• Уникальных статей найдено: {len(all_found_pmids)}\n"
-        final_answer += f"• Ген: {data['gene_name']}\n"
+        final_answer += f"• Ген: {protein_name}\n"
         final_answer += f"• Gene ID: {gene_id}\n"
         final_answer += f"• Основные белки: {', '.join(proteins)}\n"
 
-        # 9. Сохраняем результат
-        print("💾 Сохранение отчета...")
-        with open('gene_protein_report.txt', 'w', encoding='utf-8') as f:
-            f.write(final_answer)
-
-        # 10. Сохраняем сырые PubMed данные отдельно
-        with open('pubmed_raw_data.txt', 'w', encoding='utf-8') as f:
-            f.write(all_pubmed_responses)
-
         print("=" * 50)
         print("🎉 ОТЧЕТ УСПЕШНО СОЗДАН!")
         print("=" * 50)
-        print(f"📁 Основной отчет: gene_protein_report.txt")
-        print(f"📁 Сырые данные PubMed: pubmed_raw_data.txt")
         print(f"📊 Найдено статей: {len(all_found_pmids)}")
         print(f"🔬 Обработано белков: {len(proteins)}")
         print("=" * 50)
         return final_answer
 
+    except SourceCancelled:
+        raise
     except Exception as e:
         print(f"💥 Критическая ошибка: {e}")
         import traceback
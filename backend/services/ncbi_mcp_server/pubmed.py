@@ -0,0 +1,232 @@
+"""
+Детерминированный поиск статей PubMed через history server E-utilities.
+
+esearch с usehistory=y кладёт результат на сервер NCBI (WebEnv + query_key),
+а efetch забирает аннотации пачками по PUBMED_BATCH_SIZE прямо оттуда — без
+передачи списков PMID и без агентских вызовов инструментов. Запросы
+расширяются по уровням: сначала «модификации + старение», затем просто
+«старение»; более широкий уровень исключает уже найденное через #query_key.
+
+Статьи сначала ищутся в общем хранилище literature (LiteratureStore), из NCBI
+забираются только недостающие PMID, и они сразу сохраняются для других генов.
+"""
+import os
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+from backend.services.http_client import HttpClient
+from backend.services.literature_store import get_literature_store
+from backend.services.mcp_tools import SourceCancelled, check_cancelled
+
+EUTILS = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+EUTILS_TIMEOUT = 60
+
+# Сколько статей всего забирать на ген и сколько за один efetch
+PUBMED_MAX_ARTICLES = int(os.environ.get("NCBI_PUBMED_MAX_ARTICLES", 200))
+PUBMED_BATCH_SIZE = int(os.environ.get("NCBI_PUBMED_BATCH_SIZE", 200))
+
+MODIFICATION_TERMS = ["mutation", "mutant", "variant", "substitution", "engineered",
+                      "phosphorylation", "methylation", "acetylation", "domain"]
+AGING_TERMS = ["aging", "ageing", "longevity", "lifespan", "senescence", "rejuvenation",
+               "reprogramming", "age-related"]
+
+_http = HttpClient()
+
+
+class PubmedError(Exception):
+    """E-utilities вернули ответ без ожидаемых полей или с ERROR"""
+
+
+class PubmedSearch:
+    """Результат esearch/epost, сохранённый на history server"""
+    __slots__ = ('term', 'count', 'webenv', 'query_key', 'ids')
+
+    def __init__(self, term: str, count: int, webenv: str, query_key: str, ids: Optional[List[str]] = None):
+        self.term = term
+        self.count = count
+        self.webenv = webenv
+        self.query_key = query_key
+        self.ids = ids or []
+
+
+def _any_of(terms: List[str]) -> str:
+    return "(" + " OR ".join(f"{t}[tiab]" for t in terms) + ")"
+
+
+def build_queries(gene_name: str) -> List[str]:
+    """Уровни запроса от узкого к широкому"""
+    gene = f"{gene_name}[tiab]"
+    return [
+        f"{gene} AND {_any_of(MODIFICATION_TERMS)} AND {_any_of(AGING_TERMS)}",
+        f"{gene} AND {_any_of(AGING_TERMS)}",
+    ]
+
+
+def esearch(term: str, webenv: Optional[str] = None, retmax: int = 0) -> PubmedSearch:
+    params = {
+        'db': 'pubmed',
+        'term': term,
+        'usehistory': 'y',
+        'retmax': retmax,
+        'sort': 'relevance',
+        'retmode': 'json',
+    }
+    if webenv:
+        params['WebEnv'] = webenv
+    data = _http.get(f"{EUTILS}/esearch.fcgi", params=params, timeout=EUTILS_TIMEOUT)
+    result = data.get('esearchresult') if isinstance(data, dict) else None
+    if not isinstance(result, dict):
+        error = data.get('error') if isinstance(data, dict) else str(data)[:200]
+        raise PubmedError(f"esearch без esearchresult: {error}")
+    if result.get('ERROR'):
+        raise PubmedError(f"esearch: {result['ERROR']}")
+    # Без WebEnv/query_key результат не лежит на history server — статьи берутся по idlist
+    return PubmedSearch(term, int(result.get('count', 0)), result.get('webenv'), result.get('querykey'),
+                        result.get('idlist', []))
+
+
+def epost(pmids: List[str], webenv: Optional[str] = None) -> PubmedSearch:
+    """Кладёт список PMID на history server, чтобы забрать их через efetch_abstracts"""
+    data = {'db': 'pubmed', 'id': ','.join(pmids)}
+    if webenv:
+        data['WebEnv'] = webenv
+    response = _http.post(f"{EUTILS}/epost.fcgi", data=data, timeout=EUTILS_TIMEOUT, raw=True)
+    root = ET.fromstring(response.content)
+    webenv, query_key = root.findtext('WebEnv'), root.findtext('QueryKey')
+    if not webenv or not query_key:
+        raise PubmedError(f"epost: {root.findtext('ERROR') or 'нет WebEnv/QueryKey'}")
+    return PubmedSearch('', len(pmids), webenv, query_key, list(pmids))
+
+
+def _text(elem: Optional[ET.Element]) -> str:
+    return ''.join(elem.itertext()).strip() if elem is not None else ''
+
+
+def parse_pubmed_article(article: ET.Element) -> Dict[str, Any]:
+    """<PubmedArticle> -> {'pmid', 'title', 'abstract', 'journal', 'year', 'doi', 'pmcid'}"""
+    citation = article.find('MedlineCitation')
+    info = citation.find('Article') if citation is not None else None
+
+    sections = []
+    if info is not None:
+        for part in info.findall('Abstract/AbstractText'):
+            text = _text(part)
+            if text:
+                label = part.get('Label')
+                sections.append(f"{label}: {text}" if label else text)
+
+    ids = {}
+    for article_id in article.findall('PubmedData/ArticleIdList/ArticleId'):
+        if article_id.text:
+            ids.setdefault(article_id.get('IdType'), article_id.text.strip())
+
+    year = ''
+    if info is not None:
+        year = _text(info.find('Journal/JournalIssue/PubDate/Year')) or \
+               _text(info.find('Journal/JournalIssue/PubDate/MedlineDate'))[:4]
+
+    return {
+        'pmid': _text(citation.find('PMID')) if citation is not None else ids.get('pubmed', ''),
+        'title': _text(info.find('ArticleTitle')) if info is not None else '',
+        'abstract': '\n'.join(sections),
+        'journal': _text(info.find('Journal/Title')) if info is not None else '',
+        'year': year,
+        'doi': ids.get('doi'),
+        'pmcid': ids.get('pmc'),
+    }
+
+
+def efetch_abstracts(search: PubmedSearch, limit: int) -> List[Dict[str, Any]]:
+    """Забирает до limit аннотаций результата поиска пачками по PUBMED_BATCH_SIZE"""
+    articles = []
+    total = min(limit, search.count)
+    for retstart in range(0, total, PUBMED_BATCH_SIZE):
+        check_cancelled()
+        params = {
+            'db': 'pubmed',
+            'WebEnv': search.webenv,
+            'query_key': search.query_key,
+            'retstart': retstart,
+            'retmax': min(PUBMED_BATCH_SIZE, total - retstart),
+            'rettype': 'abstract',
+            'retmode': 'xml',
+        }
+        response = _http.get(f"{EUTILS}/efetch.fcgi", params=params, timeout=EUTILS_TIMEOUT, raw=True)
+        root = ET.fromstring(response.content)
+        articles.extend(parse_pubmed_article(a) for a in root.iter('PubmedArticle'))
+    return articles
+
+
+def fetch_articles(search: PubmedSearch) -> List[Dict[str, Any]]:
+    """
+    Статьи для search.ids в порядке выдачи: из хранилища, а недостающие —
+    одним efetch по query_key поиска (если не хватает всех) или через epost
+    """
+    def fetch_missing(missing: List[str]) -> List[Dict[str, Any]]:
+        if len(missing) == len(search.ids) and search.webenv and search.query_key:
+            return efetch_abstracts(search, len(missing))
+        return efetch_abstracts(epost(missing, webenv=search.webenv), len(missing))
+
+    return get_literature_store().fill(search.ids, fetch_missing)
+
+
+def article_by_doi(doi: str) -> Optional[Dict[str, Any]]:
+    """DOI -> статья PubMed: сначала хранилище, затем esearch по полю [doi]"""
+    doi = doi.strip()
+    stored = get_literature_store().get_by_doi(doi)
+    if stored is not None:
+        return stored
+    search = esearch(f'"{doi}"[doi]', retmax=1)
+    if not search.ids:
+        return None
+    articles = fetch_articles(search)
+    return articles[0] if articles else None
+
+
+def search_pubmed(gene_name: str, limit: int = PUBMED_MAX_ARTICLES) -> Dict[str, Any]:
+    """
+    Поиск по уровням запроса до limit статей. Ошибка NCBI на уровне не
+    прерывает этап: остаются статьи, найденные до неё, текст ошибки — в 'error'.
+    Возвращает {'articles': [...], 'queries': [{'term', 'count', 'fetched'}], 'error': str | None}
+    """
+    articles: List[Dict[str, Any]] = []
+    seen = set()
+    queries = []
+    webenv = None
+    previous_keys: List[str] = []
+
+    for term in build_queries(gene_name):
+        if len(articles) >= limit:
+            break
+        check_cancelled()
+        # Уже найденное на узких уровнях исключается на сервере
+        query = term if not previous_keys else f"({term}) NOT " + " NOT ".join(f"#{k}" for k in previous_keys)
+        try:
+            search = esearch(query, webenv=webenv, retmax=limit - len(articles))
+            fetched = fetch_articles(search) if search.ids else []
+        except SourceCancelled:
+            raise
+        except Exception as e:
+            print(f"⚠️ PubMed: ошибка на уровне {len(queries) + 1}: {e}")
+            return {'articles': articles, 'queries': queries, 'error': f"{type(e).__name__}: {e}"}
+
+        if search.webenv and search.query_key:
+            webenv = search.webenv
+            previous_keys.append(search.query_key)
+        # Без history server исключение #query_key не работает — дубли убираются здесь
+        fetched = [a for a in fetched if a['pmid'] not in seen]
+        seen.update(a['pmid'] for a in fetched)
+        articles.extend(fetched)
+        queries.append({'term': query, 'count': search.count, 'fetched': len(fetched)})
+        print(f"📚 PubMed: {search.count} статей по запросу уровня {len(queries)}, получено {len(fetched)}")
+
+    return {'articles': articles, 'queries': queries, 'error': None}
+
+
+def format_abstracts(articles: List[Dict[str, Any]]) -> str:
+    blocks = []
+    for a in articles:
+        header = f"PMID: {a['pmid']} - {a['title']}"
+        meta = ", ".join(x for x in (a.get('journal'), a.get('year')) if x)
+        blocks.append(f"{header}\n{meta}\n{a['abstract'] or 'No abstract available.'}")
+    return "\n\n".join(blocks)
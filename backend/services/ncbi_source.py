@@ -1,4 +1,4 @@
-from backend.services.http_client import HttpClient
+from backend.services.http_client import HttpClient, AsyncHttpClient
 
 class NcbiSource:
     ESEARCH = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi'
@@ -6,33 +6,68 @@ class NcbiSource:
 
     def __init__(self):
         self.client = HttpClient()
+        self.aclient = AsyncHttpClient()
 
     def fetch(self, gene_symbol: str) -> dict:
-        params = {'db': 'gene', 'term': f"{gene_symbol}[Gene Name] AND Homo sapiens[Organism]", 'retmode': 'json'}
-        res = self.client.get(self.ESEARCH, params=params)
-        out = {'longevity_association': None, 'dna_sequence': None, 'interval_in_dna_sequence': None, 'article': None}
+        res = self.client.get(self.ESEARCH, params=self._search_params(gene_symbol))
+        out = self._empty()
         try:
-            ids = res.get('esearchresult', {}).get('idlist', [])
-            if not ids:
+            gene_id = self._first_id(res)
+            if not gene_id:
                 return out
-            gene_id = ids[0]
-            sum_params = {'db': 'gene', 'id': gene_id, 'retmode': 'json'}
-            summary = self.client.get(self.ESUMMARY, params=sum_params)
-            doc = summary.get('result', {}).get(str(gene_id), {})
-            summary_text = doc.get('summary') or doc.get('description')
-            if summary_text:
-                out['longevity_association'] = summary_text
-            out['article'] = f'https://www.ncbi.nlm.nih.gov/gene/{gene_id}'
-            ginfo = doc.get('genomicinfo', [])
-            if ginfo:
-                g0 = ginfo[0]
-                chr_from = g0.get('chrstart')
-                chr_to = g0.get('chrstop')
-                if chr_from is not None and chr_to is not None:
-                    try:
-                        out['interval_in_dna_sequence'] = (int(chr_from), int(chr_to))
-                    except:
-                        out['interval_in_dna_sequence'] = None
+            summary = self.client.get(self.ESUMMARY, params=self._summary_params(gene_id))
+            self._parse_summary(summary, gene_id, out)
         except Exception:
             pass
         return out
+
+    async def afetch(self, gene_symbol: str) -> dict:
+        res = await self.aclient.get(self.ESEARCH, params=self._search_params(gene_symbol))
+        out = self._empty()
+        try:
+            gene_id = self._first_id(res)
+            if not gene_id:
+                return out
+            summary = await self.aclient.get(self.ESUMMARY, params=self._summary_params(gene_id))
+            self._parse_summary(summary, gene_id, out)
+        except Exception:
+            pass
+        return out
+
+    async def aclose(self):
+        await self.aclient.aclose()
+
+    @staticmethod
+    def _empty() -> dict:
+        return {'longevity_association': None, 'dna_sequence': None, 'interval_in_dna_sequence': None, 'article': None}
+
+    @staticmethod
+    def _search_params(gene_symbol: str) -> dict:
+        return {'db': 'gene', 'term': f"{gene_symbol}[Gene Name] AND Homo sapiens[Organism]", 'retmode': 'json'}
+
+    @staticmethod
+    def _summary_params(gene_id: str) -> dict:
+        return {'db': 'gene', 'id': gene_id, 'retmode': 'json'}
+
+    @staticmethod
+    def _first_id(res) -> str | None:
+        ids = res.get('esearchresult', {}).get('idlist', [])
+        return ids[0] if ids else None
+
+    @staticmethod
+    def _parse_summary(summary: dict, gene_id: str, out: dict):
+        doc = summary.get('result', {}).get(str(gene_id), {})
+        summary_text = doc.get('summary') or doc.get('description')
+        if summary_text:
+            out['longevity_association'] = summary_text
+        out['article'] = f'https://www.ncbi.nlm.nih.gov/gene/{gene_id}'
+        ginfo = doc.get('genomicinfo', [])
+        if ginfo:
+            g0 = ginfo[0]
+            chr_from = g0.get('chrstart')
+            chr_to = g0.get('chrstop')
+            if chr_from is not None and chr_to is not None:
+                try:
+                    out['interval_in_dna_sequence'] = (int(chr_from), int(chr_to))
+                except:
+                    out['interval_in_dna_sequence'] = None
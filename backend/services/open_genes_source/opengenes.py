@@ -3,13 +3,21 @@
 # curl -LsSf https://astral.sh/uv/install.sh | sh
 # pip install requests beautifulsoup4 lxml
 
-from smolagents import ToolCollection, ToolCallingAgent, OpenAIServerModel, Tool
+from smolagents import ToolCallingAgent, Tool
+from backend.services.llm import NEBIUS_API_BASE, get_model
 from mcp import StdioServerParameters
 import os
 import json
-import requests, re
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor
+from backend.services.http_client import HttpClient
+from backend.services.literature_store import get_literature_store
+from backend.services.ncbi_mcp_server.pubmed import article_by_doi
+from backend.services.mcp_tools import open_tools, step_callbacks
+
+MODEL = "Qwen/Qwen3-235B-A22B-Instruct-2507"
+PROMPT_VERSION = 2
+
+_http = HttpClient()
 
 class ReadScholarlyByDOI(Tool):
     name = "read_scholarly_by_doi"
@@ -38,44 +46,35 @@ class ReadScholarlyByDOI(Tool):
 
     # 3) ВАЖНО: метод называется forward и принимает РОВНО те аргументы, что в inputs
     def forward(self, doi: str) -> dict:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        # 1) Поиск на PubMed
-        pm_url = f"https://pubmed.ncbi.nlm.nih.gov/?term={doi}"
-        r = requests.get(pm_url, timeout=20, headers=headers)
-        r.raise_for_status()
-        s = BeautifulSoup(r.text, "lxml")
-        hit = s.select_one("article.full-docsum a.docsum-title")
-        if not hit:
+        # 1) DOI -> PMID: общее хранилище literature, затем esearch по полю [doi]
+        article = article_by_doi(doi)
+        if article is None:
+            pm_url = f"https://pubmed.ncbi.nlm.nih.gov/?term={doi}"
             return {"source": "pubmed", "url": pm_url, "title": None, "text": "No PubMed hit found for DOI."}
 
-        art_url = "https://pubmed.ncbi.nlm.nih.gov" + hit.get("href")
-        r2 = requests.get(art_url, timeout=20, headers=headers)
-        r2.raise_for_status()
-        s2 = BeautifulSoup(r2.text, "lxml")
-        title_el = s2.select_one("h1.heading-title")
-        title = title_el.get_text(" ", strip=True) if title_el else None
-
-        # 2) Ищем PMCID
-        pmcid = None
-        for span in s2.select("span.identifier"):
-            m = re.search(r"PMCID:\s*(PMC\d+)", span.get_text(" ", strip=True))
-            if m:
-                pmcid = m.group(1)
-                break
+        art_url = f"https://pubmed.ncbi.nlm.nih.gov/{article['pmid']}/"
+        title = article.get("title")
+        pmcid = article.get("pmcid")
 
+        # 2) Полный текст PMC: из хранилища или со страницы PMC, с сохранением
         if pmcid:
             pmc_url = f"https://pmc.ncbi.nlm.nih.gov/articles/{pmcid}/"
-            rp = requests.get(pmc_url, timeout=20, headers=headers)
-            rp.raise_for_status()
+            store = get_literature_store()
+            if article.get("has_full_text"):
+                stored = store.get_many([article["pmid"]], with_text=True).get(article["pmid"])
+                if stored and stored.get("full_text"):
+                    return {"source": "pmc", "url": stored.get("full_text_url") or pmc_url,
+                            "title": title, "text": stored["full_text"]}
+            rp = _http.get(pmc_url, timeout=20, headers={"User-Agent": "Mozilla/5.0"}, raw=True)
             sp = BeautifulSoup(rp.text, "lxml")
             body = sp.select_one("div#maincontent")
             text = (body.get_text("\n", strip=True) if body else sp.get_text("\n", strip=True))[:300000]
+            store.save_full_text(article["pmid"], text, pmc_url)
             return {"source": "pmc", "url": pmc_url, "title": title, "text": text}
 
-        # 3) Фолбэк — абстракт на PubMed
-        abst = s2.select_one("div.abstract, div#enc-abstract")
-        text = (abst.get_text("\n", strip=True) if abst else s2.get_text("\n", strip=True))[:300000]
-        return {"source": "pubmed", "url": art_url, "title": title, "text": text}
+        # 3) Фолбэк — абстракт PubMed
+        return {"source": "pubmed", "url": art_url, "title": title,
+                "text": article.get("abstract") or "No abstract available."}
 
 
 # configuration
@@ -87,18 +86,12 @@ def set_server(server_name="opengenes-mcp-server"):
     return server
 
 def set_model(
-    api_key=os.environ["NEBIUS_API_KEY"],
-    api_base="https://api.studio.nebius.com/v1/",
+    api_key=None,
+    api_base=NEBIUS_API_BASE,
     temperature=0,
-    model_name="Qwen/Qwen3-235B-A22B-Instruct-2507"
+    model_name=MODEL
 ):
-    model = OpenAIServerModel(
-        model_id=model_name,
-        api_key=api_key,
-        api_base=api_base,
-        temperature=temperature,
-    )
-    return model
+    return get_model(model_name, temperature=temperature, api_key=api_key, api_base=api_base)
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -164,10 +157,15 @@ def sanitize(s: str) -> str:
 
 def run_query(
     gene,
-    model=set_model(),
+    model=None,
     trust_remote_code=True,
-    structured_output=False
+    structured_output=False,
+    ids=None
 ):
+    model = model or set_model()
+    # OpenGenes is keyed by the approved HGNC symbol.
+    if ids is not None and ids.symbol:
+        gene = ids.symbol
     system_prompt = SYSTEM_PROMPT
     user_prompt_og = set_user_prompt_og(gene)
     server_opengenes = StdioServerParameters(
@@ -179,8 +177,8 @@ def run_query(
         args=["-y", "@just-every/mcp-read-website-fast"]
     )
 
-    with ToolCollection.from_mcp(
-        server_parameters=server_opengenes,
+    with open_tools(
+        server_opengenes,
         trust_remote_code=trust_remote_code,
         structured_output=structured_output
     ) as tools:
@@ -189,6 +187,7 @@ def run_query(
             tools=[*tools.tools],
             add_base_tools=False,
             max_steps=5,
+            step_callbacks=step_callbacks(),
         )
         agent.prompt_templates["system_prompt"] = system_prompt
         opengenes_text = agent.run(user_prompt_og)
@@ -198,6 +197,7 @@ def run_query(
         tools=[],
         add_base_tools=False,
         max_steps=1,
+        step_callbacks=step_callbacks(),
     )
     links = agent_extractor.run(
         f'''
@@ -216,16 +216,13 @@ def run_query(
     )
     web_array = []
     if links:
-        with ToolCollection.from_mcp(
-                server_parameters=server_web_tools,
-                trust_remote_code=True,
-                structured_output=True
-            ) as tools:
+        with open_tools(server_web_tools, structured_output=True) as tools:
             agent = ToolCallingAgent(
                 model=model,
                 tools=[*tools.tools],
                 add_base_tools=False,
                 max_steps=1,
+                step_callbacks=step_callbacks(),
             )
             print('Fetching from URLs')
             # with ThreadPoolExecutor(max_workers=min(8, len(links))) as ex:
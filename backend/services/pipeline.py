@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from backend.services.aggregation import agg
+from backend.services.mcp_uniprot_source import uniprot
+from backend.services.kegg_source import kegg
+from backend.services.open_genes_source import opengenes
+from backend.services.gnomad_source import gnomad
+from backend.services.ncbi_mcp_server import ncbi_mcp_server
+from backend.services.article_store import ArticleStore
+from backend.services.gene_card import GeneCardSource
+from backend.services.source_store import SourceResultStore, output_failure
+from backend.services.gene_ids import GeneIdResolver, GeneIds
+from backend.services.mcp_tools import CancelToken, cancel_scope
+from backend.services.tool_cache import get_tool_cache
+from backend.services.literature_store import get_literature_store
+
+# Source agent modules in the order agg.run_query expects their outputs. Each
+# exposes run_query(gene, ids=None), MODEL and PROMPT_VERSION; the latter two
+# key the stored results in source_results. Bump a module's PROMPT_VERSION
+# whenever its prompts change so its stored results are regenerated.
+SOURCES = {
+    "uniprot": uniprot,
+    "kegg": kegg,
+    "opengenes": opengenes,
+    "gnomad": gnomad,
+    "ncbi_mcp_server": ncbi_mcp_server,
+}
+
+# Maximum number of concurrent runs of each source across all genes in flight
+# in this process, sized to what each MCP container / upstream API sustains.
+# Override with SOURCE_CONCURRENCY_<NAME>, e.g. SOURCE_CONCURRENCY_GNOMAD=1.
+DEFAULT_SOURCE_CONCURRENCY = {
+    "uniprot": 4,
+    "kegg": 4,
+    "opengenes": 2,
+    "gnomad": 2,
+    "ncbi_mcp_server": 2,
+}
+
+# Wall-clock budget of one source run, counted from when it starts executing.
+# A source that misses it is cancelled and the article is built without it.
+# Override with SOURCE_DEADLINE_<NAME> (seconds).
+DEFAULT_SOURCE_DEADLINE = {
+    "uniprot": 180,
+    "kegg": 300,
+    "opengenes": 300,
+    "gnomad": 300,
+    "ncbi_mcp_server": 900,
+}
+
+# Budget for all sources of one gene, including time spent waiting for a slot
+# in the shared executors (seconds).
+PIPELINE_DEADLINE = float(os.environ.get("PIPELINE_DEADLINE", 1200))
+
+
+def source_deadlines() -> dict[str, float]:
+    return {
+        name: float(os.environ.get(f"SOURCE_DEADLINE_{name.upper()}", default))
+        for name, default in DEFAULT_SOURCE_DEADLINE.items()
+    }
+
+
+class SourceExecutors:
+    """One bounded thread pool per source, shared by every gene pipeline."""
+
+    def __init__(self, limits: dict[str, int] | None = None):
+        limits = limits or {
+            name: int(os.environ.get(f"SOURCE_CONCURRENCY_{name.upper()}", default))
+            for name, default in DEFAULT_SOURCE_CONCURRENCY.items()
+        }
+        self.limits = limits
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"source-{name}")
+            for name, limit in limits.items()
+        }
+
+    def submit(self, source: str, fn, *args, **kwargs):
+        return self._executors[source].submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        for ex in self._executors.values():
+            ex.shutdown(wait=wait)
+
+
+_executors = None
+_executors_lock = threading.Lock()
+
+
+def get_source_executors() -> SourceExecutors:
+    global _executors
+    if _executors is None:
+        with _executors_lock:
+            if _executors is None:
+                _executors = SourceExecutors()
+    return _executors
+
+
+class GenePipeline:
+    """
+    Runs the source agents for one gene, aggregates the article and stores it.
+    Fresh successful source outputs from source_results are reused, so only
+    missing, failed or stale sources are re-run.
+    """
+
+    def __init__(self, store: ArticleStore | None = None, cards: GeneCardSource | None = None,
+                 executors: SourceExecutors | None = None, results: SourceResultStore | None = None,
+                 deadlines: dict[str, float] | None = None, deadline: float = PIPELINE_DEADLINE,
+                 resolver: GeneIdResolver | None = None):
+        self.store = store or ArticleStore()
+        self.cards = cards or GeneCardSource()
+        self.executors = executors or get_source_executors()
+        self.results = results or SourceResultStore(self.store.pool)
+        self.deadlines = deadlines or source_deadlines()
+        self.deadline = deadline
+        self.resolver = resolver or GeneIdResolver()
+
+    def ensure_tables(self):
+        self.store.ensure_table()
+        self.results.ensure_table()
+
+    def _resolve_ids(self, gene_symbol: str) -> GeneIds:
+        try:
+            ids = self.resolver.resolve(gene_symbol)
+        except Exception as e:
+            print(f"[ERROR] Identifier resolution failed for {gene_symbol}: {e}")
+            return GeneIds(query=gene_symbol)
+        if not ids.resolved:
+            print(f"[PIPELINE] No HGNC record for {gene_symbol}, sources will search for it")
+        return ids
+
+    def _run_source(self, name: str, gene_symbol: str, ids: GeneIds, token: CancelToken, started: dict):
+        module = SOURCES[name]
+        start = time.perf_counter()
+        started[name] = time.monotonic()
+        try:
+            with cancel_scope(token):
+                token.check()
+                output = module.run_query(gene_symbol, ids=ids)
+        except Exception as e:
+            self._record(name, gene_symbol, None, False, str(e), time.perf_counter() - start)
+            raise
+        failure = output_failure(output)
+        if failure:
+            print(f"[PIPELINE] {name} returned no usable output for {gene_symbol}: {failure}")
+        self._record(name, gene_symbol, output, failure is None, failure, time.perf_counter() - start)
+        return output
+
+    def _record(self, name, gene_symbol, output, success, error, duration):
+        module = SOURCES[name]
+        try:
+            self.results.save(gene_symbol, name, module.PROMPT_VERSION, module.MODEL,
+                              output, success, error, duration)
+        except Exception as e:
+            print(f"[ERROR] Failed to store {name} result for {gene_symbol}: {e}")
+
+    def _load_cached(self, gene_symbol: str) -> dict:
+        try:
+            return self.results.load_fresh(gene_symbol, {
+                name: (module.PROMPT_VERSION, module.MODEL) for name, module in SOURCES.items()
+            })
+        except Exception as e:
+            print(f"[ERROR] Failed to load stored source results for {gene_symbol}: {e}")
+            return {}
+
+    def _due(self, name: str, started: dict, pipeline_deadline: float) -> float:
+        if name not in started:
+            return pipeline_deadline
+        return min(pipeline_deadline, started[name] + self.deadlines.get(name, self.deadline))
+
+    def _run_sources(self, gene_symbol: str, ids: GeneIds, names: list[str]) -> dict:
+        """
+        Runs the given sources and returns {name: output}. A source that misses
+        its deadline is cancelled (its MCP subprocesses are killed) and reported
+        as timed out; the pipeline does not wait for it to unwind.
+        """
+        pipeline_deadline = time.monotonic() + self.deadline
+        tokens = {name: CancelToken(f"{name}:{gene_symbol}") for name in names}
+        started = {}
+        futures = {
+            self.executors.submit(name, self._run_source, name, gene_symbol, ids, tokens[name], started): name
+            for name in names
+        }
+
+        outputs = {}
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            for fut in [f for f in pending if now >= self._due(futures[f], started, pipeline_deadline)]:
+                name = futures[fut]
+                fut.cancel()
+                tokens[name].cancel()
+                pending.discard(fut)
+                outputs[name] = "Agent timed out"
+                print(f"[TIMEOUT] {name} missed its deadline for {gene_symbol}")
+            if not pending:
+                break
+
+            timeout = min(self._due(futures[f], started, pipeline_deadline) for f in pending) - now
+            if any(futures[f] not in started for f in pending):
+                # A source still queued for an executor slot gets its own
+                # deadline once it starts; wake up regularly to pick that up.
+                timeout = min(timeout, 1.0)
+            done, pending = wait(pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    outputs[futures[fut]] = fut.result()
+                except Exception as e:
+                    outputs[futures[fut]] = f"Agent failed: {e}"
+        return outputs
+
+    def run(self, gene_symbol: str) -> str:
+        start = time.perf_counter()
+
+        cached = self._load_cached(gene_symbol)
+        if cached:
+            print(f"[PIPELINE] Reusing stored {', '.join(cached)} output for {gene_symbol}")
+        missing = [name for name in SOURCES if name not in cached]
+        ids = self._resolve_ids(gene_symbol) if missing else GeneIds(query=gene_symbol)
+        outputs = {**cached, **self._run_sources(gene_symbol, ids, missing)}
+        results = [outputs.get(name) for name in SOURCES]
+
+        uniprot_output, kegg_output, opengenes_output, gnomad_output, ncbi_output = results
+
+        try:
+            article = agg.run_query(
+                uniprot_output,
+                kegg_output,
+                opengenes_output,
+                gnomad_output,
+                ncbi_output
+            )
+        except Exception as e:
+            article = f"Article creation failed: {e}"
+
+        card, complete = self.cards.fetch(gene_symbol)
+        self.store.save(gene_symbol, article, card if complete else None)
+
+        elapsed = time.perf_counter() - start
+        print(f"[DONE] Generated article for {gene_symbol} in {elapsed:.2f}s")
+        tool_stats = get_tool_cache().stats()
+        print(f"[TOOL CACHE] {tool_stats['hits']} hits / {tool_stats['misses']} misses "
+              f"(hit rate {tool_stats['hit_rate']:.0%})")
+        literature_stats = get_literature_store().stats()
+        print(f"[LITERATURE] {literature_stats['hits']} hits / {literature_stats['misses']} misses "
+              f"(hit rate {literature_stats['hit_rate']:.0%})")
+        return article
@@ -0,0 +1,82 @@
+import os
+import threading
+
+from backend.services.job_queue import JobQueue, default_worker_id
+from backend.services.pipeline import GenePipeline
+
+# How often an idle worker polls gene_jobs for new work (seconds).
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 2))
+
+# Number of genes processed at the same time by one worker process.
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", 1))
+
+
+class PipelineWorker:
+    """
+    Drains gene_jobs with `concurrency` claim loops, each running one
+    GenePipeline at a time, so up to `concurrency` genes are in flight; their
+    source agents share the per-source executors of the pipeline. Used both by the standalone `backend.worker`
+    process and, when enabled, embedded in the API process.
+    """
+
+    def __init__(self, queue: JobQueue | None = None, pipeline: GenePipeline | None = None,
+                 concurrency: int = WORKER_CONCURRENCY, poll_interval: float = JOB_POLL_INTERVAL):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.queue = queue or JobQueue()
+        self.pipeline = pipeline or GenePipeline()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        self.pipeline.ensure_tables()
+        self.queue.ensure_table()
+        for n in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, name=f"pipeline-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[QUEUE] Started {self.concurrency} worker thread(s)")
+
+    def stop(self):
+        """Stops claiming new jobs; jobs already running are finished."""
+        self._stop.set()
+
+    def join(self, timeout: float | None = None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_forever(self):
+        self.start()
+        try:
+            while any(t.is_alive() for t in self._threads):
+                self.join(timeout=1)
+        except KeyboardInterrupt:
+            print("[QUEUE] Shutting down, waiting for running jobs to finish")
+            self.stop()
+            self.join()
+
+    def _loop(self):
+        worker_id = default_worker_id()
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(worker_id)
+            except Exception as e:
+                print(f"[ERROR] Failed to claim a job: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            try:
+                print(f"[QUEUE] Processing gene: {job.gene_symbol} (job {job.id}, attempt {job.attempts})")
+                with self.queue.leased(job):
+                    self.pipeline.run(job.gene_symbol)
+                self.queue.complete(job)
+            except Exception as e:
+                print(f"[ERROR] Failed processing {job.gene_symbol}: {e}")
+                try:
+                    self.queue.fail(job, str(e))
+                except Exception as e2:
+                    print(f"[ERROR] Failed to record failure of job {job.id}: {e2}")
@@ -0,0 +1,102 @@
+import json
+import os
+
+from psycopg2.extras import Json
+
+from backend.services.db import PgPool, get_pool
+
+# Successful source outputs younger than this are reused instead of re-running
+# the agent (seconds).
+SOURCE_RESULT_TTL = int(os.environ.get("SOURCE_RESULT_TTL", 30 * 24 * 3600))
+
+
+# Sources report many failures as text instead of raising: run_super_agent's
+# "Ошибка: ...", the pipeline's "Agent failed/timed out", an agent's apology.
+_FAILURE_PREFIXES = ("error", "ошибка", "agent failed", "agent timed out", "критическая ошибка",
+                     "i'm sorry", "i am sorry", "sorry,", "i apologize", "unfortunately, i")
+_FAILURE_MARKERS = ("reached max steps", "max steps reached")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def output_failure(output) -> str | None:
+    """Why a source output must not be stored as a success, or None when it is usable."""
+    if output is None:
+        return "no output"
+    if isinstance(output, str):
+        text = output.strip()
+        if not text:
+            return "empty output"
+        head = text[:300].lower()
+        if head.startswith(_FAILURE_PREFIXES) or any(m in head for m in _FAILURE_MARKERS):
+            return f"error output: {text[:200]}"
+    elif isinstance(output, (list, dict)) and not output:
+        return "empty output"
+    return None
+
+
+class SourceResultStore:
+    """
+    Raw output of every source agent run, kept in `source_results` and keyed by
+    gene, source, prompt version and model. A regeneration re-runs only the
+    sources whose latest result is missing, failed or older than `ttl`.
+    """
+
+    def __init__(self, pool: PgPool | None = None, ttl: int = SOURCE_RESULT_TTL):
+        self.pool = pool or get_pool()
+        self.ttl = ttl
+
+    def ensure_table(self):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS source_results (
+                gene_symbol TEXT NOT NULL,
+                source TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                output JSONB,
+                success BOOLEAN NOT NULL,
+                error TEXT,
+                duration_s DOUBLE PRECISION,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (gene_symbol, source, prompt_version, model)
+            )
+            """)
+
+    def load_fresh(self, gene_symbol: str, versions: dict[str, tuple[str, str]]) -> dict:
+        """
+        versions maps source name -> (prompt_version, model).
+        Returns {source: output} for the sources with a reusable result.
+        """
+        if not versions:
+            return {}
+        keys = [(source, str(pv), model) for source, (pv, model) in versions.items()]
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            SELECT source, output FROM source_results
+            WHERE gene_symbol = %s
+              AND (source, prompt_version, model) IN %s
+              AND success
+              AND updated_at > now() - make_interval(secs => %s)
+            """, (gene_symbol, tuple(keys), self.ttl))
+            # Rows saved before failures were detected may still hold error text.
+            return {source: output for source, output in cur.fetchall() if output_failure(output) is None}
+
+    def save(self, gene_symbol: str, source: str, prompt_version, model: str,
+             output=None, success: bool = True, error: str | None = None, duration_s: float | None = None):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            INSERT INTO source_results
+                (gene_symbol, source, prompt_version, model, output, success, error, duration_s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (gene_symbol, source, prompt_version, model) DO UPDATE
+            SET output = EXCLUDED.output,
+                success = EXCLUDED.success,
+                error = EXCLUDED.error,
+                duration_s = EXCLUDED.duration_s,
+                updated_at = now()
+            """, (gene_symbol, source, str(prompt_version), model,
+                  Json(output, dumps=_dumps) if output is not None else None, success, error, duration_s))
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import threading
+from functools import wraps
+
+from psycopg2.extras import Json
+
+from backend.services.db import PgPool, get_pool
+from backend.utils.ttl_cache import TTLCache
+
+# Default lifetime of in-process cache entries (seconds).
+TOOL_CACHE_TTL = float(os.environ.get("TOOL_CACHE_TTL", 24 * 3600))
+# Entries also kept in process memory so repeated calls skip the DB round-trip.
+TOOL_CACHE_MEMORY_SIZE = int(os.environ.get("TOOL_CACHE_MEMORY_SIZE", 4096))
+
+# Caching is opt-in: only these deterministic reference-data lookups are cached
+# by default. Enable or override any tool with TOOL_CACHE_TTL_<TOOL_NAME>,
+# e.g. TOOL_CACHE_TTL_SEARCH_GENES=0 turns the cache off for search_genes.
+DAY = 24 * 3600
+DEFAULT_TOOL_TTLS = {
+    # KEGG
+    "get_pathway_info": 30 * DAY,
+    "get_gene_info": 30 * DAY,
+    "get_ko_info": 30 * DAY,
+    "get_module_info": 30 * DAY,
+    "get_disease_info": 30 * DAY,
+    "get_drug_info": 30 * DAY,
+    "get_gene_orthologs": 30 * DAY,
+    "find_related_entries": 7 * DAY,
+    "search_genes": 7 * DAY,
+    # UniProt
+    "get_protein_info": 7 * DAY,
+    "get_protein_features": 7 * DAY,
+    "get_cross_references": 7 * DAY,
+    "search_proteins": 7 * DAY,
+}
+
+# Tools with side effects or per-session state are never cached.
+UNCACHED_TOOL_PREFIXES = ("browser_",)
+
+_MISSING = object()
+
+
+def tool_ttl(tool_name: str) -> float:
+    if tool_name.startswith(UNCACHED_TOOL_PREFIXES):
+        return 0
+    default = DEFAULT_TOOL_TTLS.get(tool_name, 0)
+    return float(os.environ.get(f"TOOL_CACHE_TTL_{tool_name.upper()}", default))
+
+
+# Servers report failures as ordinary text results; those must never be cached.
+_ERROR_PREFIXES = ("error", "ошибка", "failed", "exception", "traceback", "internal server error")
+_ERROR_MARKERS = ("429 too many requests", "500 internal server error", "502 bad gateway",
+                  "503 service unavailable", "504 gateway timeout", "rate limit exceeded")
+
+
+def looks_like_error(result) -> bool:
+    if result is None:
+        return True
+    if isinstance(result, str):
+        text = result.strip().lower()
+        return not text or text.startswith(_ERROR_PREFIXES) or any(m in text[:500] for m in _ERROR_MARKERS)
+    if isinstance(result, dict):
+        return bool(result.get("isError") or result.get("is_error") or result.get("error"))
+    return False
+
+
+def canonical_args(args: tuple, kwargs: dict) -> str:
+    payload = {"args": list(args), "kwargs": kwargs} if args else kwargs
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ToolCallCache:
+    """
+    Results of deterministic MCP tool calls, shared by all agents, genes and
+    worker processes through the `mcp_tool_cache` table and fronted by an
+    in-process TTLCache. Keyed by server, tool name and canonicalized arguments.
+    """
+
+    def __init__(self, pool: PgPool | None = None, memory_size: int = TOOL_CACHE_MEMORY_SIZE):
+        self.pool = pool or get_pool()
+        self._memory = TTLCache(maxsize=memory_size, ttl=TOOL_CACHE_TTL)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._table_ready = False
+
+    def ensure_table(self):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS mcp_tool_cache (
+                server TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                args_hash TEXT NOT NULL,
+                args JSONB NOT NULL,
+                result JSONB NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                expires_at TIMESTAMPTZ NOT NULL,
+                PRIMARY KEY (server, tool, args_hash)
+            )
+            """)
+        self._table_ready = True
+
+    @staticmethod
+    def _key(server: str, tool: str, args: str) -> tuple[str, str, str]:
+        return server, tool, hashlib.sha256(args.encode("utf-8")).hexdigest()
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def get(self, server: str, tool: str, args: str):
+        """Returns (found, result)."""
+        key = self._key(server, tool, args)
+        found = self._memory.get(key, _MISSING)
+        if found is not _MISSING:
+            self._count("hits")
+            return True, found
+        try:
+            if not self._table_ready:
+                self.ensure_table()
+            with self.pool.cursor() as cur:
+                cur.execute("""
+                UPDATE mcp_tool_cache SET hits = hits + 1
+                WHERE server = %s AND tool = %s AND args_hash = %s AND expires_at > now()
+                RETURNING result, EXTRACT(EPOCH FROM expires_at - now())
+                """, key)
+                row = cur.fetchone()
+        except Exception as e:
+            print(f"[TOOL CACHE] Lookup failed for {tool}: {e}")
+            self._count("errors")
+            row = None
+        # Error payloads stored before they were filtered out count as misses.
+        if row is None or looks_like_error(row[0]):
+            self._count("misses")
+            return False, None
+        result, remaining = row
+        self._memory.set(key, result, ttl=float(remaining))
+        self._count("hits")
+        return True, result
+
+    def set(self, server: str, tool: str, args: str, result, ttl: float):
+        try:
+            # Round-trip through JSON so memory and DB hits return the same value.
+            result = json.loads(json.dumps(result, ensure_ascii=False))
+        except (TypeError, ValueError):
+            return
+        key = self._key(server, tool, args)
+        self._memory.set(key, result, ttl=ttl)
+        try:
+            if not self._table_ready:
+                self.ensure_table()
+            with self.pool.cursor() as cur:
+                cur.execute("""
+                INSERT INTO mcp_tool_cache (server, tool, args_hash, args, result, expires_at)
+                VALUES (%s, %s, %s, %s, %s, now() + make_interval(secs => %s))
+                ON CONFLICT (server, tool, args_hash) DO UPDATE
+                SET result = EXCLUDED.result,
+                    created_at = now(),
+                    expires_at = EXCLUDED.expires_at
+                """, (*key, Json(json.loads(args)), Json(result), ttl))
+        except Exception as e:
+            print(f"[TOOL CACHE] Store failed for {tool}: {e}")
+            self._count("errors")
+
+    def wrap(self, server: str, tool):
+        """Makes tool.forward serve repeated calls from the cache."""
+        ttl = tool_ttl(tool.name)
+        if ttl <= 0 or getattr(tool, "_cached", False):
+            return tool
+        forward = tool.forward
+
+        @wraps(forward)
+        def cached_forward(*args, **kwargs):
+            key_args = canonical_args(args, kwargs)
+            found, result = self.get(server, tool.name, key_args)
+            if found:
+                return result
+            result = forward(*args, **kwargs)
+            if not looks_like_error(result):
+                self.set(server, tool.name, key_args, result, ttl)
+            return result
+
+        tool.forward = cached_forward
+        tool._cached = True
+        return tool
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": hits / total if total else 0.0,
+            "memory": self._memory.stats(),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolCallCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ToolCallCache()
+    return _cache
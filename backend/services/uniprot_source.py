@@ -1,4 +1,4 @@
-from backend.services.http_client import HttpClient
+from backend.services.http_client import HttpClient, AsyncHttpClient
 
 class UniProtSource:
     SEARCH_URL = 'https://rest.uniprot.org/uniprotkb/search'
@@ -6,10 +6,33 @@ class UniProtSource:
 
     def __init__(self):
         self.client = HttpClient()
+        self.aclient = AsyncHttpClient()
 
     def fetch(self, gene_symbol: str) -> dict:
-        params = {'query': f'gene:{gene_symbol} AND organism_id:9606', 'format': 'json', 'size': 1}
-        res = self.client.get(self.SEARCH_URL, params=params)
+        res = self.client.get(self.SEARCH_URL, params=self._search_params(gene_symbol))
+        out, accession = self._parse_search(res)
+        if not accession:
+            return out
+        full = self.client.get(self.ENTRY_URL.format(accession))
+        return self._parse_entry(full, out)
+
+    async def afetch(self, gene_symbol: str) -> dict:
+        res = await self.aclient.get(self.SEARCH_URL, params=self._search_params(gene_symbol))
+        out, accession = self._parse_search(res)
+        if not accession:
+            return out
+        full = await self.aclient.get(self.ENTRY_URL.format(accession))
+        return self._parse_entry(full, out)
+
+    async def aclose(self):
+        await self.aclient.aclose()
+
+    @staticmethod
+    def _search_params(gene_symbol: str) -> dict:
+        return {'query': f'gene:{gene_symbol} AND organism_id:9606', 'format': 'json', 'size': 1}
+
+    @staticmethod
+    def _parse_search(res) -> tuple[dict, str | None]:
         out = {'protein_sequence': None,
                'function': None,
                'synonyms': [],
@@ -20,13 +43,14 @@ class UniProtSource:
         }
         hits = res.get('results', []) if isinstance(res, dict) else []
         if not hits:
-            return out
+            return out, None
         entry = hits[0]
         accession = entry.get('primaryAccession') or entry.get('uniProtkbId')
         out['primaryAccession'] = accession
-        if not accession:
-            return out
-        full = self.client.get(self.ENTRY_URL.format(accession))
+        return out, accession
+
+    @staticmethod
+    def _parse_entry(full: dict, out: dict) -> dict:
         seq_obj = full.get('sequence') or {}
         out['protein_sequence'] = seq_obj.get('value')
         comments = full.get('comments', [])
@@ -0,0 +1,52 @@
+import os
+
+from backend.services.db import PgPool, get_pool, get_async_pool
+
+# How long a symbol that resolved to no gene is rejected without re-checking (seconds).
+UNKNOWN_GENE_TTL = int(os.environ.get("UNKNOWN_GENE_TTL", 24 * 3600))
+
+
+class UnknownGeneStore:
+    """Negative cache of searched symbols that are not human genes, in `unknown_genes`."""
+
+    def __init__(self, pool: PgPool | None = None, ttl: int = UNKNOWN_GENE_TTL):
+        self.pool = pool or get_pool()
+        self.ttl = ttl
+
+    def ensure_table(self):
+        with self.pool.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS unknown_genes (
+                gene_symbol TEXT PRIMARY KEY,
+                expires_at TIMESTAMPTZ NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+
+    _CHECK_SQL = """
+    UPDATE unknown_genes SET hits = hits + 1
+    WHERE gene_symbol = {gene} AND expires_at > now()
+    RETURNING 1
+    """
+    _MARK_SQL = """
+    INSERT INTO unknown_genes (gene_symbol, expires_at)
+    VALUES ({gene}, now() + make_interval(secs => {ttl}))
+    ON CONFLICT (gene_symbol) DO UPDATE SET expires_at = EXCLUDED.expires_at
+    """
+
+    def is_unknown(self, gene_symbol: str) -> bool:
+        with self.pool.cursor() as cur:
+            cur.execute(self._CHECK_SQL.format(gene="%s"), (gene_symbol,))
+            return cur.fetchone() is not None
+
+    async def ais_unknown(self, gene_symbol: str) -> bool:
+        pool = await get_async_pool()
+        return await pool.fetchval(self._CHECK_SQL.format(gene="$1"), gene_symbol) is not None
+
+    def mark(self, gene_symbol: str):
+        with self.pool.cursor() as cur:
+            cur.execute(self._MARK_SQL.format(gene="%s", ttl="%s"), (gene_symbol, self.ttl))
+
+    async def amark(self, gene_symbol: str):
+        pool = await get_async_pool()
+        await pool.execute(self._MARK_SQL.format(gene="$1", ttl="$2"), gene_symbol, float(self.ttl))
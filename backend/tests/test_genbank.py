@@ -0,0 +1,62 @@
+import pytest
+
+from backend.services.ncbi_mcp_server.genbank import LocationError, parse_genbank, parse_location
+
+
+def spans(location):
+    return [(i.start, i.end, i.strand, i.partial_start, i.partial_end) for i in parse_location(location)]
+
+
+def test_range_and_single_site():
+    assert spans("12..45") == [(12, 45, 1, False, False)]
+    assert spans("120") == [(120, 120, 1, False, False)]
+
+
+def test_partial_ends():
+    assert spans("<100..>288") == [(100, 288, 1, True, True)]
+    assert spans("<1..20") == [(1, 20, 1, True, False)]
+
+
+def test_bond_keeps_both_sites():
+    assert spans("bond(23,88)") == [(23, 23, 1, False, False), (88, 88, 1, False, False)]
+
+
+def test_order_and_join():
+    assert spans("order(120,241..248)") == [(120, 120, 1, False, False), (241, 248, 1, False, False)]
+    assert spans("join(1..5,10..>20)") == [(1, 5, 1, False, False), (10, 20, 1, False, True)]
+
+
+def test_complement_sets_strand_per_part():
+    assert spans("complement(join(5..7,9..12))") == [(5, 7, -1, False, False), (9, 12, -1, False, False)]
+    assert spans("join(complement(1..5),10..20)") == [(1, 5, -1, False, False), (10, 20, 1, False, False)]
+
+
+def test_one_of_takes_first_position():
+    assert spans("one-of(12,15)..20") == [(12, 20, 1, False, False)]
+
+
+def test_remote_reference_is_skipped():
+    assert spans("join(NP_000001.1:1..5,10..20)") == [(10, 20, 1, False, False)]
+
+
+def test_unparseable_location_raises():
+    with pytest.raises(LocationError):
+        parse_location("gap(5)")
+    with pytest.raises(LocationError):
+        parse_location("12.x")
+
+
+def test_unparseable_feature_keeps_raw_location():
+    record_text = """LOCUS       NP_1                     20 aa            linear   PRI
+FEATURES             Location/Qualifiers
+     Bond            bond(3,17)
+                     /bond_type="disulfide"
+     misc_feature    gap(5)
+ORIGIN
+        1 mkvlaaglll
+//
+"""
+    record, = parse_genbank(record_text.splitlines())
+    bond, odd = record.features
+    assert (bond.start, bond.end, len(bond.intervals)) == (3, 17, 2)
+    assert odd.location == "gap(5)" and odd.intervals == ()
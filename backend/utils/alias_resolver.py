@@ -1,16 +1,32 @@
-import requests
+from functools import lru_cache
+
+from backend.services.http_client import HttpClient
+from backend.utils.hgnc_index import get_hgnc_index
+
+_http = HttpClient()
+
 
 def resolve_gene_alias_to_official(gene_alias: str, species_taxon_id: int = 9606) -> str:
     """
-    Resolve a gene alias to its official symbol using the UniProtKB Search API.
-    Works for common aliases like 'NRF2' → 'NFE2L2'.
+    Resolve a gene alias to its official symbol, e.g. 'NRF2' → 'NFE2L2'.
+    Human symbols are looked up in the local HGNC index first; the UniProtKB
+    Search API is only queried for symbols the index does not know.
     """
+    if species_taxon_id == 9606:
+        official = get_hgnc_index().normalize(gene_alias)
+        if official:
+            return official
+    return _resolve_with_uniprot(gene_alias.strip(), species_taxon_id)
+
+
+@lru_cache(maxsize=4096)
+def _resolve_with_uniprot(gene_alias: str, species_taxon_id: int) -> str:
     base_url = "https://rest.uniprot.org/uniprotkb/search"
     query = f"gene_exact:{gene_alias} AND organism_id:{species_taxon_id}"
 
     try:
         # === 1. Send a search request to UniProtKB ===
-        response = requests.get(
+        data = _http.get(
             base_url,
             params={
                 "query": query,
@@ -19,8 +35,6 @@ def resolve_gene_alias_to_official(gene_alias: str, species_taxon_id: int = 9606
             },
             timeout=10,
         )
-        response.raise_for_status()
-        data = response.json()
 
     except Exception as e:
         raise RuntimeError(f"Failed to query UniProt for '{gene_alias}': {e}")
@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class DiskCache:
+    """
+    Thread- and process-safe key/value cache in a SQLite file.
+    Values are bytes, stored zlib-compressed with an optional time-to-live.
+    When the stored size exceeds `max_bytes` the least recently used entries
+    are evicted down to 90% of it. The total size is kept in the one-row
+    `cache_size` table by triggers, so writes never scan the cache to sum it.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30, ttl: float | None = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_idx ON cache (accessed_at)")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_size (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                bytes INTEGER NOT NULL
+            )
+            """)
+            # Seeded once from the entries already stored (cache files created before the counter).
+            conn.execute("INSERT OR IGNORE INTO cache_size SELECT 0, COALESCE(SUM(size), 0) FROM cache")
+            conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache
+            BEGIN UPDATE cache_size SET bytes = bytes + NEW.size; END
+            """)
+            conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache
+            BEGIN UPDATE cache_size SET bytes = bytes + NEW.size - OLD.size; END
+            """)
+            conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache
+            BEGIN UPDATE cache_size SET bytes = bytes - OLD.size; END
+            """)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, field: str, n: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+        conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return zlib.decompress(value)
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        blob = zlib.compress(value)
+        conn = self._conn()
+        # An upsert rather than INSERT OR REPLACE: REPLACE deletes without firing the size trigger.
+        conn.execute(
+            """
+            INSERT INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,
+                expires_at = excluded.expires_at, accessed_at = excluded.accessed_at
+            """,
+            (key, blob, len(blob), now + ttl if ttl else None, now),
+        )
+        self._evict(conn)
+
+    def invalidate(self, key: str):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
+
+    @staticmethod
+    def _size(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT bytes FROM cache_size").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection):
+        if self._size(conn) <= self.max_bytes:
+            return
+        conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        total = self._size(conn)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._count("evictions", evicted)
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        entries = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        size = self._size(conn)
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        total = hits + misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_rate": hits / total if total else 0.0,
+        }
@@ -0,0 +1,137 @@
+"""
+Offline index of approved human gene symbols with their aliases and previous
+symbols, built from the HGNC complete set TSV:
+
+    https://storage.googleapis.com/public-download-files/hgnc/tsv/tsv/hgnc_complete_set.txt
+
+The snapshot path comes from HGNC_SNAPSHOT_PATH; without it the index is empty
+and callers fall back to their online lookups.
+"""
+import csv
+import difflib
+import os
+import sys
+import threading
+from typing import NamedTuple
+
+HGNC_SNAPSHOT_PATH = os.environ.get("HGNC_SNAPSHOT_PATH", "")
+
+
+class HgncRecord(NamedTuple):
+    symbol: str
+    hgnc_id: str
+    entrez_id: str | None
+    ensembl_gene_id: str | None
+    uniprot_ids: tuple[str, ...]
+
+
+def _split(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [v.strip() for v in value.strip('"').split("|") if v.strip()]
+
+
+class HgncIndex:
+    """
+    Upper-cased symbol -> approved symbol lookups. Approved symbols win over
+    previous symbols, which win over aliases; a previous symbol or alias
+    shared by several genes is ambiguous and not resolved, but its candidate
+    genes are kept so it still counts as a known name.
+    """
+
+    def __init__(self):
+        self._records: dict[str, HgncRecord] = {}
+        self._previous: dict[str, str | None] = {}
+        self._aliases: dict[str, str | None] = {}
+        self._ambiguous: dict[str, set[str]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "HgncIndex":
+        index = cls()
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f, delimiter="\t"):
+                if row.get("status", "Approved") != "Approved":
+                    continue
+                index.add(
+                    HgncRecord(
+                        symbol=sys.intern(row["symbol"]),
+                        hgnc_id=row["hgnc_id"],
+                        entrez_id=row.get("entrez_id") or None,
+                        ensembl_gene_id=row.get("ensembl_gene_id") or None,
+                        uniprot_ids=tuple(_split(row.get("uniprot_ids"))),
+                    ),
+                    aliases=_split(row.get("alias_symbol")),
+                    previous=_split(row.get("prev_symbol")),
+                )
+        return index
+
+    def add(self, record: HgncRecord, aliases=(), previous=()):
+        self._records[record.symbol.upper()] = record
+        for table, names in ((self._previous, previous), (self._aliases, aliases)):
+            for name in names:
+                key = name.upper()
+                if key in table and table[key] != record.symbol:
+                    shared = self._ambiguous.setdefault(key, set())
+                    if table[key] is not None:
+                        shared.add(table[key])
+                    shared.add(record.symbol)
+                    table[key] = None
+                else:
+                    table[key] = record.symbol
+
+    def normalize(self, symbol: str) -> str | None:
+        """Approved symbol for an approved, previous or alias symbol; None if unknown or ambiguous."""
+        key = symbol.strip().upper()
+        record = self._records.get(key)
+        if record is not None:
+            return record.symbol
+        return self._previous.get(key) or self._aliases.get(key)
+
+    def candidates(self, symbol: str) -> list[str]:
+        """Every approved symbol the name may refer to; several for an ambiguous alias."""
+        approved = self.normalize(symbol)
+        if approved:
+            return [approved]
+        return sorted(self._ambiguous.get(symbol.strip().upper(), ()))
+
+    def known(self, symbol: str) -> bool:
+        """Whether the name matches any gene, ambiguous aliases and previous symbols included."""
+        key = symbol.strip().upper()
+        return self.normalize(symbol) is not None or key in self._ambiguous
+
+    def record(self, symbol: str) -> HgncRecord | None:
+        approved = self.normalize(symbol)
+        return self._records.get(approved.upper()) if approved else None
+
+    def symbols(self) -> list[str]:
+        return [record.symbol for record in self._records.values()]
+
+    def suggest(self, symbol: str, n: int = 5, cutoff: float = 0.75) -> list[str]:
+        """Approved symbols closest to a misspelled one."""
+        key = symbol.strip().upper()
+        matches = difflib.get_close_matches(key, self._records.keys(), n=n, cutoff=cutoff)
+        return [self._records[m].symbol for m in matches]
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, symbol: str) -> bool:
+        return self.normalize(symbol) is not None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_hgnc_index() -> HgncIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if HGNC_SNAPSHOT_PATH and os.path.exists(HGNC_SNAPSHOT_PATH):
+                    _index = HgncIndex.load(HGNC_SNAPSHOT_PATH)
+                    print(f"[HGNC] Loaded {len(_index)} approved symbols from {HGNC_SNAPSHOT_PATH}")
+                else:
+                    print("[HGNC] No snapshot found (HGNC_SNAPSHOT_PATH), alias index is empty")
+                    _index = HgncIndex()
+    return _index
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+    The first caller for a key runs the function, everyone who arrives while
+    it is in flight waits for and shares its result (or exception).
+    Calls for different keys never wait on each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight; all callers must share one event loop."""
+
+    def __init__(self):
+        self._calls: dict = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        fut = self._calls.get(key)
+        if fut is not None:
+            # shield: a cancelled waiter must not cancel the shared lookup
+            return await asyncio.shield(fut)
+
+        fut = asyncio.ensure_future(fn(*args, **kwargs))
+        self._calls[key] = fut
+        fut.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(fut)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
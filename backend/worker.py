@@ -0,0 +1,38 @@
+"""
+Standalone gene generation worker.
+
+Runs the agent pipeline for jobs from the gene_jobs table, independently of
+the API processes (which only enqueue when started with EMBEDDED_WORKER=0):
+
+    python -m backend.worker --concurrency 2
+"""
+import argparse
+import signal
+
+from backend.services.http_client import close_sync_client
+from backend.services.llm import close_models
+from backend.services.mcp_tools import close_session_pools
+from backend.services.pipeline_worker import PipelineWorker, WORKER_CONCURRENCY
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gene article generation worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=WORKER_CONCURRENCY,
+        help="number of genes processed at the same time",
+    )
+    args = parser.parse_args()
+
+    worker = PipelineWorker(concurrency=args.concurrency)
+    # Finish running jobs on `docker stop`; unfinished leases are reclaimed anyway.
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    worker.run_forever()
+    close_session_pools()
+    close_models()
+    close_sync_client()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,10 @@ import {
   FileText,
   Loader2,
   Share2,
-  Check
+  Check,
+  SearchX
 } from 'lucide-react'
+import { Link } from 'react-router-dom'
 import { GeneResponse } from '../types'
 import ReactMarkdown from 'react-markdown'
 import remarkGfm from 'remark-gfm'
@@ -136,11 +138,46 @@ export default function GeneResults({ gene: initialGene }: GeneResultsProps) {
             Average processing time: <strong>up to 1 hour</strong>.
           </p>
 
-          {gene.queue_size && gene.queue_size > 1 && (
+          {gene.queue_position === 0 ? (
             <p className="text-xs sm:text-sm text-gray-500 mt-2">
-              There are currently <strong>{gene.queue_size - 1}</strong> other
+              The article for this gene is being generated right now.
+            </p>
+          ) : gene.queue_position && gene.queue_position > 1 ? (
+            <p className="text-xs sm:text-sm text-gray-500 mt-2">
+              There are currently <strong>{gene.queue_position - 1}</strong> other
               gene(s) in the queue ahead of yours.
             </p>
+          ) : null}
+        </div>
+      </div>
+    )
+  }
+
+  // ——— Unknown symbol: nothing was queued, offer close matches instead
+  if (gene.status === 'unknown') {
+    return (
+      <div className="bg-white rounded-lg shadow-sm border p-6 text-center">
+        <div className="flex flex-col items-center space-y-3">
+          <SearchX className="h-8 w-8 text-gray-500" />
+          <h2 className="text-lg sm:text-xl font-semibold text-gray-900">
+            Unknown gene symbol
+          </h2>
+          <p className="text-gray-600 text-sm sm:text-base">
+            <strong>{gene.gene}</strong> is not a recognized human gene symbol.
+          </p>
+
+          {gene.suggestions && gene.suggestions.length > 0 && (
+            <div className="text-sm sm:text-base text-gray-600">
+              Did you mean:{' '}
+              {gene.suggestions.map((symbol, i) => (
+                <span key={symbol}>
+                  {i > 0 && ', '}
+                  <Link to={`/gene/${symbol}`} className="text-primary-600 hover:text-primary-800 font-medium">
+                    {symbol}
+                  </Link>
+                </span>
+              ))}
+            </div>
           )}
         </div>
       </div>
@@ -1,7 +1,7 @@
 export interface GeneResponse {
   gene: string;
   primaryAccession: string;
-  status: string | 'ready' | 'processing';
+  status: string | 'ready' | 'processing' | 'unknown';
   function?: string;
   synonyms: string[];
   longevity_association?: string;
@@ -15,6 +15,8 @@ export interface GeneResponse {
   article?: string;
   externalLink?: string;
   queue_size?: number
+  queue_position?: number
+  suggestions?: string[]
 }
 
 export interface ComparisonResponse {